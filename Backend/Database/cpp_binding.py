@@ -3,6 +3,8 @@ from ctypes import *
 import os
 from mutagen.mp3 import MP3
 from mutagen.id3 import ID3
+from Backend.scanner import LibraryScanner
+from Backend.Database.sqlite_engine import SqliteEngine, requested_engine
 
 class TrackData(Structure):
     _fields_ = [
@@ -19,14 +21,41 @@ class TrackData(Structure):
         ("rate_arrange", c_int), ("has_vocals", c_int), ("has_lyrics", c_int)
     ]
 
+def read_meta(path):
+    try:
+        a = MP3(path, ID3=ID3)
+        tags = a.tags or ID3()
+        return {
+            "path": path,
+            "title": str(tags.get('TIT2', os.path.basename(path))),
+            "artist": str(tags.get('TPE1', 'Unknown')),
+            "album": str(tags.get('TALB', 'Unknown')),
+            "genre": str(tags.get('TCON', 'Unknown')),
+            "duration": a.info.length
+        }
+    except: return {"path": path, "title": os.path.basename(path), "artist": "Err", "album": "-", "genre": "-", "duration": 0}
+
 class DatabaseClient:
-    def __init__(self):
+    def __init__(self, scan_workers=None, scan_mode="thread", engine=None, db_path=None):
+        self.scanner = LibraryScanner(read_meta, workers=scan_workers, mode=scan_mode)
+        self.last_scan_stats = None
+        self.clib = None
+        self.engine = None  # SqliteEngine, якщо music_db.dll не використовується
+        choice = requested_engine(engine)
+        if choice != "sqlite": self._load_dll()
+        if choice == "sqlite" or (choice == "auto" and not self.clib):
+            self.engine = SqliteEngine(db_path) if db_path else SqliteEngine()
+
+    def _load_dll(self):
         dll_path = os.path.join(os.path.dirname(__file__), "cpp_src", "music_db.dll")
         try:
             self.clib = CDLL(dll_path)
             self.clib.init_db()
             self.clib.add_track_cpp.argtypes = [POINTER(TrackData)]
             self.clib.add_track_cpp.restype = c_bool
+            if hasattr(self.clib, 'add_tracks_bulk_cpp'):
+                self.clib.add_tracks_bulk_cpp.argtypes = [POINTER(TrackData), c_int]
+                self.clib.add_tracks_bulk_cpp.restype = c_int
             self.clib.fetch_next_track.argtypes = [POINTER(TrackData)]
             self.clib.fetch_next_track.restype = c_bool
             self.clib.get_avg_rating_cpp.restype = c_double
@@ -35,42 +64,43 @@ class DatabaseClient:
             self.clib = None
 
     def scan_directory(self, folder):
-        if not self.clib: return 0
-        count = 0
-        for root, _, files in os.walk(folder):
-            for f in files:
-                if f.lower().endswith('.mp3'):
-                    if self._add_track(os.path.join(root, f)): count += 1
-        return count
+        if not self.clib and not self.engine: return 0
+        self.last_scan_stats = self.scanner.scan(folder, self._add_tracks_bulk)
+        return self.last_scan_stats["inserted"]
 
-    def _add_track(self, path):
-        meta = self._get_meta(path)
-        t = TrackData()
+    def _fill(self, t, meta):
         t.path = meta["path"].encode('mbcs', 'ignore')
         t.title = meta["title"].encode('mbcs', 'ignore')
         t.artist = meta["artist"].encode('mbcs', 'ignore')
         t.album = meta["album"].encode('mbcs', 'ignore')
         t.genre = meta["genre"].encode('mbcs', 'ignore')
         t.duration = meta["duration"]
+
+    def _add_tracks_bulk(self, metas):
+        if self.engine: return self.engine.add_tracks(metas)
+        if not hasattr(self.clib, 'add_tracks_bulk_cpp'):
+            count = 0
+            for meta in metas:
+                t = TrackData(); self._fill(t, meta)
+                if self.clib.add_track_cpp(byref(t)): count += 1
+            return count
+        arr = (TrackData * len(metas))()
+        for i, meta in enumerate(metas): self._fill(arr[i], meta)
+        return self.clib.add_tracks_bulk_cpp(arr, len(metas))
+
+    def _add_track(self, path):
+        if self.engine: return self.engine.add_tracks([self._get_meta(path)]) > 0
+        t = TrackData(); self._fill(t, self._get_meta(path))
         return self.clib.add_track_cpp(byref(t))
 
-    def _get_meta(self, path):
-        try:
-            a = MP3(path, ID3=ID3)
-            tags = a.tags or ID3()
-            return {
-                "path": path,
-                "title": str(tags.get('TIT2', os.path.basename(path))),
-                "artist": str(tags.get('TPE1', 'Unknown')),
-                "album": str(tags.get('TALB', 'Unknown')),
-                "genre": str(tags.get('TCON', 'Unknown')),
-                "duration": a.info.length
-            }
-        except: return {"path": path, "title": os.path.basename(path), "artist": "Err", "album": "-", "genre": "-", "duration": 0}
+    def _get_meta(self, path): return read_meta(path)
 
     def get_tracks(self, sort_by="artist"):
-        if not self.clib: return []
         order = "DESC" if sort_by == "rating" else "ASC"
+        if self.engine:
+            t = self.engine.tracks(sort_by, order, None, None)
+            return list(zip(t.id, t.path, t.title, t.artist, t.album, t.genre, t.duration, t.rating))
+        if not self.clib: return []
         self.clib.prepare_query(sort_by.encode(), order.encode())
         res = []
         t = TrackData()
@@ -80,11 +110,14 @@ class DatabaseClient:
         return res
 
     def update_rating(self, path, avg, r):
+        if self.engine: return self.engine.update_ratings([(path, avg, r)])
         self.clib.update_rating_cpp(path.encode('mbcs'), c_double(avg), 
             r['melody'], r['rhythm'], r['vocals'], r['lyrics'], r['arrange'], r['has_vocals'], r['has_lyrics'])
 
     def get_artist_rating(self, artist):
+        if self.engine: return round(self.engine.artist_rating(artist), 2)
         return round(self.clib.get_avg_rating_cpp(artist.encode('mbcs')), 2)
 
     def delete_track(self, path):
+        if self.engine: return self.engine.delete_tracks([path])
         self.clib.delete_track_cpp(path.encode('mbcs'))
\ No newline at end of file
@@ -0,0 +1,318 @@
+import os
+import re
+from ctypes import *
+from Backend.track_table import TrackTable
+from Backend.charts import chart_from_table
+from Backend.Database.sqlite_engine import DB_FILE
+
+class TrackData(Structure):
+    _fields_ = [("id", c_int), ("path", c_char * 256), ("title", c_char * 256), ("artist", c_char * 256),
+                ("album", c_char * 256), ("genre", c_char * 100), ("duration", c_double), ("rating", c_double),
+                ("rate_melody", c_int), ("rate_rhythm", c_int), ("rate_vocals", c_int),
+                ("rate_lyrics", c_int), ("rate_arrange", c_int), ("has_vocals", c_int), ("has_lyrics", c_int),
+                ("size", c_longlong), ("mtime", c_double), ("cover", c_char * 64)]
+
+class FileStamp(Structure):
+    _fields_ = [("path", c_char * 256), ("size", c_longlong), ("mtime", c_double)]
+
+class RatingData(Structure):
+    _fields_ = [("path", c_char * 256), ("rating", c_double),
+                ("rate_melody", c_int), ("rate_rhythm", c_int), ("rate_vocals", c_int),
+                ("rate_lyrics", c_int), ("rate_arrange", c_int), ("has_vocals", c_int), ("has_lyrics", c_int)]
+
+class GroupData(Structure):
+    _fields_ = [("name", c_char * 256), ("secondary", c_char * 256), ("count", c_int), ("cover_path", c_char * 256)]
+
+FIELD_SEP, ROW_SEP = '\x1f', '\x1e'
+PACKED_BUFFER_SIZE = 1 << 20
+RATING_BATCH = 5000
+CHART_ENTITIES = {"track": 0, "album": 1, "artist": 2, "genre": 3}
+# Джерело, з якого мала бути зібрана DLL: експорти, яких у DLL немає, означають, що її не перезібрали
+SOURCE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cpp_src", "logic.cpp")
+EXPORT_RE = re.compile(r"^\s*EXPORT\s+[\w\s\*]+?\b(\w+)\s*\(", re.M)
+
+def _group_from_fields(f):
+    return (f[0] or "Unknown", f[1], int(f[2]), f[3], f[4] if len(f) > 4 else "")
+
+def _chart_from_fields(f):
+    return {"name": f[0], "secondary": f[1], "rating": float(f[2] or 0), "rated": int(f[3]), "cover_path": f[4], "cover": f[5]}
+
+
+def source_exports(source=SOURCE_FILE):
+    """Імена EXPORT-функцій у logic.cpp (порожньо, якщо джерела поруч немає - напр. у зібраній програмі)."""
+    try:
+        with open(source, encoding="utf-8") as f: return EXPORT_RE.findall(f.read())
+    except OSError: return []
+
+
+def missing_exports(lib, source=SOURCE_FILE):
+    return [name for name in source_exports(source) if not hasattr(lib, name)]
+
+
+def load_library(dll_path):
+    """CDLL з усіма argtypes/restype, або None. Нові експорти перевіряються через hasattr - старі DLL теж працюють."""
+    try:
+        lib = CDLL(dll_path)
+        lib.init_system()
+
+        # --- DATABASE ---
+        lib.logic_add_track.argtypes = [POINTER(TrackData)]; lib.logic_add_track.restype = c_bool
+        if hasattr(lib, 'logic_add_tracks_bulk'):
+            lib.logic_add_tracks_bulk.argtypes = [POINTER(TrackData), c_int]
+            lib.logic_add_tracks_bulk.restype = c_int
+        if hasattr(lib, 'logic_delete_tracks_bulk'):
+            lib.logic_delete_tracks_bulk.argtypes = [POINTER(c_char_p), c_int]
+            lib.logic_delete_tracks_bulk.restype = c_int
+        if hasattr(lib, 'logic_prepare_fingerprints'):
+            lib.logic_prepare_fingerprints.argtypes = [c_char_p]
+            lib.logic_fetch_fingerprint.argtypes = [POINTER(FileStamp)]
+            lib.logic_fetch_fingerprint.restype = c_bool
+        if hasattr(lib, 'logic_apply_changes'):
+            lib.logic_apply_changes.argtypes = [POINTER(TrackData), c_int, POINTER(c_char_p), c_int, POINTER(c_char_p), c_int]
+            lib.logic_apply_changes.restype = c_int
+        lib.logic_fetch_next.argtypes = [POINTER(TrackData)]; lib.logic_fetch_next.restype = c_bool
+        lib.logic_prepare_query.argtypes = [c_char_p, c_char_p, c_char_p, c_char_p]
+        if hasattr(lib, 'logic_prepare_page'):
+            lib.logic_prepare_page.argtypes = [c_char_p, c_char_p, c_char_p, c_char_p, c_char_p, c_int, c_int]
+        for fn in ('logic_fetch_tracks_packed', 'logic_fetch_groups_packed', 'logic_fetch_top_packed'):
+            if hasattr(lib, fn):
+                getattr(lib, fn).argtypes = [c_char_p, c_int, POINTER(c_int)]
+                getattr(lib, fn).restype = c_int
+
+        # --- AUDIO ---
+        if hasattr(lib, 'audio_get_pos'):
+            lib.audio_get_pos.argtypes = []
+            lib.audio_get_pos.restype = c_double
+        if hasattr(lib, 'audio_is_playing'):
+            lib.audio_is_playing.argtypes = []
+            lib.audio_is_playing.restype = c_bool
+        if hasattr(lib, 'audio_set_pos'):
+            lib.audio_set_pos.argtypes = [c_char_p, c_double]
+            lib.audio_set_pos.restype = None
+
+
+        # --- RATING & TOPS ---
+        lib.logic_update_rating.argtypes = [c_char_p, c_double, c_int, c_int, c_int, c_int, c_int, c_int, c_int]
+        lib.logic_update_rating.restype = c_bool
+        if hasattr(lib, 'logic_update_ratings_bulk'):
+            lib.logic_update_ratings_bulk.argtypes = [POINTER(RatingData), c_int]
+            lib.logic_update_ratings_bulk.restype = c_int
+
+        if hasattr(lib, 'logic_get_artist_rating'):
+            lib.logic_get_artist_rating.argtypes = [c_char_p]
+            lib.logic_get_artist_rating.restype = c_double
+
+        if hasattr(lib, 'logic_prepare_chart'):
+            lib.logic_prepare_chart.argtypes = [c_int, c_char_p, c_char_p, c_int, c_double, c_int]
+
+        # --- GROUPS & NAVIGATION ---
+        if hasattr(lib, 'logic_prepare_group_query'):
+            lib.logic_prepare_group_query.argtypes = [c_int]
+            lib.logic_fetch_next_group.argtypes = [POINTER(GroupData)]
+            lib.logic_fetch_next_group.restype = c_bool
+
+        if hasattr(lib, 'logic_prepare_albums_by_artist'):
+             lib.logic_prepare_albums_by_artist.argtypes = [c_char_p]
+             lib.logic_prepare_albums_by_artist.restype = None
+
+        if hasattr(lib, 'logic_search_tracks'):
+             lib.logic_search_tracks.argtypes = [c_char_p]
+
+        if hasattr(lib, 'logic_toggle_shuffle'): lib.logic_toggle_shuffle.restype = c_bool
+        if hasattr(lib, 'logic_toggle_repeat'): lib.logic_toggle_repeat.restype = c_bool
+
+        missing = missing_exports(lib)
+        if missing:
+            # Старі DLL працюють через Python-запасні шляхи (повільніші) - це має бути видно, а не тихо
+            print(f"⚠️ {os.path.basename(dll_path)} is older than {os.path.basename(SOURCE_FILE)}: {len(missing)} exports missing "
+                  f"({', '.join(missing)}). Rebuild the backend; slower Python fallbacks are used until then.")
+        print("C++ Backend loaded correctly.")
+        return lib
+    except Exception as e:
+        print(f"❌ Error loading DLL: {e}")
+        return None
+
+
+class CppEngine:
+    """Сховище через backend.dll: рядки ходять через ctypes-структури або упаковані буфери, рядки - у 'mbcs'."""
+    name = "cpp"
+    text_encoding = "mbcs"
+    db_path = DB_FILE  # logic.cpp відкриває базу в поточній теці
+
+    def __init__(self, lib):
+        self.lib = lib
+        self._packed_buf = create_string_buffer(PACKED_BUFFER_SIZE)
+        self.has_pages = hasattr(lib, 'logic_prepare_page')
+
+    def close(self): pass
+
+    # === WRITE ===
+    def clear(self): self.lib.logic_clear_database()
+
+    def _fill_track_data(self, t, meta):
+        t.path = meta["path"].encode('mbcs'); t.title = meta["title"].encode('mbcs')
+        t.artist = meta["artist"].encode('mbcs'); t.album = meta["album"].encode('mbcs')
+        t.genre = meta["genre"].encode('mbcs'); t.duration = meta["duration"]
+        t.size = meta.get("size", 0); t.mtime = meta.get("mtime", 0.0)
+        t.cover = (meta.get("cover") or "").encode('ascii')  # id обкладинки - hex, кодування не потрібне
+
+    def _to_track_array(self, metas):
+        arr = (TrackData * len(metas))()
+        n = 0
+        for meta in metas:
+            try: self._fill_track_data(arr[n], meta)
+            except Exception: continue  # шлях, який не кодується в mbcs, пропускаємо як і раніше
+            n += 1
+        return arr, n
+
+    def _to_path_array(self, paths):
+        encoded = [p.encode('mbcs') for p in paths]
+        return (c_char_p * len(encoded))(*encoded), len(encoded)
+
+    def add_tracks(self, metas):
+        """Вся пачка пишеться одним викликом (одна транзакція на C++ стороні)."""
+        if not hasattr(self.lib, 'logic_add_tracks_bulk'):
+            written = 0
+            for meta in metas:
+                try:
+                    t = TrackData(); self._fill_track_data(t, meta)
+                    written += bool(self.lib.logic_add_track(byref(t)))
+                except Exception: continue
+            return written
+        arr, n = self._to_track_array(metas)
+        return self.lib.logic_add_tracks_bulk(arr, n) if n else 0
+
+    def delete_tracks(self, paths):
+        if not hasattr(self.lib, 'logic_delete_tracks_bulk'): return 0
+        return self.lib.logic_delete_tracks_bulk(*self._to_path_array(paths))
+
+    def apply_changes(self, metas, deleted, deleted_dirs):
+        """Нові/змінені треки, видалені файли і папки - одна транзакція (якщо DLL це вміє)."""
+        if not hasattr(self.lib, 'logic_apply_changes'):
+            removed = self.delete_tracks(deleted) if deleted else 0
+            return removed + (self.add_tracks(metas) if metas else 0)
+        arr, n = self._to_track_array(metas)
+        removed, rn = self._to_path_array(deleted)
+        removed_dirs, dn = self._to_path_array(deleted_dirs)
+        return self.lib.logic_apply_changes(arr, n, removed, rn, removed_dirs, dn)
+
+    def update_ratings(self, items):
+        """[(path, rating, data)] -> база пачками по RATING_BATCH, кожна пачка - одна транзакція."""
+        if not hasattr(self.lib, 'logic_update_ratings_bulk'):
+            return sum(1 for path, rating, data in items if self._update_rating(path, rating, data))
+        written = 0
+        for start in range(0, len(items), RATING_BATCH):
+            chunk = items[start:start + RATING_BATCH]
+            arr = (RatingData * len(chunk))()
+            n = 0
+            for path, rating, data in chunk:
+                try: arr[n].path = path.encode('mbcs')
+                except Exception: continue
+                r = arr[n]
+                r.rating = rating
+                r.rate_melody, r.rate_rhythm, r.rate_vocals = data['melody'], data['rhythm'], data['vocals']
+                r.rate_lyrics, r.rate_arrange = data['lyrics'], data['arrange']
+                r.has_vocals, r.has_lyrics = data.get('has_vocals', 1), data.get('has_lyrics', 1)
+                n += 1
+            if n: written += self.lib.logic_update_ratings_bulk(arr, n)
+        return written
+
+    def _update_rating(self, path, rating, data):
+        return self.lib.logic_update_rating(path.encode('mbcs'), c_double(rating), c_int(data['melody']), c_int(data['rhythm']), c_int(data['vocals']), c_int(data['lyrics']), c_int(data['arrange']), c_int(data.get('has_vocals', 1)), c_int(data.get('has_lyrics', 1)))
+
+    # === READ ===
+    def fingerprints(self, root):
+        """{path: (size, mtime)} треків з цієї папки, що вже є в базі."""
+        if not hasattr(self.lib, 'logic_prepare_fingerprints'): return {}
+        self.lib.logic_prepare_fingerprints(root.encode('mbcs'))
+        res = {}
+        f = FileStamp()
+        while self.lib.logic_fetch_fingerprint(byref(f)):
+            res[f.path.decode('mbcs', 'ignore')] = (f.size, f.mtime)
+        return res
+
+    def tracks(self, sort, order, f_col, f_val):
+        f_col_p = f_col.encode('utf-8') if f_col else None
+        f_val_p = f_val.encode('utf-8') if f_val else None
+        self.lib.logic_prepare_query(sort.encode('utf-8'), order.encode('utf-8'), f_col_p, f_val_p)
+        return self._fetch_all_raw()
+
+    def page(self, sort, order, f_col, f_val, after, limit):
+        after_val = None
+        if after is not None:
+            value = after[0]
+            after_val = (repr(float(value)) if isinstance(value, (int, float)) else value).encode('mbcs', 'replace')
+        self.lib.logic_prepare_page(sort.encode('utf-8'), order.encode('utf-8'),
+                                    f_col.encode('utf-8') if f_col else None, f_val.encode('mbcs', 'replace') if f_val else None,
+                                    after_val, c_int(after[1] if after else 0), c_int(limit))
+        return self._fetch_all_raw()
+
+    def search(self, query):
+        self.lib.logic_search_tracks(query.encode('mbcs', errors='replace'))
+        return self._fetch_all_raw()
+
+    def chart(self, entity, col, flag, desc, prior, limit):
+        """Як SqliteEngine.chart. DLL без prepareChart (закомічений backend.dll) - той самий чарт з усієї бібліотеки в Python."""
+        if not hasattr(self.lib, 'logic_prepare_chart'):
+            return chart_from_table(self.tracks("artist", "ASC", None, None), entity, col, flag, desc, prior, limit)
+        self.lib.logic_prepare_chart(CHART_ENTITIES[entity], col.encode('utf-8'), flag.encode('utf-8') if flag else None,
+                                     int(desc), c_double(prior), c_int(limit))
+        if entity == "track": return self._fetch_all_raw()
+        return self._fetch_packed(self.lib.logic_fetch_top_packed, _chart_from_fields)
+
+    def artist_rating(self, artist):
+        if not hasattr(self.lib, 'logic_get_artist_rating'):
+            ratings = [r for r in self.tracks("artist", "ASC", "artist", artist).rating if r > 0]
+            return sum(ratings) / len(ratings) if ratings else 0.0
+        return self.lib.logic_get_artist_rating(artist.encode('mbcs', 'replace'))
+
+    def groups(self, mode):
+        self.lib.logic_prepare_group_query(mode)
+        return self._fetch_group_rows()
+
+    def artist_albums(self, artist_name):
+        self.lib.logic_prepare_albums_by_artist(artist_name.encode('utf-8'))
+        return self._fetch_group_rows()
+
+    # === FFI ===
+    def _iter_packed(self, fetch_fn):
+        """Один FFI-виклик і один decode на цілий буфер рядків замість виклику і п'яти decode на рядок."""
+        rows = c_int()
+        while True:
+            n = fetch_fn(self._packed_buf, len(self._packed_buf), byref(rows))
+            if n < 0:
+                self._packed_buf = create_string_buffer(-n * 2)
+                continue
+            if n == 0: break
+            text = string_at(self._packed_buf, n).decode('mbcs', 'ignore')
+            yield [rec.split(FIELD_SEP) for rec in text.split(ROW_SEP)[:-1]]
+
+    def _fetch_packed(self, fetch_fn, convert):
+        res = []
+        for records in self._iter_packed(fetch_fn): res.extend(map(convert, records))
+        return res
+
+    def _fetch_all_raw(self):
+        table = TrackTable()
+        if hasattr(self.lib, 'logic_fetch_tracks_packed'):
+            # Зайві колонки (size, mtime після cover) відкидаються: TrackTable бере лише свої FIELDS
+            for records in self._iter_packed(self.lib.logic_fetch_tracks_packed): table.extend_rows(records)
+            return table
+        res = []
+        t = TrackData()
+        while self.lib.logic_fetch_next(byref(t)):
+            res.append((t.id, t.path.decode('mbcs', 'ignore'), t.title.decode('mbcs', 'ignore'), t.artist.decode('mbcs', 'ignore'),
+                        t.album.decode('mbcs', 'ignore'), t.genre.decode('mbcs', 'ignore'), t.duration, t.rating,
+                        t.rate_melody, t.rate_rhythm, t.rate_vocals, t.rate_lyrics, t.rate_arrange, t.has_vocals, t.has_lyrics,
+                        t.cover.decode('ascii', 'ignore')))
+        table.extend_rows(res)
+        return table
+
+    def _fetch_group_rows(self):
+        if hasattr(self.lib, 'logic_fetch_groups_packed'):
+            return self._fetch_packed(self.lib.logic_fetch_groups_packed, _group_from_fields)
+        res = []
+        g = GroupData()
+        while self.lib.logic_fetch_next_group(byref(g)):
+            res.append((g.name.decode('mbcs', 'ignore'), g.secondary.decode('mbcs', 'ignore'), g.count, g.cover_path.decode('mbcs', 'ignore'), ""))
+        return res
\ No newline at end of file
@@ -1,14 +1,23 @@
 #include <iostream>
-#include <windows.h> 
 #include <string>
 #include <vector>
+#include <map>
 #include <ctime>
 #include <algorithm>
+#include <cctype>
+#include <cstring>
+#include <cstdlib>
 #include <stdio.h> 
 #include "sqlite3.h"
 
+#ifdef _WIN32
+#include <windows.h>
 #pragma comment(lib, "winmm.lib")
 #define EXPORT __declspec(dllexport)
+#else
+// Не-Windows збірка (бенчмарки, CI): g++ -shared -fPIC -O2 logic.cpp -lsqlite3
+#define EXPORT __attribute__((visibility("default")))
+#endif
 
 // ==========================================
 // СТРУКТУРИ ДАНИХ
@@ -25,6 +34,24 @@ struct TrackData {
     int rate_melody; int rate_rhythm; int rate_vocals; 
     int rate_lyrics; int rate_arrange;
     int has_vocals; int has_lyrics;
+    long long size;
+    double mtime;
+    char cover[64];  // id обкладинки (Backend/cover_store.py), "" - без обкладинки
+};
+
+struct FileStamp {
+    char path[256];
+    long long size;
+    double mtime;
+};
+
+// Компактний рядок для пакетного запису оцінок (без тегів, на відміну від TrackData)
+struct RatingData {
+    char path[256];
+    double rating;
+    int rate_melody; int rate_rhythm; int rate_vocals;
+    int rate_lyrics; int rate_arrange;
+    int has_vocals; int has_lyrics;
 };
 
 struct GroupData {
@@ -34,13 +61,13 @@ struct GroupData {
     char cover_path[256];
 };
 
-struct TopItemData {
-    char name[256];
-    char secondary[256];
-    double rating;
-    char cover_path[256];
-    int type; 
-};
+// Групи і топи віддають id обкладинки свого треку-представника (cover_path) - пошук за унікальним індексом path
+#define COVER_OF(path) "(SELECT cover FROM tracks WHERE tracks.path = " path ")"
+
+// Пакетна вибірка: поля розділені \x1f, рядки \x1e (текст у кодуванні бази)
+#define FIELD_SEP '\x1f'
+#define ROW_SEP '\x1e'
+enum PackState { PACK_READY = 0, PACK_CARRY = 1, PACK_DONE = 2 };
 
 // ==========================================
 // АУДІО ПЛЕЄР (MCI)
@@ -55,7 +82,10 @@ public:
     virtual ~IAudioPlayer() {}
 };
 
+#ifdef _WIN32
+// Формат часу ставиться один раз при open: позицію UI рахує сам (PlaybackClock), сюди ходить лише зрідка
 class WindowsAudioPlayer : public IAudioPlayer {
+    bool paused = false;
 public:
     void play(const char* path) override {
         mciSendStringA("close mp3", NULL, 0, NULL);
@@ -63,10 +93,10 @@ public:
         mciSendStringA(cmd.c_str(), NULL, 0, NULL);
         mciSendStringA("set mp3 time format milliseconds", NULL, 0, NULL);
         mciSendStringA("play mp3", NULL, 0, NULL);
+        paused = false;
     }
 
     void pause() override {
-        static bool paused = false;
         if (paused) {
             mciSendStringA("resume mp3", NULL, 0, NULL);
             paused = false;
@@ -84,20 +114,201 @@ public:
 
     double getPosition() override {
         char buf[128];
-        mciSendStringA("set mp3 time format milliseconds", NULL, 0, NULL);
         mciSendStringA("status mp3 position", buf, 128, NULL);
         return atof(buf) / 1000.0;
     }
 
     void setPosition(const char* path, double seconds) override {
-        mciSendStringA("set mp3 time format milliseconds", NULL, 0, NULL);
         char cmd[256];
         long ms = (long)(seconds * 1000);
         sprintf(cmd, "seek mp3 to %ld", ms);
         mciSendStringA(cmd, NULL, 0, NULL);
         mciSendStringA("play mp3", NULL, 0, NULL);
+        paused = false;
     }
 };
+#else
+// Без MCI звуку немає: бібліотека, пошук і рейтинги працюють як звичайно
+class SilentAudioPlayer : public IAudioPlayer {
+public:
+    void play(const char*) override {}
+    void pause() override {}
+    bool isPlaying() override { return false; }
+    double getPosition() override { return 0.0; }
+    void setPosition(const char*, double) override {}
+};
+#endif
+
+// Повторне сканування оновлює теги і відбиток файлу, але не чіпає рейтинги
+static const char* UPSERT_SQL =
+    "INSERT INTO tracks (path, title, artist, album, genre, duration, size, mtime, cover) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(path) DO UPDATE SET title=excluded.title, artist=excluded.artist, album=excluded.album, "
+    "genre=excluded.genre, duration=excluded.duration, size=excluded.size, mtime=excluded.mtime, cover=excluded.cover";
+
+// ==========================================
+// СХЕМА І МІГРАЦІЇ (дзеркало - Backend/Database/schema.py)
+// ==========================================
+// Версія схеми живе в PRAGMA user_version; кожна міграція - окрема транзакція
+#define SCHEMA_VERSION 7
+
+static const char* CREATE_TRACKS_SQL =
+    "CREATE TABLE IF NOT EXISTS tracks ("
+    "id INTEGER PRIMARY KEY, path TEXT UNIQUE, title TEXT, artist TEXT, "
+    "album TEXT, genre TEXT, duration REAL, rating REAL DEFAULT 0, "
+    "rate_melody INTEGER DEFAULT 0, rate_rhythm INTEGER DEFAULT 0, "
+    "rate_vocals INTEGER DEFAULT 0, rate_lyrics INTEGER DEFAULT 0, "
+    "rate_arrange INTEGER DEFAULT 0, has_vocals INTEGER DEFAULT 1, has_lyrics INTEGER DEFAULT 1, "
+    "size INTEGER DEFAULT 0, mtime REAL DEFAULT 0, cover TEXT)";
+
+// Колонки треку в порядку FIELDS (track_table.py), далі відбиток файлу.
+// Не SELECT *: cover додано після size і mtime, а Python читає колонки за позицією.
+#define TRACK_COLUMNS "id, path, title, artist, album, genre, duration, rating, rate_melody, rate_rhythm, rate_vocals, " \
+    "rate_lyrics, rate_arrange, has_vocals, has_lyrics, cover, size, mtime"
+
+static const char* PRAGMAS_SQL =
+    "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; PRAGMA temp_store=MEMORY; "
+    "PRAGMA cache_size=-32000; PRAGMA mmap_size=268435456;";
+
+// v2: покриваючі індекси для сортувань, фільтрів і GROUP BY ... MIN(path)
+static const char* MIGRATION_2_SQL =
+    "CREATE INDEX IF NOT EXISTS idx_tracks_artist_album ON tracks(artist, album, path);"
+    "CREATE INDEX IF NOT EXISTS idx_tracks_album ON tracks(album, artist, path);"
+    "CREATE INDEX IF NOT EXISTS idx_tracks_title ON tracks(title);"
+    "CREATE INDEX IF NOT EXISTS idx_tracks_duration ON tracks(duration);"
+    "CREATE INDEX IF NOT EXISTS idx_tracks_rating ON tracks(rating, title, artist, path);";
+
+// v3: ключі сторінок (колонка сортування, id). title і duration вже мають такий порядок
+// (одноколонковий індекс закінчується rowid), artist/album/rating - ні
+static const char* MIGRATION_3_SQL =
+    "CREATE INDEX IF NOT EXISTS idx_tracks_artist_id ON tracks(artist, id);"
+    "CREATE INDEX IF NOT EXISTS idx_tracks_album_id ON tracks(album, id);"
+    "CREATE INDEX IF NOT EXISTS idx_tracks_rating_id ON tracks(rating, id);";
+
+// v4: зведення по артистах і альбомах (альбом = пара album + artist), ведуться тригерами.
+// Вкладки груп і топи читають O(груп) рядків замість GROUP BY по всіх треках.
+static const char* MIGRATION_4_TABLES_SQL =
+    "CREATE TABLE IF NOT EXISTS artists (name TEXT PRIMARY KEY, track_count INTEGER NOT NULL DEFAULT 0, "
+    "rated_count INTEGER NOT NULL DEFAULT 0, rating_sum REAL NOT NULL DEFAULT 0, cover_path TEXT) WITHOUT ROWID;"
+    "CREATE TABLE IF NOT EXISTS albums (album TEXT, artist TEXT, track_count INTEGER NOT NULL DEFAULT 0, "
+    "rated_count INTEGER NOT NULL DEFAULT 0, rating_sum REAL NOT NULL DEFAULT 0, cover_path TEXT, "
+    "PRIMARY KEY (album, artist)) WITHOUT ROWID;"
+    "CREATE INDEX IF NOT EXISTS idx_albums_artist ON albums(artist, album);"
+    "DELETE FROM artists; DELETE FROM albums;"
+    "INSERT INTO artists SELECT artist, COUNT(*), SUM(rating > 0), TOTAL(CASE WHEN rating > 0 THEN rating END), MIN(path) "
+    "FROM tracks GROUP BY artist;"
+    "INSERT INTO albums SELECT album, artist, COUNT(*), SUM(rating > 0), TOTAL(CASE WHEN rating > 0 THEN rating END), MIN(path) "
+    "FROM tracks GROUP BY album, artist;";
+
+// Внесок рядка r ("new"/"old") у зведення. Обкладинка групи - трек з найменшим шляхом, як було з MIN(path).
+static std::string aggregateAddSql(const std::string& r) {
+    std::string rated = "(" + r + ".rating > 0)", sum = "(CASE WHEN " + r + ".rating > 0 THEN " + r + ".rating ELSE 0 END)";
+    return "INSERT INTO artists VALUES (" + r + ".artist, 1, " + rated + ", " + sum + ", " + r + ".path) "
+        "ON CONFLICT(name) DO UPDATE SET track_count = track_count + 1, rated_count = rated_count + excluded.rated_count, "
+        "rating_sum = rating_sum + excluded.rating_sum, cover_path = MIN(cover_path, excluded.cover_path); "
+        "INSERT INTO albums VALUES (" + r + ".album, " + r + ".artist, 1, " + rated + ", " + sum + ", " + r + ".path) "
+        "ON CONFLICT(album, artist) DO UPDATE SET track_count = track_count + 1, rated_count = rated_count + excluded.rated_count, "
+        "rating_sum = rating_sum + excluded.rating_sum, cover_path = MIN(cover_path, excluded.cover_path); ";
+}
+
+static std::string aggregateRemoveSql(const std::string& r) {
+    std::string rated = "(" + r + ".rating > 0)", sum = "(CASE WHEN " + r + ".rating > 0 THEN " + r + ".rating ELSE 0 END)";
+    std::string artist = "name = " + r + ".artist", album = "album = " + r + ".album AND artist = " + r + ".artist";
+    return "UPDATE artists SET track_count = track_count - 1, rated_count = rated_count - " + rated + ", "
+        "rating_sum = rating_sum - " + sum + " WHERE " + artist + "; "
+        "DELETE FROM artists WHERE " + artist + " AND track_count <= 0; "
+        "UPDATE artists SET cover_path = (SELECT MIN(path) FROM tracks WHERE artist = " + r + ".artist) "
+        "WHERE " + artist + " AND cover_path = " + r + ".path; "
+        "UPDATE albums SET track_count = track_count - 1, rated_count = rated_count - " + rated + ", "
+        "rating_sum = rating_sum - " + sum + " WHERE " + album + "; "
+        "DELETE FROM albums WHERE " + album + " AND track_count <= 0; "
+        "UPDATE albums SET cover_path = (SELECT MIN(path) FROM tracks WHERE album = " + r + ".album AND artist = " + r + ".artist) "
+        "WHERE " + album + " AND cover_path = " + r + ".path; ";
+}
+
+static std::string aggregateDeleteTriggerSql() {
+    return "CREATE TRIGGER IF NOT EXISTS tracks_agg_ad AFTER DELETE ON tracks BEGIN " + aggregateRemoveSql("old") + "END;";
+}
+
+static std::string aggregateTriggersSql() {
+    return "CREATE TRIGGER IF NOT EXISTS tracks_agg_ai AFTER INSERT ON tracks BEGIN " + aggregateAddSql("new") + "END;"
+        + aggregateDeleteTriggerSql() +
+        "CREATE TRIGGER IF NOT EXISTS tracks_agg_au AFTER UPDATE OF path, artist, album, rating ON tracks BEGIN "
+        + aggregateRemoveSql("old") + aggregateAddSql("new") + "END;";
+}
+
+// v5: зміна лише оцінки не переносить трек між групами - досить поправити rated_count і rating_sum.
+// Повне "видалити + додати" лишається для змін шляху, артиста чи альбому (і не спрацьовує на незмінних тегах).
+static std::string ratingDeltaSql(const std::string& table, const std::string& where) {
+    return "UPDATE " + table + " SET rated_count = rated_count - (old.rating > 0) + (new.rating > 0), "
+        "rating_sum = rating_sum - (CASE WHEN old.rating > 0 THEN old.rating ELSE 0 END) "
+        "+ (CASE WHEN new.rating > 0 THEN new.rating ELSE 0 END) WHERE " + where + "; ";
+}
+
+static std::string migration5Sql() {
+    std::string same = "old.path IS new.path AND old.artist IS new.artist AND old.album IS new.album";
+    return "DROP TRIGGER IF EXISTS tracks_agg_au;"
+        "CREATE TRIGGER tracks_agg_au AFTER UPDATE OF path, artist, album, rating ON tracks WHEN NOT (" + same + ") BEGIN "
+        + aggregateRemoveSql("old") + aggregateAddSql("new") + "END;"
+        "CREATE TRIGGER IF NOT EXISTS tracks_agg_rating AFTER UPDATE OF rating ON tracks "
+        "WHEN " + same + " AND old.rating IS NOT new.rating BEGIN "
+        + ratingDeltaSql("artists", "name = new.artist") + ratingDeltaSql("albums", "album = new.album AND artist = new.artist") + "END;";
+}
+
+// v6: лічильник змін tracks - ним Python звіряє знімок бібліотеки (library_snapshot.py)
+static const char* MIGRATION_6_SQL =
+    "CREATE TABLE IF NOT EXISTS library_state (id INTEGER PRIMARY KEY CHECK (id = 1), changes INTEGER NOT NULL DEFAULT 0);"
+    "INSERT OR IGNORE INTO library_state (id, changes) VALUES (1, 0);"
+    "CREATE TRIGGER IF NOT EXISTS tracks_changes_ai AFTER INSERT ON tracks BEGIN UPDATE library_state SET changes = changes + 1 WHERE id = 1; END;"
+    "CREATE TRIGGER IF NOT EXISTS tracks_changes_ad AFTER DELETE ON tracks BEGIN UPDATE library_state SET changes = changes + 1 WHERE id = 1; END;"
+    "CREATE TRIGGER IF NOT EXISTS tracks_changes_au AFTER UPDATE ON tracks BEGIN UPDATE library_state SET changes = changes + 1 WHERE id = 1; END;";
+
+// Повнотекстовий пошук: зовнішній FTS5-індекс над tracks, синхронізується тригерами.
+// Не міграція - FTS5 може бути відсутній у збірці sqlite (потрібен -DSQLITE_ENABLE_FTS5),
+// тоді пошук лишається на LIKE, а тригери знімаються, щоб записи в tracks не падали.
+static const char* FTS_CREATE_SQL =
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts USING fts5("
+    "title, artist, album, genre, content='tracks', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')";
+
+static const char* FTS_TRIGGERS_SQL =
+    "CREATE TRIGGER IF NOT EXISTS tracks_fts_ai AFTER INSERT ON tracks BEGIN "
+    "INSERT INTO tracks_fts(rowid, title, artist, album, genre) VALUES (new.id, new.title, new.artist, new.album, new.genre); END;"
+    "CREATE TRIGGER IF NOT EXISTS tracks_fts_ad AFTER DELETE ON tracks BEGIN "
+    "INSERT INTO tracks_fts(tracks_fts, rowid, title, artist, album, genre) VALUES ('delete', old.id, old.title, old.artist, old.album, old.genre); END;"
+    "CREATE TRIGGER IF NOT EXISTS tracks_fts_au AFTER UPDATE OF title, artist, album, genre ON tracks BEGIN "
+    "INSERT INTO tracks_fts(tracks_fts, rowid, title, artist, album, genre) VALUES ('delete', old.id, old.title, old.artist, old.album, old.genre); "
+    "INSERT INTO tracks_fts(rowid, title, artist, album, genre) VALUES (new.id, new.title, new.artist, new.album, new.genre); END;";
+
+static const char* FTS_DROP_TRIGGERS_SQL =
+    "DROP TRIGGER IF EXISTS tracks_fts_ai; DROP TRIGGER IF EXISTS tracks_fts_ad; DROP TRIGGER IF EXISTS tracks_fts_au;";
+
+// bm25: збіг у назві важить більше, ніж в артисті, альбомі чи жанрі.
+// Спершу ранжуємо лише rowid, і тільки найкращі 2000 з'єднуються з tracks.
+static const char* FTS_SEARCH_SQL =
+    "SELECT " TRACK_COLUMNS " FROM (SELECT rowid, bm25(tracks_fts, 10.0, 5.0, 3.0, 1.0) AS score FROM tracks_fts "
+    "WHERE tracks_fts MATCH ? ORDER BY score LIMIT 2000) AS hits JOIN tracks ON tracks.id = hits.rowid ORDER BY hits.score";
+
+static const char* LIKE_SEARCH_SQL =
+    "SELECT " TRACK_COLUMNS " FROM tracks WHERE title LIKE ?1 OR artist LIKE ?1 OR album LIKE ?1 OR genre LIKE ?1";
+
+// "ac/dc bla" -> "ac/dc"* "bla"* : кожне слово - префікс, всі слова мають збігтися
+static std::string ftsMatchExpr(const char* query) {
+    std::string expr, word;
+    for (const char* c = query;; c++) {
+        if (*c && !isspace((unsigned char)*c)) {
+            if (*c == '"') word += '"';
+            word += *c;
+            continue;
+        }
+        if (!word.empty()) {
+            if (!expr.empty()) expr += ' ';
+            expr += '"' + word + "\"*";
+            word.clear();
+        }
+        if (!*c) break;
+    }
+    return expr;
+}
 
 // ==========================================
 // МЕНЕДЖЕР БІБЛІОТЕКИ
@@ -108,6 +319,10 @@ private:
     sqlite3_stmt* cursor_stmt;
     sqlite3_stmt* group_stmt;
     sqlite3_stmt* top_stmt;
+    sqlite3_stmt* stamp_stmt;
+    int cursor_state, group_state, top_state;
+    bool has_fts;
+    std::map<std::string, sqlite3_stmt*> stmt_cache;  // один підготовлений запит на форму запиту
     
     bool is_shuffle;
     bool is_repeat;
@@ -115,50 +330,256 @@ private:
     IAudioPlayer* player;
 
 public:
-    LibraryManager() : db(nullptr), cursor_stmt(nullptr), group_stmt(nullptr), top_stmt(nullptr), is_shuffle(false), is_repeat(false) {
+    LibraryManager() : db(nullptr), cursor_stmt(nullptr), group_stmt(nullptr), top_stmt(nullptr), stamp_stmt(nullptr), has_fts(false),
+        cursor_state(PACK_READY), group_state(PACK_READY), top_state(PACK_READY), is_shuffle(false), is_repeat(false) {
+#ifdef _WIN32
         player = new WindowsAudioPlayer();
+#else
+        player = new SilentAudioPlayer();
+#endif
         initDB();
     }
 
     ~LibraryManager() {
+        for (auto& it : stmt_cache) sqlite3_finalize(it.second);
         if (db) sqlite3_close(db);
         delete player;
     }
 
     void initDB() {
         if (sqlite3_open("music_library.db", &db)) return;
-        const char* sql = 
-            "CREATE TABLE IF NOT EXISTS tracks ("
-            "id INTEGER PRIMARY KEY, path TEXT UNIQUE, title TEXT, artist TEXT, "
-            "album TEXT, genre TEXT, duration REAL, rating REAL DEFAULT 0, "
-            "rate_melody INTEGER DEFAULT 0, rate_rhythm INTEGER DEFAULT 0, "
-            "rate_vocals INTEGER DEFAULT 0, rate_lyrics INTEGER DEFAULT 0, "
-            "rate_arrange INTEGER DEFAULT 0, has_vocals INTEGER DEFAULT 1, has_lyrics INTEGER DEFAULT 1)";
-        char* errMsg;
-        sqlite3_exec(db, sql, 0, 0, &errMsg);
+        sqlite3_exec(db, PRAGMAS_SQL, 0, 0, 0);
+        sqlite3_exec(db, CREATE_TRACKS_SQL, 0, 0, 0);
+        migrate();
+        ensureSearchIndex();
         srand(time(0));
     }
 
+    // --- Schema Migrations ---
+    int schemaVersion() {
+        sqlite3_stmt* st;
+        int version = 0;
+        if (sqlite3_prepare_v2(db, "PRAGMA user_version", -1, &st, 0) == SQLITE_OK) {
+            if (sqlite3_step(st) == SQLITE_ROW) version = sqlite3_column_int(st, 0);
+            sqlite3_finalize(st);
+        }
+        return version;
+    }
+
+    void migrate() {
+        int version = schemaVersion();
+        bool changed = false;
+        while (version < SCHEMA_VERSION) {
+            sqlite3_exec(db, "BEGIN TRANSACTION", 0, 0, 0);
+            if (!applyMigration(version + 1)) {
+                sqlite3_exec(db, "ROLLBACK", 0, 0, 0);
+                break;
+            }
+            version++;
+            std::string set_version = "PRAGMA user_version = " + std::to_string(version);
+            sqlite3_exec(db, set_version.c_str(), 0, 0, 0);
+            sqlite3_exec(db, "COMMIT", 0, 0, 0);
+            changed = true;
+        }
+        if (changed) sqlite3_exec(db, "ANALYZE", 0, 0, 0);
+    }
+
+    bool applyMigration(int version) {
+        switch (version) {
+        case 1: // відбитки файлів для інкрементального сканування (бази, створені до них)
+            if (!hasColumn("tracks", "size") && sqlite3_exec(db, "ALTER TABLE tracks ADD COLUMN size INTEGER DEFAULT 0", 0, 0, 0) != SQLITE_OK) return false;
+            if (!hasColumn("tracks", "mtime") && sqlite3_exec(db, "ALTER TABLE tracks ADD COLUMN mtime REAL DEFAULT 0", 0, 0, 0) != SQLITE_OK) return false;
+            return true;
+        case 2:
+            return sqlite3_exec(db, MIGRATION_2_SQL, 0, 0, 0) == SQLITE_OK;
+        case 3:
+            return sqlite3_exec(db, MIGRATION_3_SQL, 0, 0, 0) == SQLITE_OK;
+        case 4:
+            return sqlite3_exec(db, MIGRATION_4_TABLES_SQL, 0, 0, 0) == SQLITE_OK
+                && sqlite3_exec(db, aggregateTriggersSql().c_str(), 0, 0, 0) == SQLITE_OK;
+        case 5:
+            return sqlite3_exec(db, migration5Sql().c_str(), 0, 0, 0) == SQLITE_OK;
+        case 6:
+            return sqlite3_exec(db, MIGRATION_6_SQL, 0, 0, 0) == SQLITE_OK;
+        case 7: // id обкладинки; NULL - файл ще не читався з v7, '' - обкладинки немає
+            return hasColumn("tracks", "cover") || sqlite3_exec(db, "ALTER TABLE tracks ADD COLUMN cover TEXT", 0, 0, 0) == SQLITE_OK;
+        }
+        return false;
+    }
+
+    // --- Full-Text Search Index ---
+    bool tableExists(const char* type, const char* name) {
+        sqlite3_stmt* st = cachedStmt("SELECT 1 FROM sqlite_master WHERE type = ? AND name = ?");
+        if (!st) return false;
+        sqlite3_bind_text(st, 1, type, -1, SQLITE_STATIC);
+        sqlite3_bind_text(st, 2, name, -1, SQLITE_STATIC);
+        bool found = sqlite3_step(st) == SQLITE_ROW;
+        sqlite3_reset(st);
+        return found;
+    }
+
+    void ensureSearchIndex() {
+        sqlite3_stmt* probe;
+        has_fts = sqlite3_prepare_v2(db, "SELECT fts5(NULL)", -1, &probe, 0) == SQLITE_OK;
+        sqlite3_finalize(probe);
+        if (!has_fts) {
+            sqlite3_exec(db, FTS_DROP_TRIGGERS_SQL, 0, 0, 0);
+            return;
+        }
+        // Індекс новий або пропускав зміни (тригери знімала збірка без FTS5) - перебудовуємо
+        if (tableExists("trigger", "tracks_fts_ai") && tableExists("table", "tracks_fts")) return;
+        sqlite3_exec(db, "BEGIN TRANSACTION", 0, 0, 0);
+        bool ok = sqlite3_exec(db, FTS_CREATE_SQL, 0, 0, 0) == SQLITE_OK
+            && sqlite3_exec(db, FTS_TRIGGERS_SQL, 0, 0, 0) == SQLITE_OK
+            && sqlite3_exec(db, "INSERT INTO tracks_fts(tracks_fts) VALUES ('rebuild')", 0, 0, 0) == SQLITE_OK;
+        sqlite3_exec(db, ok ? "COMMIT" : "ROLLBACK", 0, 0, 0);
+        has_fts = ok;
+    }
+
+    // Кешований підготовлений запит: готується один раз, далі лише reset + нові параметри
+    sqlite3_stmt* cachedStmt(const std::string& sql) {
+        auto it = stmt_cache.find(sql);
+        if (it != stmt_cache.end()) {
+            sqlite3_reset(it->second);
+            sqlite3_clear_bindings(it->second);
+            return it->second;
+        }
+        sqlite3_stmt* st = nullptr;
+        if (sqlite3_prepare_v2(db, sql.c_str(), -1, &st, 0) != SQLITE_OK) return nullptr;
+        stmt_cache[sql] = st;
+        return st;
+    }
+
+    bool hasColumn(const char* table, const char* column) {
+        std::string sql = "PRAGMA table_info(" + std::string(table) + ")";
+        sqlite3_stmt* st;
+        bool found = false;
+        if (sqlite3_prepare_v2(db, sql.c_str(), -1, &st, 0) == SQLITE_OK) {
+            while (sqlite3_step(st) == SQLITE_ROW) {
+                const char* name = (const char*)sqlite3_column_text(st, 1);
+                if (name && strcmp(name, column) == 0) { found = true; break; }
+            }
+            sqlite3_finalize(st);
+        }
+        return found;
+    }
+
     void clearDatabase() {
         if (!db) return;
         char* errMsg;
-        sqlite3_exec(db, "DELETE FROM tracks", 0, 0, &errMsg);
+        // DELETE FROM tracks запускає тригери на кожен рядок: перерахунок зведень на цей час знімається,
+        // самі зведення просто спорожнюються (CLEAR_SQL у schema.py)
+        std::string sql = "BEGIN TRANSACTION; DROP TRIGGER IF EXISTS tracks_agg_ad; DELETE FROM tracks; DELETE FROM artists; "
+            "DELETE FROM albums; " + aggregateDeleteTriggerSql() + "COMMIT;";
+        if (sqlite3_exec(db, sql.c_str(), 0, 0, &errMsg) != SQLITE_OK) {
+            sqlite3_free(errMsg);
+            sqlite3_exec(db, "ROLLBACK", 0, 0, 0);
+        }
         sqlite3_exec(db, "VACUUM", 0, 0, &errMsg);
     }
 
     bool addTrack(TrackData* t) {
         if (!db) return false;
-        const char* sql = "INSERT OR IGNORE INTO tracks (path, title, artist, album, genre, duration) VALUES (?, ?, ?, ?, ?, ?)";
-        sqlite3_stmt* stmt;
-        if (sqlite3_prepare_v2(db, sql, -1, &stmt, 0) == SQLITE_OK) {
+        sqlite3_stmt* stmt = cachedStmt(UPSERT_SQL);
+        if (stmt) {
             sqlite3_bind_text(stmt, 1, t->path, -1, SQLITE_STATIC);
             sqlite3_bind_text(stmt, 2, t->title, -1, SQLITE_STATIC);
             sqlite3_bind_text(stmt, 3, t->artist, -1, SQLITE_STATIC);
             sqlite3_bind_text(stmt, 4, t->album, -1, SQLITE_STATIC);
             sqlite3_bind_text(stmt, 5, t->genre, -1, SQLITE_STATIC);
             sqlite3_bind_double(stmt, 6, t->duration);
+            sqlite3_bind_int64(stmt, 7, t->size);
+            sqlite3_bind_double(stmt, 8, t->mtime);
+            sqlite3_bind_text(stmt, 9, t->cover, -1, SQLITE_STATIC);
             sqlite3_step(stmt);
-            sqlite3_finalize(stmt);
+            sqlite3_reset(stmt);
+            return true;
+        }
+        return false;
+    }
+
+    // Пачки пишуться без власної транзакції - її відкриває той, хто викликає
+    int writeTracks(TrackData* tracks, int count) {
+        if (!tracks || count <= 0) return 0;
+        sqlite3_stmt* stmt = cachedStmt(UPSERT_SQL);
+        if (!stmt) return 0;
+        int written = 0;
+        for (int i = 0; i < count; i++) {
+            TrackData* t = &tracks[i];
+            sqlite3_bind_text(stmt, 1, t->path, -1, SQLITE_STATIC);
+            sqlite3_bind_text(stmt, 2, t->title, -1, SQLITE_STATIC);
+            sqlite3_bind_text(stmt, 3, t->artist, -1, SQLITE_STATIC);
+            sqlite3_bind_text(stmt, 4, t->album, -1, SQLITE_STATIC);
+            sqlite3_bind_text(stmt, 5, t->genre, -1, SQLITE_STATIC);
+            sqlite3_bind_double(stmt, 6, t->duration);
+            sqlite3_bind_int64(stmt, 7, t->size);
+            sqlite3_bind_double(stmt, 8, t->mtime);
+            sqlite3_bind_text(stmt, 9, t->cover, -1, SQLITE_STATIC);
+            if (sqlite3_step(stmt) == SQLITE_DONE) written += sqlite3_changes(db);
+            sqlite3_reset(stmt);
+        }
+        return written;
+    }
+
+    int removeTracks(char** paths, int count, const char* sql) {
+        if (!paths || count <= 0) return 0;
+        sqlite3_stmt* stmt = cachedStmt(sql);
+        if (!stmt) return 0;
+        int removed = 0;
+        for (int i = 0; i < count; i++) {
+            sqlite3_bind_text(stmt, 1, paths[i], -1, SQLITE_STATIC);
+            if (sqlite3_step(stmt) == SQLITE_DONE) removed += sqlite3_changes(db);
+            sqlite3_reset(stmt);
+        }
+        return removed;
+    }
+
+    // Пачка треків в одній транзакції з одним підготовленим запитом
+    int addTracksBulk(TrackData* tracks, int count) {
+        if (!db) return 0;
+        sqlite3_exec(db, "BEGIN TRANSACTION", 0, 0, 0);
+        int written = writeTracks(tracks, count);
+        sqlite3_exec(db, "COMMIT", 0, 0, 0);
+        return written;
+    }
+
+    // Зниклі файли видаляються однією транзакцією
+    int deleteTracksBulk(char** paths, int count) {
+        if (!db) return 0;
+        sqlite3_exec(db, "BEGIN TRANSACTION", 0, 0, 0);
+        int removed = removeTracks(paths, count, "DELETE FROM tracks WHERE path = ?");
+        sqlite3_exec(db, "COMMIT", 0, 0, 0);
+        return removed;
+    }
+
+    // Пачка від вотчера: нові/змінені файли, видалені файли і видалені папки - одна транзакція.
+    // Спершу видалення: тека, винесена і повернута в межах пачки, не має зникнути разом з новими записами
+    int applyChanges(TrackData* tracks, int count, char** removed, int removed_count, char** removed_dirs, int dirs_count) {
+        if (!db) return 0;
+        sqlite3_exec(db, "BEGIN TRANSACTION", 0, 0, 0);
+        int total = removeTracks(removed_dirs, dirs_count, "DELETE FROM tracks WHERE substr(path, 1, length(?1)) = ?1");
+        total += removeTracks(removed, removed_count, "DELETE FROM tracks WHERE path = ?");
+        total += writeTracks(tracks, count);
+        sqlite3_exec(db, "COMMIT", 0, 0, 0);
+        return total;
+    }
+
+    // --- File Fingerprints (incremental rescan) ---
+    void prepareFingerprints(const char* root) {
+        if (!db) return;
+        // Трек без cover (база до v7) віддає розмір -1: сканер перечитає файл разом з обкладинкою
+        stamp_stmt = cachedStmt("SELECT path, CASE WHEN cover IS NULL THEN -1 ELSE size END, mtime FROM tracks WHERE substr(path, 1, length(?1)) = ?1");
+        // length() рахує символи, як і substr - strlen дав би байти UTF-8 і не-ASCII корінь ніколи б не збігся
+        if (stamp_stmt) sqlite3_bind_text(stamp_stmt, 1, root, -1, SQLITE_TRANSIENT);
+    }
+
+    bool fetchFingerprint(FileStamp* f) {
+        if (!stamp_stmt) return false;
+        if (sqlite3_step(stamp_stmt) == SQLITE_ROW) {
+            const char* p = (const char*)sqlite3_column_text(stamp_stmt, 0);
+            strcpy(f->path, p ? p : "");
+            f->size = sqlite3_column_int64(stamp_stmt, 1);
+            f->mtime = sqlite3_column_double(stamp_stmt, 2);
             return true;
         }
         return false;
@@ -167,34 +588,75 @@ public:
     // --- Basic Query ---
     void prepareQuery(char* sort_col, char* order, char* filter_col, char* filter_val) {
         if (!db) return;
-        if (cursor_stmt) sqlite3_finalize(cursor_stmt);
+        cursor_state = PACK_READY;
         
-        std::string sql = "SELECT * FROM tracks";
+        std::string sql = "SELECT " TRACK_COLUMNS " FROM tracks";
         if (filter_col != NULL && strlen(filter_col) > 0) {
             sql += " WHERE ";
             sql += filter_col;
             sql += " = ?";
         }
+        // id - та сама друга клавіша, що в preparePage і знімку: рівні значення не міняються місцями між запитами
         sql += " ORDER BY ";
         sql += sort_col;
         sql += " ";
         sql += order;
+        sql += ", id ";
+        sql += order;
         
-        if (sqlite3_prepare_v2(db, sql.c_str(), -1, &cursor_stmt, 0) == SQLITE_OK) {
+        cursor_stmt = cachedStmt(sql);
+        if (cursor_stmt) {
             if (filter_col != NULL && strlen(filter_col) > 0) {
-                sqlite3_bind_text(cursor_stmt, 1, filter_val, -1, SQLITE_STATIC);
+                sqlite3_bind_text(cursor_stmt, 1, filter_val, -1, SQLITE_TRANSIENT);
             }
         }
     }
 
+    // Keyset-сторінка: рядки строго після (after_val, after_id) у порядку (sort_col, id).
+    // after_val == NULL - перша сторінка. OFFSET не потрібен, тож будь-яка сторінка - це seek по індексу.
+    void preparePage(char* sort_col, char* order, char* filter_col, char* filter_val, char* after_val, int after_id, int limit) {
+        if (!db) return;
+        cursor_state = PACK_READY;
+        bool desc = order != NULL && strcmp(order, "DESC") == 0;
+        bool filtered = filter_col != NULL && strlen(filter_col) > 0;
+        std::string col = sort_col;
+
+        std::string sql = "SELECT " TRACK_COLUMNS " FROM tracks";
+        std::string where;
+        if (filtered) where += filter_col + std::string(" = ?");
+        if (after_val != NULL) {
+            if (!where.empty()) where += " AND ";
+            where += "(" + col + ", id) " + (desc ? "<" : ">") + " (?, ?)";
+        }
+        if (!where.empty()) sql += " WHERE " + where;
+        sql += " ORDER BY " + col + (desc ? " DESC, id DESC" : " ASC, id ASC") + " LIMIT ?";
+
+        cursor_stmt = cachedStmt(sql);
+        if (!cursor_stmt) return;
+        int i = 1;
+        if (filtered) sqlite3_bind_text(cursor_stmt, i++, filter_val, -1, SQLITE_TRANSIENT);
+        if (after_val != NULL) {
+            // Курсор приходить текстом; числові колонки порівнюються як числа
+            if (col == "duration" || col == "rating" || col == "id") sqlite3_bind_double(cursor_stmt, i++, atof(after_val));
+            else sqlite3_bind_text(cursor_stmt, i++, after_val, -1, SQLITE_TRANSIENT);
+            sqlite3_bind_int(cursor_stmt, i++, after_id);
+        }
+        sqlite3_bind_int(cursor_stmt, i, limit);
+    }
+
     void prepareSearch(const char* query) {
         if (!db) return;
-        if (cursor_stmt) sqlite3_finalize(cursor_stmt);
-        std::string sql = "SELECT * FROM tracks WHERE title LIKE ? OR artist LIKE ?";
-        if (sqlite3_prepare_v2(db, sql.c_str(), -1, &cursor_stmt, 0) == SQLITE_OK) {
+        cursor_state = PACK_READY;
+        std::string expr = ftsMatchExpr(query);
+        if (has_fts && !expr.empty()) {
+            cursor_stmt = cachedStmt(FTS_SEARCH_SQL);
+            if (cursor_stmt) sqlite3_bind_text(cursor_stmt, 1, expr.c_str(), -1, SQLITE_TRANSIENT);
+            return;
+        }
+        cursor_stmt = cachedStmt(LIKE_SEARCH_SQL);
+        if (cursor_stmt) {
             std::string q_str = "%" + std::string(query) + "%";
             sqlite3_bind_text(cursor_stmt, 1, q_str.c_str(), -1, SQLITE_TRANSIENT);
-            sqlite3_bind_text(cursor_stmt, 2, q_str.c_str(), -1, SQLITE_TRANSIENT);
         }
     }
 
@@ -217,57 +679,132 @@ public:
             t->rate_arrange = sqlite3_column_int(cursor_stmt, 12);
             t->has_vocals = sqlite3_column_int(cursor_stmt, 13);
             t->has_lyrics = sqlite3_column_int(cursor_stmt, 14);
+            const char* cover = (const char*)sqlite3_column_text(cursor_stmt, 15);
+            snprintf(t->cover, sizeof(t->cover), "%s", cover ? cover : "");
+            t->size = sqlite3_column_int64(cursor_stmt, 16);
+            t->mtime = sqlite3_column_double(cursor_stmt, 17);
             return true;
         }
         return false;
     }
 
-    // --- Top Charts ---
-    void prepareAdvancedTop(int entity_type, int order_mode) {
-        if (!db) return;
-        if (top_stmt) sqlite3_finalize(top_stmt);
-        
-        std::string sql;
-        std::string order = (order_mode == 1) ? "DESC" : "ASC";
-        
-        if (entity_type == 0) { // TRACKS
-            sql = "SELECT title, artist, rating, path, 0 FROM tracks WHERE rating > 0 ORDER BY rating " + order + " LIMIT 10";
-        } else if (entity_type == 1) { // ALBUMS
-            sql = "SELECT album, artist, AVG(rating), MIN(path), 1 FROM tracks WHERE rating > 0 GROUP BY album ORDER BY AVG(rating) " + order + " LIMIT 10";
-        } else if (entity_type == 2) { // ARTISTS
-            sql = "SELECT artist, '', AVG(rating), MIN(path), 2 FROM tracks WHERE rating > 0 GROUP BY artist ORDER BY AVG(rating) " + order + " LIMIT 10";
+    // --- Packed Batch Fetch ---
+    // Заповнює buf рядками курсора, скільки влізе. Повертає кількість байтів (0 = кінець),
+    // або -N, якщо навіть один рядок не вміщається і потрібен буфер на N байтів.
+    // Рядок, що не вліз, не втрачається: наступний виклик почне з нього (PACK_CARRY).
+    // REAL віддається з 17 значущими цифрами: sqlite3_column_text дає 15, і курсор сторінки
+    // (duration, rating), прочитаний з тексту, вже не збігається з тим, що лежить у базі
+    static const char* columnText(sqlite3_stmt* stmt, int c, char* num, int* n) {
+        if (sqlite3_column_type(stmt, c) == SQLITE_FLOAT) {
+            *n = snprintf(num, 32, "%.17g", sqlite3_column_double(stmt, c));
+            return num;
         }
-        sqlite3_prepare_v2(db, sql.c_str(), -1, &top_stmt, 0);
+        const char* val = (const char*)sqlite3_column_text(stmt, c);
+        *n = sqlite3_column_bytes(stmt, c);
+        return val;
     }
 
-    bool fetchTopItem(TopItemData* item) {
-        if (!top_stmt) return false;
-        if (sqlite3_step(top_stmt) == SQLITE_ROW) {
-            strcpy(item->name, (const char*)sqlite3_column_text(top_stmt, 0));
-            strcpy(item->secondary, (const char*)sqlite3_column_text(top_stmt, 1));
-            item->rating = sqlite3_column_double(top_stmt, 2);
-            strcpy(item->cover_path, (const char*)sqlite3_column_text(top_stmt, 3));
-            item->type = sqlite3_column_int(top_stmt, 4);
-            return true;
+    int packRows(sqlite3_stmt* stmt, int& state, char* buf, int cap, int* rows) {
+        *rows = 0;
+        if (!stmt || state == PACK_DONE) return 0;
+        int used = 0;
+        while (true) {
+            if (state != PACK_CARRY && sqlite3_step(stmt) != SQLITE_ROW) {
+                state = PACK_DONE;  // повторний step після DONE перезапустив би запит
+                break;
+            }
+            state = PACK_READY;
+            int cols = sqlite3_column_count(stmt);
+            int need = 0;
+            char num[32];
+            for (int c = 0; c < cols; c++) {
+                int n;
+                columnText(stmt, c, num, &n);
+                need += n + 1;
+            }
+            if (used + need > cap) {
+                state = PACK_CARRY;
+                return (*rows == 0) ? -need : used;
+            }
+            for (int c = 0; c < cols; c++) {
+                int n;
+                const char* val = columnText(stmt, c, num, &n);
+                if (val && n) memcpy(buf + used, val, n);
+                used += n;
+                buf[used++] = (c == cols - 1) ? ROW_SEP : FIELD_SEP;
+            }
+            (*rows)++;
+        }
+        return used;
+    }
+
+    int fetchTracksPacked(char* buf, int cap, int* rows) { return packRows(cursor_stmt, cursor_state, buf, cap, rows); }
+    int fetchGroupsPacked(char* buf, int cap, int* rows) { return packRows(group_stmt, group_state, buf, cap, rows); }
+    int fetchTopPacked(char* buf, int cap, int* rows) { return packRows(top_stmt, top_state, buf, cap, rows); }
+
+    // --- Charts (дзеркало - chart_sql у Backend/Database/sqlite_engine.py) ---
+    // entity: 0 - треки (повні рядки в cursor_stmt), 1 - альбоми, 2 - артисти, 3 - жанри (у top_stmt).
+    // Групи ранжуються баєсовою оцінкою (сума + prior * середнє) / (кількість + prior).
+    // ORDER BY ... LIMIT sqlite виконує обмеженим сортером (у пам'яті лише N рядків); чарт треків за rating
+    // іде індексом idx_tracks_rating_id, групи за rating читають зведення artists / albums.
+    void prepareChart(int entity, const char* col, const char* flag, bool desc, double prior, int limit) {
+        if (!db || !col) return;
+        std::string c = col;
+        std::string order = desc ? "DESC" : "ASC";
+        std::string rated = c + " > 0" + (flag && *flag ? std::string(" AND ") + flag + " = 1" : "");
+        if (entity == 0) {
+            cursor_state = PACK_READY;
+            cursor_stmt = cachedStmt("SELECT " TRACK_COLUMNS " FROM tracks WHERE " + rated +
+                                     " ORDER BY " + c + " " + order + ", id " + order + " LIMIT ?2");
+            if (cursor_stmt) {
+                sqlite3_bind_double(cursor_stmt, 1, prior);
+                sqlite3_bind_int(cursor_stmt, 2, limit);
+            }
+            return;
+        }
+        std::string groups, mean;
+        if (c == "rating" && entity == 2) {
+            groups = "SELECT name, '' AS secondary, rating_sum AS total, rated_count AS rated, cover_path FROM artists WHERE rated_count > 0";
+        } else if (c == "rating" && entity == 1) {
+            groups = "SELECT album AS name, artist AS secondary, SUM(rating_sum) AS total, SUM(rated_count) AS rated, "
+                     "MIN(cover_path) AS cover_path FROM albums WHERE rated_count > 0 GROUP BY album";
+        } else {
+            std::string key = entity == 1 ? "album" : entity == 2 ? "artist" : "genre";
+            std::string secondary = entity == 1 ? "artist" : "''";
+            groups = "SELECT " + key + " AS name, " + secondary + " AS secondary, SUM(" + c + ") AS total, COUNT(*) AS rated, "
+                     "MIN(path) AS cover_path FROM tracks WHERE " + rated + " GROUP BY " + key;
+            mean = "SELECT AVG(" + c + ") AS mean FROM tracks WHERE " + rated;
+        }
+        if (mean.empty()) mean = "SELECT SUM(rating_sum) / SUM(rated_count) AS mean FROM artists";
+        top_state = PACK_READY;
+        top_stmt = cachedStmt("SELECT name, secondary, (total + ?1 * p.mean) / (rated + ?1) AS score, rated, cover_path, "
+                              COVER_OF("g.cover_path") " FROM (" + groups + ") AS g, (" + mean + ") AS p "
+                              "ORDER BY score " + order + ", name LIMIT ?2");
+        if (top_stmt) {
+            sqlite3_bind_double(top_stmt, 1, prior);
+            sqlite3_bind_int(top_stmt, 2, limit);
         }
-        return false;
     }
 
     // --- Grouping & Navigation (NEW) ---
     void prepareGroupQuery(int mode) {
         if (!db) return;
-        if (group_stmt) sqlite3_finalize(group_stmt);
+        group_state = PACK_READY;
         std::string sql;
-        if (mode == 1) sql = "SELECT artist, '', COUNT(*), MIN(path) FROM tracks GROUP BY artist ORDER BY artist";
-        else sql = "SELECT album, artist, COUNT(*), MIN(path) FROM tracks GROUP BY album ORDER BY album";
-        sqlite3_prepare_v2(db, sql.c_str(), -1, &group_stmt, 0);
+        if (mode == 1) sql = "SELECT name, '', track_count, cover_path, " COVER_OF("artists.cover_path") " FROM artists ORDER BY name";
+        else sql = "SELECT album, artist, track_count, cover_path, " COVER_OF("g.cover_path") " FROM ("
+                   "SELECT album, artist, SUM(track_count) AS track_count, MIN(cover_path) AS cover_path FROM albums GROUP BY album"
+                   ") AS g ORDER BY album";
+        group_stmt = cachedStmt(sql);
     }
 
     void prepareAlbumsByArtist(const char* artist_name) {
         if (!db) return;
-        if (group_stmt) sqlite3_finalize(group_stmt);
-        std::string sql = "SELECT album, artist, COUNT(*), MIN(path) FROM tracks WHERE artist = ? GROUP BY album ORDER BY album";
-        if (sqlite3_prepare_v2(db, sql.c_str(), -1, &group_stmt, 0) == SQLITE_OK) {
+        group_state = PACK_READY;
+        std::string sql = "SELECT album, artist, track_count, cover_path, " COVER_OF("albums.cover_path")
+                          " FROM albums WHERE artist = ? ORDER BY album";
+        group_stmt = cachedStmt(sql);
+        if (group_stmt) {
             sqlite3_bind_text(group_stmt, 1, artist_name, -1, SQLITE_TRANSIENT);
         }
     }
@@ -288,11 +825,45 @@ public:
         return false;
     }
 
+    double getArtistRating(const char* artist) {
+        if (!db) return 0.0;
+        sqlite3_stmt* st = cachedStmt("SELECT rating_sum / rated_count FROM artists WHERE name = ? AND rated_count > 0");
+        if (!st) return 0.0;
+        sqlite3_bind_text(st, 1, artist, -1, SQLITE_TRANSIENT);
+        double rating = sqlite3_step(st) == SQLITE_ROW ? sqlite3_column_double(st, 0) : 0.0;
+        sqlite3_reset(st);
+        return rating;
+    }
+
     // --- Rating Update ---
+    static constexpr const char* UPDATE_RATING_SQL =
+        "UPDATE tracks SET rating=?, rate_melody=?, rate_rhythm=?, rate_vocals=?, rate_lyrics=?, rate_arrange=?, has_vocals=?, has_lyrics=? WHERE path=?";
+
+    // Пачка оцінок - одна транзакція і один підготовлений запит. Повертає кількість оновлених треків.
+    int updateRatingsBulk(RatingData* r, int count) {
+        if (!db) return 0;
+        sqlite3_stmt* st = cachedStmt(UPDATE_RATING_SQL);
+        if (!st) return 0;
+        int updated = 0;
+        sqlite3_exec(db, "BEGIN TRANSACTION", 0, 0, 0);
+        for (int i = 0; i < count; i++) {
+            sqlite3_bind_double(st, 1, r[i].rating);
+            sqlite3_bind_int(st, 2, r[i].rate_melody); sqlite3_bind_int(st, 3, r[i].rate_rhythm);
+            sqlite3_bind_int(st, 4, r[i].rate_vocals); sqlite3_bind_int(st, 5, r[i].rate_lyrics);
+            sqlite3_bind_int(st, 6, r[i].rate_arrange); sqlite3_bind_int(st, 7, r[i].has_vocals);
+            sqlite3_bind_int(st, 8, r[i].has_lyrics);
+            sqlite3_bind_text(st, 9, r[i].path, -1, SQLITE_STATIC);
+            if (sqlite3_step(st) == SQLITE_DONE) updated += sqlite3_changes(db);
+            sqlite3_reset(st);
+        }
+        sqlite3_exec(db, "COMMIT", 0, 0, 0);
+        return updated;
+    }
+
     bool updateRating(char* path, double avg, int mel, int rhy, int voc, int lyr, int arr, int h_voc, int h_lyr) {
         if (!db) return false;
-        sqlite3_stmt* st;
-        if (sqlite3_prepare_v2(db, "UPDATE tracks SET rating=?, rate_melody=?, rate_rhythm=?, rate_vocals=?, rate_lyrics=?, rate_arrange=?, has_vocals=?, has_lyrics=? WHERE path=?", -1, &st, 0) == SQLITE_OK) {
+        sqlite3_stmt* st = cachedStmt(UPDATE_RATING_SQL);
+        if (st) {
             sqlite3_bind_double(st, 1, avg);
             sqlite3_bind_int(st, 2, mel); sqlite3_bind_int(st, 3, rhy);
             sqlite3_bind_int(st, 4, voc); sqlite3_bind_int(st, 5, lyr);
@@ -300,7 +871,7 @@ public:
             sqlite3_bind_int(st, 8, h_lyr);
             sqlite3_bind_text(st, 9, path, -1, SQLITE_STATIC);
             sqlite3_step(st);
-            sqlite3_finalize(st);
+            sqlite3_reset(st);
             return true;
         }
         return false;
@@ -338,19 +909,29 @@ extern "C" {
     EXPORT void init_system() { if (!manager) manager = new LibraryManager(); }
     EXPORT void logic_clear_database() { if (manager) manager->clearDatabase(); }
     EXPORT bool logic_add_track(TrackData* t) { return manager ? manager->addTrack(t) : false; }
+    EXPORT int logic_add_tracks_bulk(TrackData* t, int n) { return manager ? manager->addTracksBulk(t, n) : 0; }
+    EXPORT int logic_delete_tracks_bulk(char** p, int n) { return manager ? manager->deleteTracksBulk(p, n) : 0; }
+    EXPORT int logic_apply_changes(TrackData* t, int n, char** r, int rn, char** d, int dn) { return manager ? manager->applyChanges(t, n, r, rn, d, dn) : 0; }
+    EXPORT void logic_prepare_fingerprints(char* root) { if (manager) manager->prepareFingerprints(root); }
+    EXPORT bool logic_fetch_fingerprint(FileStamp* f) { return manager ? manager->fetchFingerprint(f) : false; }
     
     EXPORT void logic_prepare_query(char* s, char* o, char* fc, char* fv) { if (manager) manager->prepareQuery(s, o, fc, fv); }
+    EXPORT void logic_prepare_page(char* s, char* o, char* fc, char* fv, char* av, int aid, int lim) { if (manager) manager->preparePage(s, o, fc, fv, av, aid, lim); }
     EXPORT void logic_search_tracks(char* q) { if (manager) manager->prepareSearch(q); }
     EXPORT bool logic_fetch_next(TrackData* t) { return manager ? manager->fetchNextTrack(t) : false; }
+    EXPORT int logic_fetch_tracks_packed(char* b, int cap, int* rows) { return manager ? manager->fetchTracksPacked(b, cap, rows) : 0; }
+    EXPORT int logic_fetch_groups_packed(char* b, int cap, int* rows) { return manager ? manager->fetchGroupsPacked(b, cap, rows) : 0; }
+    EXPORT int logic_fetch_top_packed(char* b, int cap, int* rows) { return manager ? manager->fetchTopPacked(b, cap, rows) : 0; }
     
-    EXPORT void logic_prepare_advanced_top(int e, int m) { if (manager) manager->prepareAdvancedTop(e, m); }
-    EXPORT bool logic_fetch_top_item(TopItemData* i) { return manager ? manager->fetchTopItem(i) : false; }
+    EXPORT void logic_prepare_chart(int e, char* c, char* f, int desc, double prior, int lim) { if (manager) manager->prepareChart(e, c, f, desc != 0, prior, lim); }
     
     EXPORT void logic_prepare_group_query(int m) { if (manager) manager->prepareGroupQuery(m); }
     // НОВА ФУНКЦІЯ
     EXPORT void logic_prepare_albums_by_artist(char* artist) { if (manager) manager->prepareAlbumsByArtist(artist); }
     EXPORT bool logic_fetch_next_group(GroupData* g) { return manager ? manager->fetchGroupItem(g) : false; }
     
+    EXPORT int logic_update_ratings_bulk(RatingData* r, int n) { return manager ? manager->updateRatingsBulk(r, n) : 0; }
+    EXPORT double logic_get_artist_rating(char* artist) { return manager ? manager->getArtistRating(artist) : 0.0; }
     EXPORT bool logic_update_rating(char* p, double a, int m, int r, int v, int l, int ar, int hv, int hl) { return manager ? manager->updateRating(p, a, m, r, v, l, ar, hv, hl) : false; }
     
     EXPORT void audio_play(char* path) { if(manager) manager->audioPlay(path); }
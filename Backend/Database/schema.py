@@ -0,0 +1,241 @@
+import sqlite3
+
+# Дзеркало схеми з cpp_src/logic.cpp (CREATE_TRACKS_SQL, PRAGMAS_SQL, applyMigration).
+# Версія схеми зберігається в PRAGMA user_version - змінювати лише разом з C++.
+SCHEMA_VERSION = 7
+
+CREATE_TRACKS_SQL = (
+    "CREATE TABLE IF NOT EXISTS tracks ("
+    "id INTEGER PRIMARY KEY, path TEXT UNIQUE, title TEXT, artist TEXT, "
+    "album TEXT, genre TEXT, duration REAL, rating REAL DEFAULT 0, "
+    "rate_melody INTEGER DEFAULT 0, rate_rhythm INTEGER DEFAULT 0, "
+    "rate_vocals INTEGER DEFAULT 0, rate_lyrics INTEGER DEFAULT 0, "
+    "rate_arrange INTEGER DEFAULT 0, has_vocals INTEGER DEFAULT 1, has_lyrics INTEGER DEFAULT 1, "
+    "size INTEGER DEFAULT 0, mtime REAL DEFAULT 0, cover TEXT)")
+
+# Колонки треку в порядку FIELDS (track_table.py), далі відбиток файлу - TRACK_COLUMNS у logic.cpp.
+# Не SELECT *: cover додано після size і mtime, а TrackTable читає колонки за позицією.
+TRACK_SELECT = ("id, path, title, artist, album, genre, duration, rating, rate_melody, rate_rhythm, rate_vocals, "
+                "rate_lyrics, rate_arrange, has_vocals, has_lyrics, cover, size, mtime")
+
+PRAGMAS = ("journal_mode=WAL", "synchronous=NORMAL", "temp_store=MEMORY", "cache_size=-32000", "mmap_size=268435456")
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_tracks_artist_album ON tracks(artist, album, path)",
+    "CREATE INDEX IF NOT EXISTS idx_tracks_album ON tracks(album, artist, path)",
+    "CREATE INDEX IF NOT EXISTS idx_tracks_title ON tracks(title)",
+    "CREATE INDEX IF NOT EXISTS idx_tracks_duration ON tracks(duration)",
+    "CREATE INDEX IF NOT EXISTS idx_tracks_rating ON tracks(rating, title, artist, path)",
+)
+
+# Ключі keyset-сторінок (колонка сортування, id)
+PAGE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_tracks_artist_id ON tracks(artist, id)",
+    "CREATE INDEX IF NOT EXISTS idx_tracks_album_id ON tracks(album, id)",
+    "CREATE INDEX IF NOT EXISTS idx_tracks_rating_id ON tracks(rating, id)",
+)
+
+# Повнотекстовий пошук (FTS_* у logic.cpp). Не міграція: FTS5 може бути відсутній у збірці sqlite.
+FTS_CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts USING fts5("
+    "title, artist, album, genre, content='tracks', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')")
+
+FTS_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS tracks_fts_ai AFTER INSERT ON tracks BEGIN "
+    "INSERT INTO tracks_fts(rowid, title, artist, album, genre) VALUES (new.id, new.title, new.artist, new.album, new.genre); END",
+    "CREATE TRIGGER IF NOT EXISTS tracks_fts_ad AFTER DELETE ON tracks BEGIN "
+    "INSERT INTO tracks_fts(tracks_fts, rowid, title, artist, album, genre) VALUES ('delete', old.id, old.title, old.artist, old.album, old.genre); END",
+    "CREATE TRIGGER IF NOT EXISTS tracks_fts_au AFTER UPDATE OF title, artist, album, genre ON tracks BEGIN "
+    "INSERT INTO tracks_fts(tracks_fts, rowid, title, artist, album, genre) VALUES ('delete', old.id, old.title, old.artist, old.album, old.genre); "
+    "INSERT INTO tracks_fts(rowid, title, artist, album, genre) VALUES (new.id, new.title, new.artist, new.album, new.genre); END",
+)
+
+FTS_SEARCH_SQL = (
+    f"SELECT {TRACK_SELECT} FROM (SELECT rowid, bm25(tracks_fts, 10.0, 5.0, 3.0, 1.0) AS score FROM tracks_fts "
+    "WHERE tracks_fts MATCH ? ORDER BY score LIMIT 2000) AS hits JOIN tracks ON tracks.id = hits.rowid ORDER BY hits.score")
+
+LIKE_SEARCH_SQL = f"SELECT {TRACK_SELECT} FROM tracks WHERE title LIKE ?1 OR artist LIKE ?1 OR album LIKE ?1 OR genre LIKE ?1"
+
+# Зведення по артистах і альбомах (MIGRATION_4_TABLES_SQL / aggregate*Sql у logic.cpp)
+AGGREGATE_TABLES = (
+    "CREATE TABLE IF NOT EXISTS artists (name TEXT PRIMARY KEY, track_count INTEGER NOT NULL DEFAULT 0, "
+    "rated_count INTEGER NOT NULL DEFAULT 0, rating_sum REAL NOT NULL DEFAULT 0, cover_path TEXT) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS albums (album TEXT, artist TEXT, track_count INTEGER NOT NULL DEFAULT 0, "
+    "rated_count INTEGER NOT NULL DEFAULT 0, rating_sum REAL NOT NULL DEFAULT 0, cover_path TEXT, "
+    "PRIMARY KEY (album, artist)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS idx_albums_artist ON albums(artist, album)",
+    "DELETE FROM artists",
+    "DELETE FROM albums",
+    "INSERT INTO artists SELECT artist, COUNT(*), SUM(rating > 0), TOTAL(CASE WHEN rating > 0 THEN rating END), MIN(path) "
+    "FROM tracks GROUP BY artist",
+    "INSERT INTO albums SELECT album, artist, COUNT(*), SUM(rating > 0), TOTAL(CASE WHEN rating > 0 THEN rating END), MIN(path) "
+    "FROM tracks GROUP BY album, artist",
+)
+
+
+def _aggregate_add_sql(r):
+    rated, total = f"({r}.rating > 0)", f"(CASE WHEN {r}.rating > 0 THEN {r}.rating ELSE 0 END)"
+    return (f"INSERT INTO artists VALUES ({r}.artist, 1, {rated}, {total}, {r}.path) "
+            "ON CONFLICT(name) DO UPDATE SET track_count = track_count + 1, rated_count = rated_count + excluded.rated_count, "
+            "rating_sum = rating_sum + excluded.rating_sum, cover_path = MIN(cover_path, excluded.cover_path); "
+            f"INSERT INTO albums VALUES ({r}.album, {r}.artist, 1, {rated}, {total}, {r}.path) "
+            "ON CONFLICT(album, artist) DO UPDATE SET track_count = track_count + 1, rated_count = rated_count + excluded.rated_count, "
+            "rating_sum = rating_sum + excluded.rating_sum, cover_path = MIN(cover_path, excluded.cover_path); ")
+
+
+def _aggregate_remove_sql(r):
+    rated, total = f"({r}.rating > 0)", f"(CASE WHEN {r}.rating > 0 THEN {r}.rating ELSE 0 END)"
+    artist, album = f"name = {r}.artist", f"album = {r}.album AND artist = {r}.artist"
+    return (f"UPDATE artists SET track_count = track_count - 1, rated_count = rated_count - {rated}, "
+            f"rating_sum = rating_sum - {total} WHERE {artist}; "
+            f"DELETE FROM artists WHERE {artist} AND track_count <= 0; "
+            f"UPDATE artists SET cover_path = (SELECT MIN(path) FROM tracks WHERE artist = {r}.artist) "
+            f"WHERE {artist} AND cover_path = {r}.path; "
+            f"UPDATE albums SET track_count = track_count - 1, rated_count = rated_count - {rated}, "
+            f"rating_sum = rating_sum - {total} WHERE {album}; "
+            f"DELETE FROM albums WHERE {album} AND track_count <= 0; "
+            f"UPDATE albums SET cover_path = (SELECT MIN(path) FROM tracks WHERE album = {r}.album AND artist = {r}.artist) "
+            f"WHERE {album} AND cover_path = {r}.path; ")
+
+
+AGGREGATE_DELETE_TRIGGER = f"CREATE TRIGGER IF NOT EXISTS tracks_agg_ad AFTER DELETE ON tracks BEGIN {_aggregate_remove_sql('old')}END"
+AGGREGATE_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS tracks_agg_ai AFTER INSERT ON tracks BEGIN {_aggregate_add_sql('new')}END",
+    AGGREGATE_DELETE_TRIGGER,
+    "CREATE TRIGGER IF NOT EXISTS tracks_agg_au AFTER UPDATE OF path, artist, album, rating ON tracks BEGIN "
+    f"{_aggregate_remove_sql('old')}{_aggregate_add_sql('new')}END",
+)
+
+# Очищення бібліотеки (clearDatabase у logic.cpp). DELETE FROM tracks запускає тригери на кожен рядок:
+# перерахунок зведень на цей час знімається, самі зведення просто спорожнюються
+CLEAR_SQL = ("DROP TRIGGER IF EXISTS tracks_agg_ad", "DELETE FROM tracks", "DELETE FROM artists", "DELETE FROM albums",
+             AGGREGATE_DELETE_TRIGGER)
+
+def _rating_delta_sql(table, where):
+    return (f"UPDATE {table} SET rated_count = rated_count - (old.rating > 0) + (new.rating > 0), "
+            "rating_sum = rating_sum - (CASE WHEN old.rating > 0 THEN old.rating ELSE 0 END) "
+            f"+ (CASE WHEN new.rating > 0 THEN new.rating ELSE 0 END) WHERE {where}; ")
+
+
+# v5: зміна лише оцінки правиться дельтою, повний перерахунок - лише при зміні шляху/артиста/альбому
+_SAME_GROUP = "old.path IS new.path AND old.artist IS new.artist AND old.album IS new.album"
+RATING_TRIGGERS = (
+    "DROP TRIGGER IF EXISTS tracks_agg_au",
+    f"CREATE TRIGGER tracks_agg_au AFTER UPDATE OF path, artist, album, rating ON tracks WHEN NOT ({_SAME_GROUP}) BEGIN "
+    f"{_aggregate_remove_sql('old')}{_aggregate_add_sql('new')}END",
+    "CREATE TRIGGER IF NOT EXISTS tracks_agg_rating AFTER UPDATE OF rating ON tracks "
+    f"WHEN {_SAME_GROUP} AND old.rating IS NOT new.rating BEGIN "
+    f"{_rating_delta_sql('artists', 'name = new.artist')}{_rating_delta_sql('albums', 'album = new.album AND artist = new.artist')}END",
+)
+
+
+# v6: лічильник змін бібліотеки - ним звіряється знімок (library_snapshot.py)
+CHANGE_COUNTER = (
+    "CREATE TABLE IF NOT EXISTS library_state (id INTEGER PRIMARY KEY CHECK (id = 1), changes INTEGER NOT NULL DEFAULT 0)",
+    "INSERT OR IGNORE INTO library_state (id, changes) VALUES (1, 0)",
+    "CREATE TRIGGER IF NOT EXISTS tracks_changes_ai AFTER INSERT ON tracks BEGIN UPDATE library_state SET changes = changes + 1 WHERE id = 1; END",
+    "CREATE TRIGGER IF NOT EXISTS tracks_changes_ad AFTER DELETE ON tracks BEGIN UPDATE library_state SET changes = changes + 1 WHERE id = 1; END",
+    "CREATE TRIGGER IF NOT EXISTS tracks_changes_au AFTER UPDATE ON tracks BEGIN UPDATE library_state SET changes = changes + 1 WHERE id = 1; END",
+)
+CHANGES_SQL = "SELECT changes FROM library_state WHERE id = 1"
+
+# v7: id обкладинки (cover_store.py). NULL - файл ще не читався з v7, '' - обкладинки немає
+COVER_COLUMN_SQL = "ALTER TABLE tracks ADD COLUMN cover TEXT"
+
+
+def fts_match_expr(query):
+    """'ac/dc bla' -> '"ac/dc"* "bla"*' : кожне слово - префікс, всі слова мають збігтися."""
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in query.split())
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _migration_1(conn):
+    """Відбитки файлів (size, mtime) для інкрементального сканування."""
+    cols = _columns(conn, "tracks")
+    if "size" not in cols: conn.execute("ALTER TABLE tracks ADD COLUMN size INTEGER DEFAULT 0")
+    if "mtime" not in cols: conn.execute("ALTER TABLE tracks ADD COLUMN mtime REAL DEFAULT 0")
+
+
+def _migration_2(conn):
+    """Покриваючі індекси для сортувань, фільтрів і груп."""
+    for sql in INDEXES: conn.execute(sql)
+
+
+def _migration_3(conn):
+    """Індекси для сторінок у порядку (колонка сортування, id)."""
+    for sql in PAGE_INDEXES: conn.execute(sql)
+
+
+def _migration_4(conn):
+    """Зведення artists / albums, наповнені з tracks і далі ведені тригерами."""
+    for sql in AGGREGATE_TABLES + AGGREGATE_TRIGGERS: conn.execute(sql)
+
+
+def _migration_5(conn):
+    """Легкий тригер для зміни оцінки без зміни групи."""
+    for sql in RATING_TRIGGERS: conn.execute(sql)
+
+
+def _migration_6(conn):
+    """Лічильник змін tracks для перевірки знімка бібліотеки."""
+    for sql in CHANGE_COUNTER: conn.execute(sql)
+
+
+def _migration_7(conn):
+    """Посилання треку на обкладинку у сховищі за вмістом."""
+    if "cover" not in _columns(conn, "tracks"): conn.execute(COVER_COLUMN_SQL)
+
+
+MIGRATIONS = {1: _migration_1, 2: _migration_2, 3: _migration_3, 4: _migration_4, 5: _migration_5, 6: _migration_6,
+              7: _migration_7}
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_pragmas(conn):
+    for pragma in PRAGMAS: conn.execute(f"PRAGMA {pragma}")
+
+
+def ensure_search_index(conn):
+    """Створює і наповнює tracks_fts, якщо FTS5 доступний. Повертає, чи можна шукати через FTS."""
+    try: conn.execute("SELECT fts5(NULL)")
+    except sqlite3.Error:
+        for name in ("tracks_fts_ai", "tracks_fts_ad", "tracks_fts_au"): conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        return False
+    existing = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE name IN ('tracks_fts', 'tracks_fts_ai')")}
+    if existing == {"tracks_fts", "tracks_fts_ai"}: return True
+    conn.execute("BEGIN")
+    try:
+        conn.execute(FTS_CREATE_SQL)
+        for sql in FTS_TRIGGERS: conn.execute(sql)
+        conn.execute("INSERT INTO tracks_fts(tracks_fts) VALUES ('rebuild')")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return True
+
+
+def migrate(conn, target=SCHEMA_VERSION):
+    """Доводить базу до target. Кожен крок - окрема транзакція. Повертає фінальну версію."""
+    conn.execute(CREATE_TRACKS_SQL)
+    version = schema_version(conn)
+    start = version
+    while version < target:
+        conn.execute("BEGIN")
+        try:
+            MIGRATIONS[version + 1](conn)
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        version += 1
+    if version != start: conn.execute("ANALYZE")
+    return version
@@ -0,0 +1,127 @@
+"""
+Час запитів бібліотеки без індексів tracks і з ними (плюс прагми) - ті самі запити, що виконує SqliteEngine.
+Працює на копії бази, оригінал не змінюється:
+    python -m Backend.Database.schema_timings [music_library.db] [--synthetic 50000] [--repeat 5]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+from contextlib import closing
+from Backend.charts import CHART_PRIOR, CHART_SIZE, chart_spec
+from Backend.Database import schema
+from Backend.Database.sqlite_engine import ARTIST_ALBUMS_SQL, GROUPS_SQL, chart_sql, page_sql, tracks_sql
+
+PAGE = 200  # перша сторінка списку - те, що користувач бачить одразу
+# SQL береться з sqlite_engine (дзеркало logic.cpp), тож заміри не розходяться з програмою. "@..." - значення з бази
+QUERIES = {
+    "sort_artist": (tracks_sql("artist", "ASC", None), ()),
+    "sort_title": (tracks_sql("title", "ASC", None), ()),
+    "sort_rating": (tracks_sql("rating", "DESC", None), ()),
+    "filter_album": (tracks_sql("title", "ASC", "album"), ("@album",)),
+    "page_artist": (page_sql("artist", "ASC", None, False), ("@page",)),
+    "page_artist_next": (page_sql("artist", "ASC", None, True), ("@artist_after", "@artist_after_id", "@page")),
+    "page_rating_next": (page_sql("rating", "DESC", None, True), ("@rating_after", "@rating_after_id", "@page")),
+    "page_album_filter": (page_sql("title", "ASC", "album", False), ("@album", "@page")),
+    "groups_artists": (GROUPS_SQL[1], ()),
+    "groups_albums": (GROUPS_SQL[2], ()),
+    "albums_by_artist": (ARTIST_ALBUMS_SQL, ("@artist",)),
+    "chart_tracks": (chart_sql("track", *chart_spec("track", "rating"), True), ("@prior", "@chart")),
+    "chart_artists": (chart_sql("artist", *chart_spec("artist", "rating"), True), ("@prior", "@chart")),
+    "chart_genres": (chart_sql("genre", *chart_spec("genre", "rating"), True), ("@prior", "@chart")),
+    "chart_albums": (chart_sql("album", *chart_spec("album", "rating"), True), ("@prior", "@chart")),
+}
+# Курсор другої сторінки: останній рядок першої
+CURSOR_SQL = "SELECT {col}, id FROM tracks ORDER BY {col} {order}, id {order} LIMIT 1 OFFSET ?"
+
+
+def fill_synthetic(conn, count, seed=1):
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(count):
+        artist = f"Artist {rnd.randrange(max(1, count // 40))}"
+        rows.append((f"C:/Music/synthetic/{i}.mp3", f"Track {rnd.randrange(count)}", artist,
+                     f"{artist} - Album {rnd.randrange(8)}", "Rock", rnd.uniform(90, 420),
+                     round(rnd.uniform(0, 10), 1) if rnd.random() < 0.3 else 0.0))
+    conn.executemany("INSERT OR IGNORE INTO tracks (path, title, artist, album, genre, duration, rating) "
+                     "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+
+
+def drop_indexes(conn):
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_tracks_%'").fetchall():
+        conn.execute(f"DROP INDEX {name}")
+    conn.execute("ANALYZE")
+
+
+def create_indexes(conn):
+    for sql in schema.INDEXES + schema.PAGE_INDEXES: conn.execute(sql)
+    conn.execute("ANALYZE")
+
+
+def query_values(conn):
+    artist, album = conn.execute("SELECT artist, album FROM tracks GROUP BY artist ORDER BY COUNT(*) DESC LIMIT 1").fetchone() or ("", "")
+    values = {"@artist": artist, "@album": album, "@page": PAGE, "@prior": CHART_PRIOR, "@chart": CHART_SIZE}
+    for col, order in (("artist", "ASC"), ("rating", "DESC")):
+        row = conn.execute(CURSOR_SQL.format(col=col, order=order), (PAGE - 1,)).fetchone() or ("", 0)
+        values[f"@{col}_after"], values[f"@{col}_after_id"] = row
+    return values
+
+
+def time_queries(conn, repeat):
+    values = query_values(conn)
+    result = {}
+    for name, (sql, params) in QUERIES.items():
+        params = tuple(values[p] for p in params)
+        best = first = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cursor = conn.execute(sql, params)
+            rows = cursor.fetchmany(PAGE)
+            first = min(first, time.perf_counter() - start)
+            rows += cursor.fetchall()
+            best = min(best, time.perf_counter() - start)
+        plan = " / ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        result[name] = {"ms": round(best * 1000, 3), "first_page_ms": round(first * 1000, 3), "rows": len(rows), "plan": plan}
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db", nargs="?", default="music_library.db")
+    parser.add_argument("--synthetic", type=int, default=0, help="додати N синтетичних треків у копію")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="schema_timings_")
+    path = os.path.join(tmp, "library.db")
+    try:
+        if os.path.exists(args.db): shutil.copyfile(args.db, path)
+        with closing(sqlite3.connect(path, isolation_level=None)) as conn:
+            schema.migrate(conn, target=1)
+            if args.synthetic: fill_synthetic(conn, args.synthetic)
+            # Зведення й тригери потрібні самим запитам; порівнюються лише індекси tracks і прагми
+            schema.migrate(conn)
+            drop_indexes(conn)
+            before = time_queries(conn, args.repeat)
+            schema.apply_pragmas(conn)
+            create_indexes(conn)
+            after = time_queries(conn, args.repeat)
+            tracks = conn.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+
+        report = {"tracks": tracks, "schema_version": schema.SCHEMA_VERSION,
+                  "queries": {name: {"before": before[name], "after": after[name],
+                                     "speedup": round(before[name]["ms"] / after[name]["ms"], 2) if after[name]["ms"] else None}
+                              for name in QUERIES}}
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
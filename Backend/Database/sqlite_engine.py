@@ -0,0 +1,203 @@
+import os
+import sqlite3
+from Backend.track_table import TrackTable, FIELDS
+from Backend.Database import schema
+
+# Рушій сховища обирається при старті: MUSIC_DB_ENGINE=cpp|sqlite, auto - DLL, якщо вона завантажилась
+ENGINE_ENV = "MUSIC_DB_ENGINE"
+ENGINES = ("auto", "cpp", "sqlite")
+DB_FILE = "music_library.db"  # той самий файл, який відкриває C++ бекенд
+
+TRACK_COLUMNS = ", ".join(FIELDS)
+NUMERIC_SORT = ("duration", "rating", "id")
+
+# Ті самі запити, що в logic.cpp (UPSERT_SQL, UPDATE_RATING_SQL, prepare*)
+UPSERT_SQL = (
+    "INSERT INTO tracks (path, title, artist, album, genre, duration, size, mtime, cover) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(path) DO UPDATE SET title=excluded.title, artist=excluded.artist, album=excluded.album, "
+    "genre=excluded.genre, duration=excluded.duration, size=excluded.size, mtime=excluded.mtime, cover=excluded.cover")
+UPDATE_RATING_SQL = ("UPDATE tracks SET rating=?, rate_melody=?, rate_rhythm=?, rate_vocals=?, rate_lyrics=?, rate_arrange=?, "
+                     "has_vocals=?, has_lyrics=? WHERE path=?")
+DELETE_SQL = "DELETE FROM tracks WHERE path = ?"
+DELETE_DIR_SQL = "DELETE FROM tracks WHERE substr(path, 1, length(?1)) = ?1"
+# Трек без cover (база до v7) віддає розмір -1: відбиток не збігається, і сканер перечитає файл разом з обкладинкою
+FINGERPRINTS_SQL = ("SELECT path, CASE WHEN cover IS NULL THEN -1 ELSE size END, mtime FROM tracks "
+                    "WHERE substr(path, 1, length(?1)) = ?1")
+# Групи і топи віддають id обкладинки свого треку-представника (cover_path) - пошук за унікальним індексом path
+_COVER_OF = "(SELECT cover FROM tracks WHERE tracks.path = {})"
+GROUPS_SQL = {1: f"SELECT name, '', track_count, cover_path, {_COVER_OF.format('artists.cover_path')} FROM artists ORDER BY name",
+              2: f"SELECT album, artist, track_count, cover_path, {_COVER_OF.format('g.cover_path')} FROM ("
+                 "SELECT album, artist, SUM(track_count) AS track_count, MIN(cover_path) AS cover_path FROM albums GROUP BY album"
+                 ") AS g ORDER BY album"}
+ARTIST_ALBUMS_SQL = (f"SELECT album, artist, track_count, cover_path, {_COVER_OF.format('albums.cover_path')} "
+                     "FROM albums WHERE artist = ? ORDER BY album")
+# Чарти (prepareChart у logic.cpp): ?1 - баєсова вага CHART_PRIOR, ?2 - N.
+# ORDER BY ... LIMIT sqlite виконує обмеженим сортером (у пам'яті лише N рядків), чарт треків за rating іде
+# індексом idx_tracks_rating_id, а групи за rating читають зведення artists / albums, а не всі треки.
+CHART_TRACKS_SQL = f"SELECT {schema.TRACK_SELECT} FROM tracks WHERE {{rated}} ORDER BY {{col}} {{order}}, id {{order}} LIMIT ?2"
+CHART_GROUPS_SQL = ("SELECT name, secondary, (total + ?1 * p.mean) / (rated + ?1) AS score, rated, cover_path, "
+                    f"{_COVER_OF.format('g.cover_path')} FROM ({{groups}}) AS g, ({{prior}}) AS p "
+                    "ORDER BY score {order}, name LIMIT ?2")
+CHART_GROUP_KEYS = {"album": ("album", "artist"), "artist": ("artist", "''"), "genre": ("genre", "''")}
+CHART_TRACK_GROUPS = ("SELECT {key} AS name, {secondary} AS secondary, SUM({col}) AS total, COUNT(*) AS rated, "
+                      "MIN(path) AS cover_path FROM tracks WHERE {rated} GROUP BY {key}")
+CHART_TRACK_PRIOR = "SELECT AVG({col}) AS mean FROM tracks WHERE {rated}"
+CHART_AGGREGATE_GROUPS = {
+    "artist": "SELECT name, '' AS secondary, rating_sum AS total, rated_count AS rated, cover_path FROM artists WHERE rated_count > 0",
+    "album": "SELECT album AS name, artist AS secondary, SUM(rating_sum) AS total, SUM(rated_count) AS rated, "
+             "MIN(cover_path) AS cover_path FROM albums WHERE rated_count > 0 GROUP BY album",
+}
+CHART_AGGREGATE_PRIOR = "SELECT SUM(rating_sum) / SUM(rated_count) AS mean FROM artists"
+ARTIST_RATING_SQL = "SELECT rating_sum / rated_count FROM artists WHERE name = ? AND rated_count > 0"
+
+
+def requested_engine(name=None):
+    """Явна назва, інакше MUSIC_DB_ENGINE, інакше auto."""
+    name = (name or os.environ.get(ENGINE_ENV) or "auto").strip().lower()
+    if name not in ENGINES: raise ValueError(f"Unknown storage engine: {name} (expected one of {', '.join(ENGINES)})")
+    return name
+
+
+# Фабрики рядків: результат будується одразу з кортежу sqlite3, без проміжних структур
+def _group_row(cursor, row):
+    return (row[0] or "Unknown", row[1] or "", row[2], row[3] or "", row[4] or "")
+
+def _chart_row(cursor, row):
+    return {"name": row[0] or "", "secondary": row[1] or "", "rating": float(row[2] or 0), "rated": row[3],
+            "cover_path": row[4] or "", "cover": row[5] or ""}
+
+def _meta_row(meta):
+    return (meta["path"], meta["title"], meta["artist"], meta["album"], meta["genre"], meta["duration"],
+            meta.get("size", 0), meta.get("mtime", 0.0), meta.get("cover"))
+
+
+def _column(name):
+    # C++ підставляє назву колонки в SQL як є; тут пропускаються лише колонки tracks
+    if name not in FIELDS: raise ValueError(f"Unknown track column: {name}")
+    return name
+
+
+
+def tracks_sql(sort, order, f_col):
+    """Увесь список треків у порядку (sort, id), як сторінки і знімок; параметр - значення фільтра, якщо f_col задано."""
+    order = "DESC" if order == "DESC" else "ASC"
+    sql = f"SELECT {TRACK_COLUMNS} FROM tracks"
+    if f_col: sql += f" WHERE {_column(f_col)} = ?"
+    return sql + f" ORDER BY {_column(sort)} {order}, id {order}"
+
+
+def page_sql(sort, order, f_col, after):
+    """Keyset-сторінка (preparePage у logic.cpp). Параметри: [значення фільтра], [after_val, after_id], limit."""
+    desc = order == "DESC"
+    col = _column(sort)
+    where = [f"{_column(f_col)} = ?"] if f_col else []
+    if after: where.append(f"({col}, id) {'<' if desc else '>'} (?, ?)")
+    sql = f"SELECT {TRACK_COLUMNS} FROM tracks"
+    if where: sql += " WHERE " + " AND ".join(where)
+    return sql + f" ORDER BY {col} {'DESC, id DESC' if desc else 'ASC, id ASC'} LIMIT ?"
+
+def chart_sql(entity, col, flag, desc):
+    """Один запит на чарт. col і flag - з charts.CHART_DIMENSIONS (перевірені chart_spec)."""
+    order = "DESC" if desc else "ASC"
+    rated = f"{col} > 0" + (f" AND {flag} = 1" if flag else "")
+    if entity == "track": return CHART_TRACKS_SQL.format(rated=rated, col=col, order=order)
+    if col == "rating" and entity in CHART_AGGREGATE_GROUPS:
+        groups, prior = CHART_AGGREGATE_GROUPS[entity], CHART_AGGREGATE_PRIOR
+    else:
+        key, secondary = CHART_GROUP_KEYS[entity]
+        groups = CHART_TRACK_GROUPS.format(key=key, secondary=secondary, col=col, rated=rated)
+        prior = CHART_TRACK_PRIOR.format(col=col, rated=rated)
+    return CHART_GROUPS_SQL.format(groups=groups, prior=prior, order=order)
+
+
+class SqliteEngine:
+    """
+    Сховище на вбудованому sqlite3: та сама схема tracks (schema.py), без ctypes і 'mbcs'.
+    Працює всюди, де є Python - зокрема там, де backend.dll не завантажити.
+    """
+    name = "sqlite"
+    has_pages = True
+    text_encoding = "utf-8"  # як рядки лежать у базі (знімок бібліотеки декодує так само)
+
+    def __init__(self, db_path=DB_FILE):
+        self.db_path = db_path
+        # Доступ серіалізує db_lock контролера, тому одне з'єднання на всі потоки
+        self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        schema.apply_pragmas(self.conn)
+        schema.migrate(self.conn)
+        self.has_fts = schema.ensure_search_index(self.conn)
+
+    def close(self): self.conn.close()
+
+    def _write(self, steps):
+        """steps: [(sql, rows)] у одній транзакції. Повертає кількість змінених рядків tracks."""
+        self.conn.execute("BEGIN")
+        try:
+            changed = sum(self.conn.executemany(sql, rows).rowcount for sql, rows in steps if rows)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return changed
+
+    # === WRITE ===
+    def clear(self):
+        self.conn.execute("BEGIN")
+        for sql in schema.CLEAR_SQL: self.conn.execute(sql)
+        self.conn.execute("COMMIT")
+        self.conn.execute("VACUUM")
+
+    def add_tracks(self, metas):
+        return self._write([(UPSERT_SQL, [_meta_row(m) for m in metas])])
+
+    def delete_tracks(self, paths):
+        return self._write([(DELETE_SQL, [(p,) for p in paths])])
+
+    def apply_changes(self, metas, deleted, deleted_dirs):
+        # Спершу видалення: тека, винесена і повернута в межах однієї пачки, не має зникнути разом з новими записами
+        return self._write([(DELETE_DIR_SQL, [(d,) for d in deleted_dirs]), (DELETE_SQL, [(p,) for p in deleted]),
+                            (UPSERT_SQL, [_meta_row(m) for m in metas])])
+
+    def update_ratings(self, items):
+        """[(path, rating, data)] однією транзакцією."""
+        return self._write([(UPDATE_RATING_SQL, [(rating, data['melody'], data['rhythm'], data['vocals'], data['lyrics'], data['arrange'],
+                                                  data.get('has_vocals', 1), data.get('has_lyrics', 1), path) for path, rating, data in items])])
+
+    # === READ ===
+    def fingerprints(self, root):
+        return {path: (size, mtime) for path, size, mtime in self.conn.execute(FINGERPRINTS_SQL, (root,))}
+
+    def _tracks(self, sql, params):
+        return TrackTable.from_rows(self.conn.execute(sql, params))
+
+    def tracks(self, sort, order, f_col, f_val):
+        return self._tracks(tracks_sql(sort, order, f_col), (f_val,) if f_col else ())
+
+    def page(self, sort, order, f_col, f_val, after, limit):
+        """Keyset-сторінка, як preparePage у logic.cpp: рядки строго після (after_val, after_id)."""
+        params = [f_val] if f_col else []
+        if after is not None: params += [float(after[0]) if _column(sort) in NUMERIC_SORT else after[0], after[1]]
+        return self._tracks(page_sql(sort, order, f_col, after is not None), params + [limit])
+
+    def search(self, query):
+        expr = schema.fts_match_expr(query)
+        if self.has_fts and expr: return self._tracks(schema.FTS_SEARCH_SQL, (expr,))
+        return self._tracks(schema.LIKE_SEARCH_SQL, (f"%{query}%",))
+
+    def _rows(self, factory, sql, params=()):
+        cursor = self.conn.cursor()
+        cursor.row_factory = factory
+        return cursor.execute(sql, params).fetchall()
+
+    def groups(self, mode): return self._rows(_group_row, GROUPS_SQL[1 if mode == 1 else 2])
+    def artist_albums(self, artist_name): return self._rows(_group_row, ARTIST_ALBUMS_SQL, (artist_name,))
+
+    def chart(self, entity, col, flag, desc, prior, limit):
+        """Треки - TrackTable з повними рядками, групи - [dict] з баєсовою оцінкою в "rating"."""
+        sql = chart_sql(entity, col, flag, desc)
+        if entity == "track": return self._tracks(sql, (prior, limit))
+        return self._rows(_chart_row, sql, (prior, limit))
+
+    def artist_rating(self, artist):
+        row = self.conn.execute(ARTIST_RATING_SQL, (artist,)).fetchone()
+        return row[0] if row else 0.0
\ No newline at end of file
@@ -0,0 +1,192 @@
+import os
+import sys
+import time
+import itertools
+
+# Бекенд звуку: MUSIC_AUDIO_BACKEND=mci|null, auto - MCI на Windows, інакше null
+AUDIO_ENV = "MUSIC_AUDIO_BACKEND"
+AUDIO_BACKENDS = ("auto", "mci", "null")
+
+
+class _MciBackend:
+    """
+    MCI через winmm напряму (Unicode-шляхи без 'mbcs'). Кожен відкритий файл - окремий alias,
+    тому наступний трек відкривається заздалегідь, поки грає поточний.
+    """
+
+    def __init__(self):
+        import ctypes
+        self._send = ctypes.windll.winmm.mciSendStringW
+        self._buf = ctypes.create_unicode_buffer(128)
+        self._aliases = itertools.count(1)
+
+    def _cmd(self, command, reply=False):
+        err = self._send(command, self._buf if reply else None, 128 if reply else 0, None)
+        return self._buf.value if reply and not err else ("" if reply else err == 0)
+
+    def open(self, path, duration=0.0):
+        alias = f"track{next(self._aliases)}"
+        if not self._cmd(f'open "{path}" type mpegvideo alias {alias}'): return None
+        self._cmd(f"set {alias} time format milliseconds")
+        # cue: декодер підготований, play стартує без затримки на буферизацію
+        self._cmd(f"cue {alias} output")
+        return alias
+
+    def play(self, alias): self._cmd(f"play {alias}")
+    def pause(self, alias): self._cmd(f"pause {alias}")
+    def resume(self, alias): self._cmd(f"resume {alias}")
+    def close(self, alias): self._cmd(f"close {alias}")
+
+    def seek(self, alias, seconds):
+        self._cmd(f"seek {alias} to {int(seconds * 1000)}")
+        self._cmd(f"play {alias}")
+
+    def is_playing(self, alias): return self._cmd(f"status {alias} mode", reply=True) == "playing"
+
+    def position(self, alias):
+        try: return float(self._cmd(f"status {alias} position", reply=True)) / 1000.0
+        except ValueError: return 0.0
+
+
+class NullBackend:
+    """
+    Приймач без декодування: «грає» за monotonic-часом і тривалістю з тегів.
+    Для headless-тестів і бенчмарків планування й попереднього відкриття; open_delay імітує відкриття файлу.
+    """
+
+    def __init__(self, open_delay=0.0, now=time.monotonic, sleep=time.sleep):
+        self.open_delay = open_delay
+        self._now = now
+        self._sleep = sleep
+        self._tracks = {}  # handle -> {path, duration, pos, started}
+        self._handles = itertools.count(1)
+        self.log = []  # (подія, шлях) - що бекенд отримав
+
+    def open(self, path, duration=0.0):
+        if self.open_delay: self._sleep(self.open_delay)
+        handle = next(self._handles)
+        self._tracks[handle] = {"path": path, "duration": duration or 0.0, "pos": 0.0, "started": None}
+        self.log.append(("open", path))
+        return handle
+
+    def _event(self, handle, name):
+        self.log.append((name, self._tracks[handle]["path"]))
+        return self._tracks[handle]
+
+    def play(self, handle):
+        t = self._event(handle, "play")
+        if t["started"] is None: t["started"] = self._now()
+
+    def resume(self, handle): self.play(handle)
+
+    def pause(self, handle):
+        t = self._event(handle, "pause")
+        t["pos"], t["started"] = self.position(handle), None
+
+    def seek(self, handle, seconds):
+        t = self._event(handle, "seek")
+        t["pos"], t["started"] = seconds, self._now()
+
+    def close(self, handle):
+        self._event(handle, "close")
+        del self._tracks[handle]
+
+    def position(self, handle):
+        t = self._tracks.get(handle)
+        if not t: return 0.0
+        pos = t["pos"] + (self._now() - t["started"] if t["started"] is not None else 0.0)
+        return min(pos, t["duration"]) if t["duration"] else pos
+
+    def is_playing(self, handle):
+        t = self._tracks.get(handle)
+        return bool(t and t["started"] is not None and (not t["duration"] or self.position(handle) < t["duration"]))
+
+
+def make_backend(name=None):
+    name = (name or os.environ.get(AUDIO_ENV) or "auto").strip().lower()
+    if name not in AUDIO_BACKENDS: raise ValueError(f"Unknown audio backend: {name} (expected one of {', '.join(AUDIO_BACKENDS)})")
+    if name == "mci" or (name == "auto" and sys.platform == "win32"): return _MciBackend()
+    return NullBackend()
+
+
+class AudioEngine:
+    """
+    Відтворення поверх бекенду (MCI або null). Команди йдуть у бекенд, стан і якір позиції - у PlaybackClock.
+    preload(path) відкриває наступний трек заздалегідь; play(path) тоді лише стартує вже відкритий файл
+    і закриває попередній після старту нового - без закриття/відкриття пристрою між треками.
+    """
+
+    def __init__(self, backend, clock):
+        self.backend = backend
+        self.clock = clock
+        self.current = None  # (path, handle)
+        self.paused = False
+        self._preloaded = None  # (path, handle)
+        self.stats = {"plays": 0, "preload_hits": 0, "preload_misses": 0, "opens": 0, "open_ms": 0.0, "last_switch_ms": 0.0}
+
+    def _open(self, path, duration):
+        t0 = time.perf_counter()
+        handle = self.backend.open(path, duration)
+        self.stats["opens"] += 1
+        self.stats["open_ms"] += (time.perf_counter() - t0) * 1000
+        return handle
+
+    def preload(self, path, duration=0.0):
+        """Відкриває наступний трек наперед. Тримається лише один: новий preload витісняє старий."""
+        if not path or (self._preloaded and self._preloaded[0] == path) or (self.current and self.current[0] == path): return
+        self._drop_preloaded()
+        handle = self._open(path, duration)
+        if handle is not None: self._preloaded = (path, handle)
+
+    def _drop_preloaded(self):
+        if self._preloaded: self.backend.close(self._preloaded[1])
+        self._preloaded = None
+
+    def play(self, path, duration=0.0):
+        t0 = time.perf_counter()
+        if self._preloaded and self._preloaded[0] == path:
+            handle, self._preloaded = self._preloaded[1], None
+            self.stats["preload_hits"] += 1
+        else:
+            handle = self._open(path, duration)
+            self.stats["preload_misses"] += 1
+        previous, self.current = self.current, (path, handle) if handle is not None else None
+        if self.current: self.backend.play(handle)
+        if previous: self.backend.close(previous[1])
+        self.paused = False
+        self.stats["plays"] += 1
+        self.stats["last_switch_ms"] = (time.perf_counter() - t0) * 1000
+        if not self.current:
+            self.clock.stop()
+            return False
+        self.clock.start(path, duration)
+        return True
+
+    def toggle_pause(self):
+        if not self.current: return
+        if self.paused: self.backend.resume(self.current[1]); self.clock.resume()
+        else: self.backend.pause(self.current[1]); self.clock.pause()
+        self.paused = not self.paused
+
+    def seek(self, seconds):
+        if not self.current: return
+        self.backend.seek(self.current[1], seconds)  # як і MCI, після seek трек грає
+        self.paused = False
+        self.clock.seek(seconds)
+
+    def check_end(self):
+        """Таймер кінця треку спрацював: одна перевірка бекенду. True - трек справді закінчився."""
+        if not self.current or not self.backend.is_playing(self.current[1]):
+            self.clock.finish()
+            return True
+        self.clock.anchor(self.backend.position(self.current[1]))  # тривалість у тегах не збіглась з реальною
+        return False
+
+    def stop(self):
+        self._drop_preloaded()
+        if self.current: self.backend.close(self.current[1])
+        self.current = None
+        self.paused = False
+        self.clock.stop()
+
+    def close(self): self.stop()
\ No newline at end of file
@@ -0,0 +1,49 @@
+CHART_ENTITIES = ("track", "album", "artist", "genre")
+# Вимір -> (колонка tracks, прапорець, без якого оцінка цього виміру не рахується)
+CHART_DIMENSIONS = {"rating": ("rating", None), "melody": ("rate_melody", None), "rhythm": ("rate_rhythm", None),
+                    "vocals": ("rate_vocals", "has_vocals"), "lyrics": ("rate_lyrics", "has_lyrics"),
+                    "arrange": ("rate_arrange", None)}
+CHART_SIZE = 10
+# Баєсова оцінка групи: (сума оцінок + CHART_PRIOR * середнє по бібліотеці) / (кількість оцінок + CHART_PRIOR).
+# Артист з одним треком на 10 не обганяє артиста з двадцятьма по 9: мало оцінок - ближче до середнього.
+CHART_PRIOR = 3.0
+
+
+def chart_spec(entity, dimension):
+    """(колонка, прапорець) для engine.chart або ValueError - назви потрапляють у SQL як є."""
+    if entity not in CHART_ENTITIES: raise ValueError(f"Unknown chart entity: {entity} (expected one of {', '.join(CHART_ENTITIES)})")
+    if dimension not in CHART_DIMENSIONS:
+        raise ValueError(f"Unknown chart dimension: {dimension} (expected one of {', '.join(CHART_DIMENSIONS)})")
+    return CHART_DIMENSIONS[dimension]
+
+def chart_from_table(table, entity, col, flag, desc, prior, limit):
+    """
+    Той самий чарт, що й chart_sql, але з уже прочитаної бібліотеки (TrackTable) -
+    для backend.dll без prepareChart, щоб топи не порожніли до перезбірки DLL.
+    """
+    values, flags = getattr(table, col), getattr(table, flag) if flag else None
+    rated = [i for i in range(len(table)) if values[i] > 0 and (flags is None or flags[i] == 1)]
+    sign = -1 if desc else 1
+    if entity == "track":
+        rated.sort(key=lambda i: (sign * values[i], sign * table.id[i]))
+        return table.take(rated[:limit])
+    if not rated: return []
+    mean = sum(values[i] for i in rated) / len(rated)
+    keys = getattr(table, entity)
+    groups = {}  # назва -> [сума, кількість, індекс треку-представника]
+    for i in rated:
+        g = groups.setdefault(keys[i] or "", [0.0, 0, i])
+        g[0] += values[i]
+        g[1] += 1
+        if table.path[i] < table.path[g[2]]: g[2] = i
+    if col == "rating" and entity in ("artist", "album"):
+        # Зведення artists / albums беруть обкладинку з усіх треків групи, не лише оцінених
+        for i in range(len(table)):
+            g = groups.get(keys[i] or "")
+            if g and table.path[i] < table.path[g[2]]: g[2] = i
+    rows = [{"name": name, "secondary": table.artist[rep] if entity == "album" else "",
+             "rating": (total + prior * mean) / (count + prior), "rated": count,
+             "cover_path": table.path[rep], "cover": table.cover[rep]} for name, (total, count, rep) in groups.items()]
+    rows.sort(key=lambda row: row["name"])
+    rows.sort(key=lambda row: row["rating"], reverse=desc)
+    return rows[:limit]
@@ -0,0 +1,70 @@
+import os
+import shutil
+import hashlib
+import threading
+
+COVERS_SUFFIX = ".covers"
+COVER_ID_LEN = 32  # blake2b-128 у hex
+
+
+def cover_id(data):
+    """Id обкладинки = хеш її байтів: однакові APIC-кадри всіх треків альбому дають один id."""
+    return hashlib.blake2b(data, digest_size=COVER_ID_LEN // 2).hexdigest()
+
+
+def is_cover_id(ref):
+    """Посилання на обкладинку - id зі сховища або (бази до v7, старі записи) шлях треку."""
+    if not ref or len(ref) != COVER_ID_LEN: return False
+    try: int(ref, 16)
+    except ValueError: return False
+    return True
+
+
+def extract_cover(tags):
+    """Перший APIC-кадр з ID3-тегів mutagen або None."""
+    if not tags: return None
+    for frame in tags.values():
+        if frame.FrameID == "APIC" and frame.data: return frame.data
+    return None
+
+
+class CoverStore:
+    """
+    Сховище обкладинок за вмістом поруч з базою (<db>.covers/ab/abcd...): кожне зображення лежить один раз,
+    скільки б треків його не вбудовували. Файл лише пишеться і ніколи не змінюється - читати можна без блокувань.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, cid): return os.path.join(self.root, cid[:2], cid)
+
+    def put(self, data):
+        """Зберігає зображення, якщо такого ще немає. Повертає його id."""
+        cid = cover_id(data)
+        target = self.path(cid)
+        if os.path.exists(target): return cid
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Той самий альбом можуть сканувати кілька воркерів одночасно: пишемо у свій tmp, заміна атомарна
+        tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f: f.write(data)
+        os.replace(tmp, target)
+        return cid
+
+    def get(self, cid):
+        try:
+            with open(self.path(cid), "rb") as f: return f.read()
+        except OSError: return None
+
+    def stats(self):
+        """{'covers': кількість зображень, 'bytes': їхній розмір на диску}."""
+        count = size = 0
+        for folder, _, files in os.walk(self.root):
+            for name in files:
+                if len(name) != COVER_ID_LEN: continue
+                count += 1
+                try: size += os.path.getsize(os.path.join(folder, name))
+                except OSError: pass
+        return {"covers": count, "bytes": size}
+
+    def clear(self): shutil.rmtree(self.root, ignore_errors=True)
\ No newline at end of file
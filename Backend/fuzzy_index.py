@@ -0,0 +1,160 @@
+import sys
+import unicodedata
+from array import array
+from collections import Counter
+
+# Поле, де знайдено слово, і його вага в ранжуванні
+TITLE, ARTIST, ALBUM = 0, 1, 2
+FIELD_WEIGHTS = (1.0, 1.2, 0.8)
+_PUNCT = str.maketrans({c: " " for c in "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~"})
+
+
+def fold(text):
+    """'Björk - Jóga' -> 'bjork   joga': без діакритики, регістру і пунктуації."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return text.casefold().translate(_PUNCT)
+
+
+def trigrams(word):
+    """Триграми з рамкою: 'abc' -> {'  a', ' ab', 'abc', 'bc '}. Короткі слова теж мають що порівнювати."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """
+    Стійкий до помилок пошук по назві, артисту й альбому ("Metalica" -> Metallica, "Bjork" -> Björk).
+    Два рівні: триграма -> слова словника (схожість Dice), слово -> треки.
+    Треки ідентифікуються шляхом; add/remove оновлюють індекс без перебудови.
+    """
+
+    def __init__(self, min_similarity=0.4, max_words_per_term=24):
+        self.min_similarity = min_similarity
+        self.max_words_per_term = max_words_per_term
+        self.words = []          # word_id -> слово
+        self.word_ids = {}       # слово -> word_id
+        self.word_grams = array("H")  # word_id -> кількість триграм
+        self.grams = {}          # триграма -> array(word_id)
+        self.postings = []       # word_id -> array(doc << 2 | field)
+        self.docs = []           # doc -> path | None (видалений)
+        self.doc_ids = {}        # path -> doc
+        self.dead = 0
+
+    # === ПОБУДОВА ===
+    @classmethod
+    def from_table(cls, table, **kwargs):
+        index = cls(**kwargs)
+        for path, title, artist, album in zip(table.path, table.title, table.artist, table.album):
+            index.add(path, title, artist, album)
+        return index
+
+    def __len__(self): return len(self.doc_ids)
+
+    def add(self, path, title, artist, album):
+        """Додає або оновлює трек (старі слова того ж шляху відкидаються)."""
+        if path in self.doc_ids: self.remove(path)
+        doc = len(self.docs)
+        self.docs.append(path)
+        self.doc_ids[path] = doc
+        seen = set()
+        for field, text in ((TITLE, title), (ARTIST, artist), (ALBUM, album)):
+            for word in fold(text or "").split():
+                if (word, field) in seen: continue
+                seen.add((word, field))
+                self.postings[self._word_id(word)].append(doc << 2 | field)
+
+    def _word_id(self, word):
+        wid = self.word_ids.get(word)
+        if wid is not None: return wid
+        wid = len(self.words)
+        self.words.append(sys.intern(word))
+        self.word_ids[word] = wid
+        self.postings.append(array("l"))
+        grams = trigrams(word)
+        self.word_grams.append(min(len(grams), 0xFFFF))
+        for g in grams:
+            bucket = self.grams.get(g)
+            if bucket is None: bucket = self.grams[g] = array("l")
+            bucket.append(wid)
+        return wid
+
+    def remove(self, path):
+        doc = self.doc_ids.pop(path, None)
+        if doc is None: return False
+        # Постінги чистяться ліниво: мертві doc пропускаються в пошуку, compact() їх прибирає
+        self.docs[doc] = None
+        self.dead += 1
+        if self.dead > 1000 and self.dead > len(self.doc_ids): self.compact()
+        return True
+
+    def remove_prefix(self, prefix):
+        paths = [p for p in self.doc_ids if p.startswith(prefix)]
+        for p in paths: self.remove(p)
+        return len(paths)
+
+    def clear(self): self.__init__(self.min_similarity, self.max_words_per_term)
+
+    def compact(self):
+        """Перенумеровує живі треки і викидає слова, яких більше ніде немає."""
+        remap = {}
+        for doc, path in enumerate(self.docs):
+            if path is not None: remap[doc] = len(remap)
+        old_words, old_postings = self.words, self.postings
+        self.words, self.word_ids, self.word_grams, self.grams, self.postings = [], {}, array("H"), {}, []
+        for word, posting in zip(old_words, old_postings):
+            live = [remap[code >> 2] << 2 | (code & 3) for code in posting if (code >> 2) in remap]
+            if live: self.postings[self._word_id(word)].extend(live)
+        self.docs = [p for p in self.docs if p is not None]
+        self.doc_ids = {p: i for i, p in enumerate(self.docs)}
+        self.dead = 0
+
+    # === ПОШУК ===
+    def similar_words(self, term):
+        """[(word_id, схожість)] найближчих слів словника, найкращі першими."""
+        grams = trigrams(term)
+        counts = Counter()
+        for g in grams:
+            bucket = self.grams.get(g)
+            if bucket: counts.update(bucket)
+        n = len(grams)
+        scored = []
+        for wid, common in counts.items():
+            sim = 2.0 * common / (n + self.word_grams[wid])
+            # Слово, що починається з запиту, - це префікс, а не помилка ("metal" -> "metallica")
+            if sim < self.min_similarity and self.words[wid].startswith(term): sim = self.min_similarity
+            if sim >= self.min_similarity: scored.append((sim, wid))
+        scored.sort(reverse=True)
+        return [(wid, sim) for sim, wid in scored[:self.max_words_per_term]]
+
+    def search(self, query, limit=200):
+        """Шляхи треків, найрелевантніші першими. Кожне слово запиту додає свій найкращий збіг."""
+        terms = fold(query).split()
+        if not terms: return []
+        totals = Counter()
+        matched = Counter()
+        for term in terms:
+            best = {}
+            for wid, sim in self.similar_words(term):
+                for code in self.postings[wid]:
+                    doc = code >> 2
+                    score = sim * FIELD_WEIGHTS[code & 3]
+                    if score > best.get(doc, 0.0): best[doc] = score
+            totals.update(best)
+            matched.update(best.keys())
+        docs = self.docs
+        # Трек, що збігся з усіма словами запиту, завжди вище за частковий збіг
+        ranked = sorted(totals, key=lambda d: (matched[d], totals[d]), reverse=True)
+        return [docs[d] for d in ranked if docs[d] is not None][:limit]
+
+    # === ЗВІТ ===
+    def memory_report(self):
+        """Приблизні байти по структурах індексу."""
+        words = sys.getsizeof(self.words) + sys.getsizeof(self.word_ids) + self.word_grams.buffer_info()[1] * self.word_grams.itemsize
+        words += sum(sys.getsizeof(w) for w in self.words)
+        grams = sys.getsizeof(self.grams) + sum(sys.getsizeof(g) + sys.getsizeof(b) for g, b in self.grams.items())
+        postings = sys.getsizeof(self.postings) + sum(sys.getsizeof(p) for p in self.postings)
+        docs = sys.getsizeof(self.docs) + sys.getsizeof(self.doc_ids)  # самі шляхи належать TrackTable
+        return {"tracks": len(self.doc_ids), "words": len(self.words), "trigrams": len(self.grams),
+                "vocabulary_bytes": words, "trigram_bytes": grams, "posting_bytes": postings, "doc_bytes": docs,
+                "total_bytes": words + grams + postings + docs}
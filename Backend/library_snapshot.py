@@ -0,0 +1,279 @@
+import os
+import sys
+import json
+import time
+import mmap
+import struct
+import sqlite3
+import threading
+from array import array
+from Backend.track_table import TrackTable, FIELDS, NUMERIC, INTERNED
+from Backend.Database.schema import CHANGES_SQL
+from Backend.Database.sqlite_engine import TRACK_COLUMNS, GROUPS_SQL
+
+MAGIC = b"MLSNAP01"
+SNAPSHOT_SUFFIX = ".snapshot"
+SNAPSHOT_ORDER = "artist"  # рядки лежать у порядку (artist, id) - як перший екран і keyset-сторінки за артистом
+SNAPSHOT_DELAY = 10.0  # перебудова через стільки секунд після останньої зміни бібліотеки
+SEP = b"\x00"
+
+
+def _align(n): return (n + 7) & ~7
+
+
+def read_changes(db_path):
+    """Лічильник змін бібліотеки (тригери на tracks), None - база без нього (старий DLL) або недоступна."""
+    try:
+        conn = sqlite3.connect(db_path, timeout=5)
+        try: return conn.execute(CHANGES_SQL).fetchone()[0]
+        finally: conn.close()
+    except (sqlite3.Error, TypeError): return None
+
+
+def build_snapshot(db_path, out_path, encoding):
+    """
+    Читає бібліотеку однією read-транзакцією і пише знімок у out_path.
+    Рядки лишаються байтами з бази (порядок heap = порядок BINARY у sqlite), decode - при читанні.
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.text_factory = bytes
+    try:
+        conn.execute("BEGIN")
+        changes = conn.execute(CHANGES_SQL).fetchone()[0]
+        rows = conn.execute(f"SELECT {TRACK_COLUMNS} FROM tracks ORDER BY {SNAPSHOT_ORDER}, id").fetchall()
+        groups = {mode: [[(name or b"Unknown").decode(encoding, 'ignore'), (sec or b"").decode(encoding, 'ignore'), count,
+                          (path or b"").decode(encoding, 'ignore'), (cover or b"").decode(encoding, 'ignore')]
+                         for name, sec, count, path, cover in conn.execute(sql)]
+                  for mode, sql in GROUPS_SQL.items()}
+        conn.execute("COMMIT")
+    finally: conn.close()
+
+    columns = dict(zip(FIELDS, zip(*rows))) if rows else {name: () for name in FIELDS}
+    sections, directory = [], {"byteorder": sys.byteorder, "encoding": encoding, "changes": changes, "rows": len(rows),
+                               "fields": list(FIELDS), "numeric": {}, "strings": {}}
+    offset = 0
+
+    def add(blob):
+        nonlocal offset
+        start = offset
+        sections.append(blob)
+        offset += len(blob)
+        pad = _align(offset) - offset
+        if pad: sections.append(b"\x00" * pad); offset += pad
+        return start
+
+    for name in FIELDS:
+        if name in NUMERIC:
+            conv = float if NUMERIC[name] == "d" else int
+            directory["numeric"][name] = [add(array(NUMERIC[name], map(conv, columns[name])).tobytes()), NUMERIC[name]]
+        else:
+            values = [v or b"" for v in columns[name]]
+            offsets, pos = array("q"), 0
+            for v in values:
+                offsets.append(pos)
+                pos += len(v) + 1
+            offsets.append(pos)
+            directory["strings"][name] = [add(offsets.tobytes()), add(SEP.join(values) + SEP)]
+    groups_blob = json.dumps(groups, ensure_ascii=False).encode("utf-8")
+    directory["groups"] = [add(groups_blob), len(groups_blob)]
+
+    head = json.dumps(directory).encode("utf-8")
+    base = _align(len(MAGIC) + 4 + len(head))
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(head)) + head)
+        f.write(b"\x00" * (base - len(MAGIC) - 4 - len(head)))
+        for blob in sections: f.write(blob)
+    return tmp, changes
+
+
+class LibrarySnapshot:
+    """
+    Відкритий знімок: числові колонки - memoryview прямо на mmap, рядки - heap з масивом зсувів.
+    Сторінка з 200 рядків декодує 200 рядків, а не всю бібліотеку.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._mm[:len(MAGIC)] != MAGIC: raise ValueError("not a library snapshot")
+            (head_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+            start = len(MAGIC) + 4
+            self.directory = json.loads(self._mm[start:start + head_len].decode("utf-8"))
+            if self.directory["byteorder"] != sys.byteorder: raise ValueError("snapshot byte order mismatch")
+        except Exception:
+            self.close()
+            raise
+        base = _align(start + head_len)
+        self._raw = memoryview(self._mm)[base:]
+        self.changes = self.directory["changes"]
+        self.encoding = self.directory["encoding"]
+        self.rows = self.directory["rows"]
+        self._views = {}  # name -> (memoryview потрібного типу, зсув, розмір елемента)
+        for name, (off, code) in self.directory["numeric"].items():
+            size = array(code).itemsize
+            self._views[name] = (self._raw[off:off + self.rows * size].cast(code), off, size)
+        self._strings = {}
+        for name, (off, heap) in self.directory["strings"].items():
+            self._strings[name] = (self._raw[off:off + (self.rows + 1) * 8].cast("q"), heap)
+
+    def close(self):
+        for view in getattr(self, "_views", {}).values(): view[0].release()
+        for offsets, _ in getattr(self, "_strings", {}).values(): offsets.release()
+        if getattr(self, "_raw", None) is not None: self._raw.release()
+        if getattr(self, "_mm", None) is not None: self._mm.close()
+        self._file.close()
+
+    def __len__(self): return self.rows
+
+    # === РЯДКИ ===
+    def _bytes(self, name, i):
+        offsets, heap = self._strings[name]
+        return self._raw[heap + offsets[i]:heap + offsets[i + 1] - 1]
+
+    def _string_column(self, name, start, stop):
+        """Рядки [start, stop) одним decode і split; поштучно - лише якщо \x00 трапився всередині тегу."""
+        offsets, heap = self._strings[name]
+        if start >= stop: return []
+        values = bytes(self._raw[heap + offsets[start]:heap + offsets[stop]]).decode(self.encoding, 'ignore').split("\x00")[:-1]
+        if len(values) != stop - start:
+            values = [bytes(self._bytes(name, i)).decode(self.encoding, 'ignore') for i in range(start, stop)]
+        return list(map(sys.intern, values)) if name in INTERNED else values
+
+    def _table(self, start, stop):
+        table = TrackTable()
+        for name in FIELDS:
+            if name in NUMERIC:
+                _, off, size = self._views[name]
+                getattr(table, name).frombytes(self._raw[off + start * size:off + stop * size])
+            else:
+                setattr(table, name, self._string_column(name, start, stop))
+        return table
+
+    def table(self, order="ASC"):
+        """Уся бібліотека в порядку (artist, id)."""
+        table = self._table(0, self.rows)
+        return table.reversed() if order == "DESC" else table
+
+    def _position(self, key):
+        """Кількість рядків з (artist, id) < key (порівняння байтів - як BINARY у sqlite)."""
+        ids = self._views["id"][0]
+        lo, hi = 0, self.rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if (bytes(self._bytes(SNAPSHOT_ORDER, mid)), ids[mid]) < key: lo = mid + 1
+            else: hi = mid
+        return lo
+
+    def page(self, order, after, limit):
+        """Keyset-сторінка в порядку (artist, id), як SqliteEngine.page / preparePage."""
+        desc = order == "DESC"
+        if after is None: start = self.rows if desc else 0
+        else:
+            key = ((after[0] or "").encode(self.encoding, 'ignore'), int(after[1]))
+            start = self._position(key) if desc else self._position((key[0], key[1] + 1))
+        if desc: return self._table(max(0, start - limit), start).reversed()
+        return self._table(start, min(self.rows, start + limit))
+
+    def groups(self, mode):
+        off, length = self.directory["groups"]
+        data = json.loads(bytes(self._raw[off:off + length]).decode("utf-8"))
+        return [tuple(row) for row in data[str(1 if mode == 1 else 2)]]
+
+
+class SnapshotStore:
+    """
+    Знімок бібліотеки біля бази (<db>.snapshot). Дійсний, поки лічильник змін у базі збігається з тим,
+    з яким його записали; інакше - перебудова у фоновому потоці, а запити тим часом ідуть у сховище.
+    """
+
+    def __init__(self, db_path, encoding, delay=SNAPSHOT_DELAY):
+        self.db_path = db_path
+        self.path = db_path + SNAPSHOT_SUFFIX
+        self.encoding = encoding
+        self.delay = delay
+        self.current = None  # LibrarySnapshot, лише якщо дійсний
+        self.stats = {"served": 0, "builds": 0, "build_ms": 0.0}
+        self._lock = threading.RLock()
+        self._timer = None
+        self._building = None
+
+    def load(self):
+        """Відкриває знімок і звіряє з базою. Застарілий або відсутній - перебудова у фоні."""
+        changes = read_changes(self.db_path)
+        if changes is None: return False  # база без лічильника змін - знімки вимкнені
+        try: snapshot = LibrarySnapshot(self.path)
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError): print(f"Library snapshot ignored: {e}")
+            snapshot = None
+        # Міграція колонок не чіпає лічильник змін - знімок зі старим набором колонок теж застарілий
+        if snapshot and snapshot.changes == changes and snapshot.encoding == self.encoding \
+                and snapshot.directory.get("fields") == list(FIELDS):
+            with self._lock: self.current = snapshot
+            return True
+        if snapshot: snapshot.close()
+        self.schedule(0)
+        return False
+
+    def invalidate(self):
+        """Бібліотека змінилась у цьому процесі: знімок більше не відповідає, перебудова - після затишшя."""
+        with self._lock:
+            if self.current: self.current.close()
+            self.current = None
+        self.schedule(self.delay)
+
+    def schedule(self, delay):
+        with self._lock:
+            if self._timer: self._timer.cancel()
+            self._timer = threading.Timer(delay, self.rebuild)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def rebuild(self):
+        with self._lock:
+            self._timer = None
+            if self._building: return False
+            self._building = True
+        try:
+            t0 = time.perf_counter()
+            tmp, changes = build_snapshot(self.db_path, self.path, self.encoding)
+            with self._lock:
+                # Знімок закривається до заміни файлу: на Windows відкритий mmap не дає його перезаписати
+                if self.current: self.current.close()
+                self.current = None
+                os.replace(tmp, self.path)
+                snapshot = LibrarySnapshot(self.path)
+                if read_changes(self.db_path) == changes: self.current = snapshot
+                else: snapshot.close()  # поки будували, бібліотека знову змінилась - чекаємо наступного invalidate
+            self.stats["builds"] += 1
+            self.stats["build_ms"] = (time.perf_counter() - t0) * 1000
+            return self.current is not None
+        except Exception as e:
+            print(f"Library snapshot rebuild failed: {e}")
+            return False
+        finally:
+            with self._lock: self._building = False
+
+    def close(self, flush=True):
+        """Зупиняє таймер; якщо перебудова чекала - робить її зараз, щоб наступний старт був теплим."""
+        with self._lock:
+            pending = self._timer is not None
+            if self._timer: self._timer.cancel()
+            self._timer = None
+        if flush and pending: self.rebuild()
+        with self._lock:
+            if self.current: self.current.close()
+            self.current = None
+
+    # === ЧИТАННЯ (None - знімка немає, питати сховище) ===
+    def _serve(self, fn):
+        with self._lock:
+            if not self.current: return None
+            self.stats["served"] += 1
+            return fn(self.current)
+
+    def page(self, order, after, limit): return self._serve(lambda s: s.page(order, after, limit))
+    def table(self, order): return self._serve(lambda s: s.table(order))
+    def groups(self, mode): return self._serve(lambda s: s.groups(mode))
\ No newline at end of file
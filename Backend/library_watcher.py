@@ -0,0 +1,191 @@
+import os
+import sys
+import json
+import time
+import struct
+import select
+import threading
+import ctypes
+import ctypes.util
+from Backend.scanner import find_mp3_files
+
+CHANGED, DELETED, DIR_DELETED = "changed", "deleted", "dir_deleted"
+WATCHED_SUFFIX = ".watched"  # JSON-список тек під наглядом поруч з базою - відновлюється при старті
+
+
+def load_watched(path):
+    try:
+        with open(path, encoding="utf-8") as f: roots = json.load(f)
+    except (OSError, ValueError): return []
+    return [r for r in roots if isinstance(r, str)] if isinstance(roots, list) else []
+
+
+def save_watched(path, roots):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f: json.dump(roots, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+class _PollingSource:
+    """Порівнює знімки {path: (size, mtime)} кожні poll_interval секунд. Працює всюди."""
+
+    def __init__(self, poll_interval=5.0):
+        self.poll_interval = poll_interval
+        self.snapshots = {}
+        self.last_poll = 0.0
+
+    def add(self, folder):
+        self.snapshots[folder] = {p: (size, mtime) for p, size, mtime in find_mp3_files(folder)}
+
+    def read(self, timeout):
+        wait = self.last_poll + self.poll_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(min(wait, timeout))
+            return []
+        self.last_poll = time.monotonic()
+        events = []
+        for folder, old in list(self.snapshots.items()):
+            new = {p: (size, mtime) for p, size, mtime in find_mp3_files(folder)}
+            for p, stamp in new.items():
+                if old.get(p) != stamp: events.append((CHANGED, p))
+            for p in old:
+                if p not in new: events.append((DELETED, p))
+            self.snapshots[folder] = new
+        return events
+
+    def close(self): self.snapshots.clear()
+
+
+class _InotifySource:
+    """inotify через ctypes (лише Linux). Кожна підпапка отримує свій watch."""
+    IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x2, 0x8, 0x40, 0x80
+    IN_CREATE, IN_DELETE, IN_DELETE_SELF, IN_IGNORED, IN_ISDIR = 0x100, 0x200, 0x400, 0x8000, 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+    HEADER = struct.Struct("iIII")
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0: raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+
+    def add(self, folder):
+        for root, dirs, files in os.walk(folder):
+            self._add_dir(root)
+
+    def _add_dir(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd >= 0: self.dirs[wd] = path
+
+    def read(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready: return []
+        try: data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError: return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = self.HEADER.unpack_from(data, offset)
+            offset += self.HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            base = self.dirs.get(wd)
+            if base is None: continue
+            if mask & self.IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            path = os.path.join(base, name) if name else base
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    # Нова папка (наприклад, скопійований альбом): дивимось всередину
+                    self.add(path)
+                    events.extend((CHANGED, p) for p, _, _ in find_mp3_files(path))
+                elif mask & (self.IN_MOVED_FROM | self.IN_DELETE):
+                    events.append((DIR_DELETED, path))
+                continue
+            if not name.lower().endswith(".mp3"): continue
+            if mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO): events.append((CHANGED, path))
+            elif mask & (self.IN_DELETE | self.IN_MOVED_FROM): events.append((DELETED, path))
+        return events
+
+    def close(self):
+        if self.fd >= 0: os.close(self.fd)
+        self.fd = -1
+
+
+class LibraryWatcher:
+    """
+    Стежить за папками бібліотеки у фоновому потоці. Події накопичуються і застосовуються
+    однією пачкою після debounce секунд тиші (але не пізніше max_delay від першої події).
+    apply_batch(changed, deleted, deleted_dirs) -> summary, on_change(summary) - раз на пачку.
+    """
+
+    def __init__(self, apply_batch, on_change=None, debounce=2.0, max_delay=30.0, poll_interval=5.0, backend="auto"):
+        self.apply_batch = apply_batch
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.source = self._make_source(backend, poll_interval)
+        self.folders = []
+        self.pending = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _make_source(self, backend, poll_interval):
+        if backend in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try: return _InotifySource()
+            except Exception as e:
+                if backend == "inotify": raise
+                print(f"inotify unavailable, falling back to polling: {e}")
+        return _PollingSource(poll_interval)
+
+    def watch(self, folder):
+        with self._lock:
+            if folder in self.folders: return
+            self.folders.append(folder)
+            self.source.add(folder)
+        self.start()
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="LibraryWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread: self._thread.join(timeout=5)
+        self._thread = None
+        self.source.close()
+
+    def _run(self):
+        first_event = last_event = None
+        while not self._stop.is_set():
+            with self._lock: watching = bool(self.folders)
+            # Чекання подій - без замка: інакше watch() з UI-потоку стоїть до пів секунди.
+            # Джерела це витримують: add() лише дописує нові теки, read() їх не перебирає на місці
+            events = self.source.read(0.5) if watching else []
+            if not watching: time.sleep(0.5)
+            now = time.monotonic()
+            for kind, path in events:
+                self.pending[path] = kind
+            if events:
+                last_event = now
+                if first_event is None: first_event = now
+            if self.pending and (now - last_event >= self.debounce or now - first_event >= self.max_delay):
+                self.flush()
+                first_event = last_event = None
+        if self.pending: self.flush()
+
+    def flush(self):
+        batch, self.pending = self.pending, {}
+        changed = [p for p, k in batch.items() if k == CHANGED]
+        deleted = [p for p, k in batch.items() if k == DELETED]
+        deleted_dirs = [p for p, k in batch.items() if k == DIR_DELETED]
+        try:
+            summary = self.apply_batch(changed, deleted, deleted_dirs)
+        except Exception as e:
+            print(f"Library watcher failed to apply changes: {e}")
+            return
+        if self.on_change and summary: self.on_change(summary)
@@ -1,117 +1,205 @@
-import ctypes
-from ctypes import *
 import os
-from mutagen.mp3 import MP3
-from mutagen.id3 import ID3, APIC
+import time
+import codecs
+import weakref
+import threading
+import functools
+from Backend.scanner import LibraryScanner, read_track_meta
+from Backend.library_watcher import LibraryWatcher, WATCHED_SUFFIX, load_watched, save_watched
+from Backend.track_table import TrackTable
+from Backend.track_pager import TrackPager
+from Backend.query_cache import QueryCache, TRACKS, RATING
+from Backend.fuzzy_index import FuzzyIndex
+from Backend.rating_queue import RatingWriteQueue
+from Backend.playback_clock import PlaybackClock
+from Backend.audio_engine import AudioEngine, make_backend
+from Backend.shuffle_queue import ShuffleQueue
+from Backend.library_snapshot import SnapshotStore, SNAPSHOT_ORDER
+from Backend.cover_store import CoverStore, COVERS_SUFFIX, is_cover_id, extract_cover
+from Backend.charts import chart_spec, CHART_SIZE, CHART_PRIOR
+from Backend.profiler import PROFILER, public_methods
+from Backend import rating_io
+from Backend.Database.cpp_engine import CppEngine, load_library
+from Backend.Database.sqlite_engine import SqliteEngine, requested_engine
 
-class TrackData(Structure):
-    _fields_ = [("id", c_int), ("path", c_char * 256), ("title", c_char * 256), ("artist", c_char * 256), 
-                ("album", c_char * 256), ("genre", c_char * 100), ("duration", c_double), ("rating", c_double), 
-                ("rate_melody", c_int), ("rate_rhythm", c_int), ("rate_vocals", c_int), 
-                ("rate_lyrics", c_int), ("rate_arrange", c_int), ("has_vocals", c_int), ("has_lyrics", c_int)]
+# 'mbcs' є лише на Windows; Linux-збірка бекенду (бенчмарки) і так працює з UTF-8
+try: codecs.lookup('mbcs')
+except LookupError: codecs.register(lambda name: codecs.lookup('utf-8') if name == 'mbcs' else None)
 
-class GroupData(Structure):
-    _fields_ = [("name", c_char * 256), ("secondary", c_char * 256), ("count", c_int), ("cover_path", c_char * 256)]
 
-class TopItemData(Structure):
-    _fields_ = [("name", c_char * 256), ("secondary", c_char * 256), ("rating", c_double), ("cover_path", c_char * 256), ("type", c_int)]
+def average_rating(data):
+    total = (data['melody'] + data['rhythm'] + data['arrange']); count = 3
+    if data['has_vocals']: total += data['vocals']; count += 1
+    if data['has_lyrics']: total += data['lyrics']; count += 1
+    return total / count if count > 0 else 0
+
+def db_locked(method):
+    """C++ бекенд тримає один курсор на тип запиту, тому вотчер і UI не мають ходити в нього одночасно."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.db_lock: return method(self, *args, **kwargs)
+    return wrapper
+
+# Внутрішні кроки, що окремо видно в профілі: збірка списків, запис у сховище, нечіткий індекс
+PROFILED_STEPS = ("_fetch_tracks", "_fetch_groups", "_add_track", "_add_tracks_bulk", "_delete_tracks_bulk",
+                  "_write_ratings", "_build_fuzzy", "_query_fuzzy", "_snapshot_read")
+# Маршалінг рядків з DLL - окремо від SQL (logic_prepare_* через обгортки над самим DLL)
+PROFILED_FETCH = ("_fetch_all_raw", "_fetch_group_rows", "_fetch_packed")
 
 class MainController:
-    def __init__(self):
+    def __init__(self, scan_workers=None, scan_mode="thread", dll_path=None, engine=None, db_path=None, audio_backend=None, snapshot=True):
+        # Обгортки ставляться першими: черга оцінок і сканер нижче запам'ятовують зв'язані методи
+        PROFILER.instrument(self, public_methods(MainController) + list(PROFILED_STEPS), "MainController")
         self.base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.dll_path = os.path.join(self.base_path, "Backend", "Database", "cpp_src", "backend.dll")
+        self.dll_path = dll_path or os.path.join(self.base_path, "Backend", "Database", "cpp_src", "backend.dll")
         self.lib = None
+        self.engine = None  # сховище: CppEngine (через DLL) або SqliteEngine
+        self.snapshot = None  # mmap-знімок бібліотеки поруч з базою, див. library_snapshot
+        self.cover_store = None  # обкладинки за вмістом поруч з базою, див. cover_store
+        self.watched_path = None  # теки під наглядом поруч з базою, див. library_watcher
         
         self.current_sort_col = "artist"
         self.current_sort_order = "ASC"
+
+        self.scanner = LibraryScanner(read_track_meta, workers=scan_workers, mode=scan_mode)
+        self.last_scan_stats = None
+
+        self.db_lock = threading.RLock()
+        self.cache = QueryCache()
+        self.fuzzy = None  # будується при першому нечіткому пошуку, далі лише оновлюється
+        self._fuzzy_rows = (None, {})  # (таблиця бібліотеки, path -> рядок)
+        self.ratings = RatingWriteQueue(self._write_ratings)
+        self._live_tables = weakref.WeakValueDictionary()  # id -> таблиця сторінкового списку, що зараз показаний
+        self.watcher = None
+        self.on_library_changed = None
+        self.clock = PlaybackClock()
+        self.audio = AudioEngine(make_backend(audio_backend), self.clock)
+        self.shuffle = ShuffleQueue()
         
-        self._load_dll()
+        choice = requested_engine(engine)
+        # Звук і порядок відтворення живуть у Python - DLL потрібна лише як сховище
+        if choice != "sqlite": self._load_dll()
+        self._open_engine(choice, db_path)
+        if self.engine:
+            db_file = os.path.abspath(self.engine.db_path)
+            self.cover_store = CoverStore(db_file + COVERS_SUFFIX)
+            self.watched_path = db_file + WATCHED_SUFFIX
+            # Воркери сканера (і ProcessPool) пишуть обкладинки в сховище самі, у meta йде лише id
+            self.scanner.reader = functools.partial(read_track_meta, cover_dir=self.cover_store.root)
+            # Процесам ProcessPool обгортка не передасться (не pickle) - там видно лише пачки запису
+            if scan_mode != "process": PROFILER.instrument(self.scanner, ("reader",), "scanner")
+        if snapshot and self.engine:
+            self.snapshot = SnapshotStore(db_file, self.engine.text_encoding)
+            self.snapshot.load()
+        self._restore_watched()
 
     def _load_dll(self):
-        if not os.path.exists(self.dll_path): return
-        try:
-            self.lib = CDLL(self.dll_path)
-            self.lib.init_system()
-            
-            # --- DATABASE ---
-            self.lib.logic_add_track.argtypes = [POINTER(TrackData)]; self.lib.logic_add_track.restype = c_bool
-            self.lib.logic_fetch_next.argtypes = [POINTER(TrackData)]; self.lib.logic_fetch_next.restype = c_bool
-            self.lib.logic_prepare_query.argtypes = [c_char_p, c_char_p, c_char_p, c_char_p]
-            
-            # --- AUDIO ---
-            if hasattr(self.lib, 'audio_get_pos'):
-                self.lib.audio_get_pos.argtypes = []
-                self.lib.audio_get_pos.restype = c_double
-            if hasattr(self.lib, 'audio_is_playing'):
-                self.lib.audio_is_playing.argtypes = []
-                self.lib.audio_is_playing.restype = c_bool
-            if hasattr(self.lib, 'audio_set_pos'):
-                self.lib.audio_set_pos.argtypes = [c_char_p, c_double]
-                self.lib.audio_set_pos.restype = None
-            
-
-            # --- RATING & TOPS ---
-            self.lib.logic_update_rating.argtypes = [c_char_p, c_double, c_int, c_int, c_int, c_int, c_int, c_int, c_int]
-            self.lib.logic_update_rating.restype = c_bool
-            
-            if hasattr(self.lib, 'logic_prepare_advanced_top'): 
-                self.lib.logic_prepare_advanced_top.argtypes = [c_int, c_int]
-                self.lib.logic_fetch_top_item.argtypes = [POINTER(TopItemData)]
-                self.lib.logic_fetch_top_item.restype = c_bool
-
-            # --- GROUPS & NAVIGATION ---
-            if hasattr(self.lib, 'logic_prepare_group_query'):
-                self.lib.logic_prepare_group_query.argtypes = [c_int]
-                self.lib.logic_fetch_next_group.argtypes = [POINTER(GroupData)]
-                self.lib.logic_fetch_next_group.restype = c_bool
-            
-            if hasattr(self.lib, 'logic_prepare_albums_by_artist'):
-                 self.lib.logic_prepare_albums_by_artist.argtypes = [c_char_p]
-                 self.lib.logic_prepare_albums_by_artist.restype = None
-
-            if hasattr(self.lib, 'logic_search_tracks'):
-                 self.lib.logic_search_tracks.argtypes = [c_char_p]
-            
-            if hasattr(self.lib, 'logic_toggle_shuffle'): self.lib.logic_toggle_shuffle.restype = c_bool
-            if hasattr(self.lib, 'logic_toggle_repeat'): self.lib.logic_toggle_repeat.restype = c_bool
-
-            if hasattr(self.lib, 'logic_prepare_albums_by_artist'):
-                 self.lib.logic_prepare_albums_by_artist.argtypes = [c_char_p]
-                 self.lib.logic_prepare_albums_by_artist.restype = None
-
-            print("C++ Backend loaded correctly.")
-        except Exception as e: print(f"❌ Error loading DLL: {e}")
+        if os.path.exists(self.dll_path): self.lib = load_library(self.dll_path)
 
-    def get_artist_albums(self, artist_name):
-        if not self.lib: return []
-        self.lib.logic_prepare_albums_by_artist(artist_name.encode('utf-8')) 
-        res = []
-        g = GroupData()
-        while self.lib.logic_fetch_next_group(byref(g)):
-            res.append((g.name.decode('mbcs', 'ignore'), g.secondary.decode('mbcs', 'ignore'), g.count, g.cover_path.decode('mbcs', 'ignore')))
-        return res
+    def _open_engine(self, choice, db_path):
+        if choice == "cpp" or (choice == "auto" and self.lib):
+            self.engine = CppEngine(self.lib) if self.lib else None
+        else:
+            self.engine = SqliteEngine(db_path) if db_path else SqliteEngine()
+        PROFILER.log(f"Storage engine: {self.engine.name if self.engine else 'none'}")
+        if self.lib:
+            exports = [name for name in vars(self.lib) if name.startswith("logic_") and "fetch" not in name]
+            PROFILER.instrument(self.lib, exports, "backend", cat="ffi")
+        if self.engine:
+            PROFILER.instrument(self.engine, public_methods(type(self.engine)) + list(PROFILED_FETCH), type(self.engine).__name__, cat="engine")
 
     # === DATABASE ===
+    @db_locked
     def clear_database(self):
-        if self.lib: self.lib.logic_clear_database()
+        self.ratings.flush()
+        if self.engine: self.engine.clear()
+        self._library_written()
+        if self.cover_store: self.cover_store.clear()
+        self.cache.clear()
+        if self.fuzzy: self.fuzzy.clear()
 
+    @db_locked
     def scan_directory(self, folder_path):
-        if not self.lib: return 0
-        count = 0
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                if file.lower().endswith('.mp3'):
-                    if self._add_track(os.path.join(root, file)): count += 1
-        return count
+        if not self.engine: return 0
+        # Корінь з роздільником: інакше /music захоплює /music2, і його треки (з оцінками) йдуть під видалення
+        root = folder_path.rstrip("\\/") + os.sep
+        known = self.engine.fingerprints(root)
+        stats = self.scanner.scan(folder_path, self._add_tracks_bulk, known=known, on_removed=self._delete_tracks_bulk)
+        self.last_scan_stats = stats
+        PROFILER.log(f"Scan: {stats['files']} files, {stats['inserted']} written, {stats['unchanged']} unchanged, "
+                     f"{stats['removed']} removed, {stats['failed']} failed "
+                     f"in {stats['seconds']:.1f}s ({stats['files_per_sec']:.0f} files/s)")
+        return stats['inserted']
+
+    def _delete_tracks_bulk(self, paths):
+        removed = self.engine.delete_tracks(paths)
+        if removed: self.cache.invalidate(TRACKS); self._library_written()
+        self._update_fuzzy(deleted=paths)
+        return removed
+
+    def _add_tracks_bulk(self, metas):
+        """Вся пачка пишеться одним викликом рушія (одна транзакція)."""
+        written = self.engine.add_tracks(metas)
+        if written: self.cache.invalidate(TRACKS); self._library_written()
+        self._update_fuzzy(metas)
+        return written
 
     def _add_track(self, path):
-        try:
-            audio = MP3(path, ID3=ID3); tags = audio.tags or ID3(); t = TrackData()
-            t.path = path.encode('mbcs'); t.title = str(tags.get('TIT2', os.path.basename(path))).encode('mbcs')
-            t.artist = str(tags.get('TPE1', 'Unknown Artist')).encode('mbcs'); t.album = str(tags.get('TALB', '-')).encode('mbcs')
-            t.genre = str(tags.get('TCON', '-')).encode('mbcs'); t.duration = audio.info.length
-            return self.lib.logic_add_track(byref(t))
-        except: return False
+        meta = self.scanner.reader(path)
+        return self._add_tracks_bulk([meta]) > 0 if meta and self.engine else False
+
+    # === WATCHER ===
+    def watch_folder(self, folder_path, remember=True):
+        """Шлях зберігається як є: події вотчера мають давати ті самі рядки path, що й скан цієї теки."""
+        if not self.watcher:
+            self.watcher = LibraryWatcher(self.apply_library_changes, on_change=self._notify_library_changed)
+        self.watcher.watch(folder_path)
+        if not remember or not self.watched_path: return
+        roots = load_watched(self.watched_path)
+        if folder_path in roots: return
+        try: save_watched(self.watched_path, roots + [folder_path])
+        except OSError as e: PROFILER.log(f"Watched folders not saved: {e}")
+
+    def _restore_watched(self):
+        """Теки, додані в попередніх запусках, знову під наглядом; зниклі з диска пропускаються."""
+        if not self.watched_path: return
+        for root in load_watched(self.watched_path):
+            if os.path.isdir(root): self.watch_folder(root, remember=False)
+            else: PROFILER.log(f"Watched folder missing, skipped: {root}")
+
+    def _notify_library_changed(self, summary):
+        if self.on_library_changed: self.on_library_changed(summary)
+
+    @db_locked
+    def apply_library_changes(self, changed, deleted, deleted_dirs=()):
+        """Одна пачка подій вотчера -> одна транзакція. Повертає підсумок для UI або None."""
+        if not self.engine: return None
+        files = []
+        for path in changed:
+            try: st = os.stat(path)
+            except OSError: continue
+            files.append((path, st.st_size, st.st_mtime))
+        metas = []
+        self.scanner.scan_files(files, lambda batch: metas.extend(batch) or 0)
+        dirs = [d.rstrip("\\/") + os.sep for d in deleted_dirs]
+
+        written = self.engine.apply_changes(metas, deleted, dirs)
+        self._update_fuzzy(metas, deleted, dirs)
+        if not written and not metas and not deleted and not dirs: return None
+        self.cache.invalidate(TRACKS)
+        self._library_written()
+        return {"changed": len(metas), "deleted": len(deleted), "deleted_dirs": len(dirs), "rows": written}
+
+    def _library_written(self):
+        if self.snapshot: self.snapshot.invalidate()
+
+    def shutdown(self):
+        if self.watcher: self.watcher.stop()
+        self.ratings.close()
+        self.audio.close()
+        if self.snapshot: self.snapshot.close()  # відкладена перебудова - зараз, наступний старт читає знімок
+        if self.engine: self.engine.close()
+        PROFILER.finish()
 
     # === FETCHING ===
     def get_playlist(self, sort_by=None):
@@ -124,87 +212,221 @@ class MainController:
         return self._fetch_tracks(self.current_sort_col, self.current_sort_order, None, None)
 
     def get_tracks_filtered(self, f_type, f_val): return self._fetch_tracks("title", "ASC", f_type, f_val)
+
+    # === PAGINATION ===
+    def get_playlist_pager(self, sort_by=None):
+        """Як get_playlist (включно з перемиканням ASC/DESC), але з першою сторінкою замість усієї бібліотеки."""
+        if sort_by:
+            if sort_by == self.current_sort_col:
+                self.current_sort_order = "DESC" if self.current_sort_order == "ASC" else "ASC"
+            else:
+                self.current_sort_col = sort_by
+                self.current_sort_order = "ASC"
+        return self._pager(self.current_sort_col, self.current_sort_order, None, None)
+
+    def get_filtered_pager(self, f_type, f_val): return self._pager("title", "ASC", f_type, f_val)
+
+    def _pager(self, sort, order, f_col, f_val):
+        pager = TrackPager(self.get_tracks_page, sort, order, f_col, f_val)
+        self._live_tables[id(pager.tracks)] = pager.tracks
+        pager.next_page()
+        return pager
+
+    @db_locked
+    def get_tracks_page(self, sort, order, f_col=None, f_val=None, after=None, limit=200):
+        """До limit рядків строго після курсора after = (значення sort, id) у порядку (sort, id)."""
+        if not self.engine: return TrackTable()
+        if sort == "rating": self.ratings.flush()
+        if not self.engine.has_pages:
+            # Старий DLL: ціла вибірка з кешу, сторінка вирізається в Python
+            table = self._fetch_tracks(sort, order, f_col, f_val)
+            start = 0
+            if after is not None:
+                start = next((i + 1 for i, t in enumerate(table) if (t.id == after[1])), len(table))
+            return table[start:start + limit]
+        page = self._snapshot_read(sort, f_col, lambda s: s.page(order, after, limit))
+        if page is None: page = self.engine.page(sort, order, f_col, f_val, after, limit)
+        return self._overlay_pending_ratings(page)
+
+    def _snapshot_read(self, sort, f_col, read):
+        """Знімок лежить у порядку (artist, id) без фільтра - лише такі запити йдуть повз сховище."""
+        if not self.snapshot or f_col or sort != SNAPSHOT_ORDER: return None
+        return read(self.snapshot)
+
+    @db_locked
     def search_tracks(self, query):
-        if not self.lib: return []
-        self.lib.logic_search_tracks(query.encode('utf-8'))
-        return self._fetch_all_raw()
+        """Точний (FTS/LIKE) пошук; якщо нічого не знайдено - нечіткий, стійкий до помилок."""
+        if not self.engine: return TrackTable()
+        found = self._cached(("search", query), (TRACKS,), lambda: self._overlay_pending_ratings(self.engine.search(query)))
+        return found if found else self.fuzzy_search(query)
+
+    # === FUZZY SEARCH ===
+    @db_locked
+    def fuzzy_search(self, query, limit=200):
+        """Пошук з помилками в написанні ("Metalica", "Bjork"). Рядки в порядку релевантності."""
+        if not self.engine: return TrackTable()
+        return self._cached(("fuzzy", query, limit), (TRACKS,), lambda: self._query_fuzzy(query, limit))
 
+    def _query_fuzzy(self, query, limit):
+        library = self._fetch_tracks("id", "ASC", None, None)
+        if self.fuzzy is None: self._build_fuzzy(library)
+        # Та сама таблиця бібліотеки живе в кеші, доки склад бібліотеки не зміниться
+        if self._fuzzy_rows[0] is not library:
+            self._fuzzy_rows = (library, {p: i for i, p in enumerate(library.path)})
+        rows = self._fuzzy_rows[1]
+        return library.take(rows[p] for p in self.fuzzy.search(query, limit) if p in rows)
+
+    def _build_fuzzy(self, library):
+        start = time.perf_counter()
+        self.fuzzy = FuzzyIndex.from_table(library)
+        report = self.fuzzy.memory_report()
+        PROFILER.log(f"Fuzzy index: {report['tracks']} tracks, {report['words']} words, "
+                     f"{report['total_bytes'] / 2**20:.1f} MB in {time.perf_counter() - start:.1f}s")
+
+    def _update_fuzzy(self, metas=(), deleted=(), deleted_dirs=()):
+        if self.fuzzy is None: return
+        # Порядок як у apply_changes рушіїв: видалення, потім нові записи
+        for d in deleted_dirs: self.fuzzy.remove_prefix(d)
+        for p in deleted: self.fuzzy.remove(p)
+        for m in metas: self.fuzzy.add(m["path"], m["title"], m["artist"], m["album"])
+
+    # === QUERY CACHE ===
+    def _cached(self, key, tags, compute):
+        value = self.cache.get(key)
+        if value is None: value = self.cache.put(key, compute(), tags)
+        return value
+
+    @db_locked
     def _fetch_tracks(self, sort, order, f_col, f_val):
-        if not self.lib: return []
-        f_col_p = f_col.encode('utf-8') if f_col else None
-        f_val_p = f_val.encode('utf-8') if f_val else None
-        self.lib.logic_prepare_query(sort.encode('utf-8'), order.encode('utf-8'), f_col_p, f_val_p)
-        return self._fetch_all_raw()
-
-    def _fetch_all_raw(self):
-        res = []
-        t = TrackData()
-        while self.lib.logic_fetch_next(byref(t)):
-            res.append((t.id, t.path.decode('mbcs', 'ignore'), t.title.decode('mbcs', 'ignore'), t.artist.decode('mbcs', 'ignore'), 
-                        t.album.decode('mbcs', 'ignore'), t.genre.decode('mbcs', 'ignore'), t.duration, t.rating, 
-                        t.rate_melody, t.rate_rhythm, t.rate_vocals, t.rate_lyrics, t.rate_arrange, t.has_vocals, t.has_lyrics))
-        return res
-
-    def get_advanced_top(self, entity, mode):
-        if not self.lib: return []
-        e_code = 0; 
-        if entity == "albums": e_code = 1
-        elif entity == "artists": e_code = 2
-        m_code = 1 if mode == "best" else 2
-        self.lib.logic_prepare_advanced_top(e_code, m_code)
-        res = []
-        item = TopItemData()
-        while self.lib.logic_fetch_top_item(byref(item)):
-            res.append({"name": item.name.decode('mbcs', 'ignore'), "secondary": item.secondary.decode('mbcs', 'ignore'), "rating": item.rating, "cover_path": item.cover_path.decode('mbcs', 'ignore'), "type": item.type})
-        return res
+        if not self.engine: return TrackTable()
+        if sort == "rating": self.ratings.flush()
+        key = ("tracks", sort, order, f_col, f_val)
+        table = self.cache.get(key)
+        if table is None:
+            # Той самий запит у зворотньому порядку вже є - просто розвертаємо його
+            flipped = self.cache.get(("tracks", sort, "DESC" if order == "ASC" else "ASC", f_col, f_val))
+            if flipped is not None: table = flipped.reversed()
+            else:
+                table = self._snapshot_read(sort, f_col, lambda s: s.table(order))
+                if table is None: table = self.engine.tracks(sort, order, f_col, f_val)
+                table = self._overlay_pending_ratings(table)
+            self.cache.put(key, table, (TRACKS, RATING) if sort == "rating" else (TRACKS,))
+        return table
+
+    def _overlay_pending_ratings(self, table):
+        """Оцінки, що ще в черзі, накладаються на щойно прочитані рядки - база їх поки не знає."""
+        pending = self.ratings.items()
+        if pending: table.apply_ratings({p: (average_rating(d), d) for p, d in pending})
+        return table
+
+    @db_locked
+    def get_chart(self, entity="track", mode="best", dimension="rating", limit=CHART_SIZE):
+        """
+        Топ-N одним запитом, без читання файлів. entity: track | album | artist | genre, dimension: rating або вимір оцінки.
+        Треки - TrackTable з повними рядками (тривалість і деталі оцінки як у базі), групи - [dict] з баєсовою оцінкою.
+        """
+        col, flag = chart_spec(entity, dimension)
+        if not self.engine: return TrackTable() if entity == "track" else []
+        self.ratings.flush()
+        return self._cached(("chart", entity, mode, dimension, limit), (TRACKS, RATING),
+                            lambda: self.engine.chart(entity, col, flag, mode == "best", CHART_PRIOR, limit))
+
+    @db_locked
+    def get_artist_rating(self, artist):
+        """Середній рейтинг оцінених треків артиста (0, якщо оцінок немає)."""
+        if not self.engine: return 0.0
+        self.ratings.flush()
+        return round(self.engine.artist_rating(artist), 2)
 
     def get_artists(self): return self._fetch_groups(1)
     def get_albums(self): return self._fetch_groups(2)
     
+    @db_locked
     def get_artist_albums(self, artist_name):
-        if not self.lib: return []
-        self.lib.logic_prepare_albums_by_artist(artist_name.encode('utf-8')) 
-        res = []
-        g = GroupData()
-        while self.lib.logic_fetch_next_group(byref(g)):
-            res.append((g.name.decode('mbcs', 'ignore'), g.secondary.decode('mbcs', 'ignore'), g.count, g.cover_path.decode('mbcs', 'ignore')))
-        return res
+        if not self.engine: return []
+        return self._cached(("artist_albums", artist_name), (TRACKS,), lambda: self.engine.artist_albums(artist_name))
 
+    @db_locked
     def _fetch_groups(self, mode):
-        if not self.lib: return []
-        self.lib.logic_prepare_group_query(mode)
-        res = []
-        g = GroupData()
-        while self.lib.logic_fetch_next_group(byref(g)):
-            res.append((g.name.decode('mbcs', 'ignore'), g.secondary.decode('mbcs', 'ignore'), g.count, g.cover_path.decode('mbcs', 'ignore')))
-        return res
+        if not self.engine: return []
+        return self._cached(("groups", mode), (TRACKS,), lambda: (self.snapshot and self.snapshot.groups(mode)) or self.engine.groups(mode))
 
+    # === RATINGS ===
     def calculate_save_rating(self, path, data):
-        if not self.lib: return False
-        total = (data['melody'] + data['rhythm'] + data['arrange']); count = 3
-        if data['has_vocals']: total += data['vocals']; count += 1
-        if data['has_lyrics']: total += data['lyrics']; count += 1
-        avg = total / count if count > 0 else 0
-        return self.lib.logic_update_rating(path.encode('mbcs'), c_double(avg), c_int(data['melody']), c_int(data['rhythm']), c_int(data['vocals']), c_int(data['lyrics']), c_int(data['arrange']), c_int(data.get('has_vocals', 1)), c_int(data.get('has_lyrics', 1)))
-
-    def get_cover_data(self, path):
-        try:
-            audio = MP3(path, ID3=ID3)
-            if audio.tags:
-                for tag in audio.tags.values():
-                    if isinstance(tag, APIC): return tag.data
-        except: pass
-        return None
-
-    def play_file(self, path): 
-        if self.lib: self.lib.audio_play(path.encode('mbcs'))
-    def toggle_pause(self): self.lib.audio_pause()
-    def is_playing(self): return self.lib.audio_is_playing() if self.lib else False
-    def get_audio_time(self): return self.lib.audio_get_pos() if self.lib else 0.0
-    def set_time(self, path, s): self.lib.audio_set_pos(path.encode('mbcs'), c_double(s))
+        """Оцінка йде в чергу запису; кеш і показані списки оновлюються одразу."""
+        if not self.engine: return False
+        with self.db_lock: self._apply_ratings_to_views({path: (average_rating(data), data)})
+        self.ratings.put(path, data)
+        return True
+
+    def flush_ratings(self): return self.ratings.flush()
+
+    @db_locked
+    def _write_ratings(self, items):
+        """[(path, data)] -> база пакетним записом рушія."""
+        if not self.engine: return 0
+        self._library_written()
+        return self.engine.update_ratings([(path, average_rating(data), data) for path, data in items])
+
+    def _apply_ratings_to_views(self, updates):
+        # Сортування за рейтингом і топи перераховуються; решта списків латається на місці
+        self.cache.invalidate(RATING)
+        for value in self.cache.values():
+            if isinstance(value, TrackTable): value.apply_ratings(updates)
+        for table in list(self._live_tables.values()): table.apply_ratings(updates)
+        self.shuffle.apply_ratings(updates)
+
+    @db_locked
+    def import_ratings(self, file_path):
+        """CSV/JSON з оцінками -> база одним пакетним записом. Трек шукається за шляхом, потім за (артист, назва)."""
+        start = time.perf_counter()
+        records = rating_io.read_ratings(file_path)
+        library = self._fetch_tracks("id", "ASC", None, None)
+        paths = set(library.path)
+        by_name = {(a.casefold(), t.casefold()): p for p, a, t in zip(library.path, library.artist, library.title)}
+        items = {}
+        for r in records:
+            path = r["path"] if r["path"] in paths else by_name.get((r["artist"].casefold(), r["title"].casefold()))
+            if path: items[path] = {k: r[k] for k in rating_io.RATING_COLUMNS}
+        self.ratings.flush()
+        written = self._write_ratings(list(items.items()))
+        self._apply_ratings_to_views({p: (average_rating(d), d) for p, d in items.items()})
+        seconds = time.perf_counter() - start
+        stats = {"records": len(records), "matched": len(items), "written": written,
+                 "skipped": len(records) - len(items), "seconds": seconds,
+                 "rows_per_sec": len(records) / seconds if seconds > 0 else 0.0}
+        PROFILER.log(f"Ratings import: {stats['records']} records, {stats['written']} written, {stats['skipped']} unmatched "
+                     f"in {seconds:.2f}s ({stats['rows_per_sec']:.0f} rows/s)")
+        return stats
+
+    @db_locked
+    def export_ratings(self, file_path, rated_only=True):
+        self.ratings.flush()
+        return rating_io.export_ratings(self._fetch_tracks("id", "ASC", None, None), file_path, rated_only)
+
+    def get_cover_data(self, ref):
+        """ref - id обкладинки (t.cover, групи, топи) або шлях треку, для якого id ще немає (база до v7)."""
+        if is_cover_id(ref): return self.cover_store.get(ref) if self.cover_store else None
+        from mutagen.mp3 import MP3
+        from mutagen.id3 import ID3
+        try: return extract_cover(MP3(ref, ID3=ID3).tags)
+        except: return None
+
+    # === AUDIO ===
+    # Позицію і стан UI читає з self.clock; команди йдуть в AudioEngine
+    def play_file(self, path, duration=0.0): return self.audio.play(path, duration)
+    def preload_file(self, path, duration=0.0): self.audio.preload(path, duration)
+    def toggle_pause(self): self.audio.toggle_pause()
+    def is_playing(self): return self.clock.is_playing
+    def get_audio_time(self): return self.clock.position()
+    def set_time(self, path, s): self.audio.seek(s)
+    def confirm_track_end(self): return self.audio.check_end()
     
-    def toggle_shuffle(self): return self.lib.logic_toggle_shuffle() if self.lib else False
-    def toggle_repeat(self): return self.lib.logic_toggle_repeat() if self.lib else False
+    # === ЧЕРГА ВІДТВОРЕННЯ ===
+    def set_play_queue(self, tracks): self.shuffle.set_playlist(tracks)
+    def toggle_shuffle(self): return self.shuffle.cycle_mode()  # off -> shuffle -> smart -> off
+    def set_shuffle_focus(self, focus): self.shuffle.set_focus(focus)
+    def toggle_repeat(self): return self.shuffle.toggle_repeat()
     
-    def get_next_index(self, c, t): return self.lib.logic_get_next_index(c, t) if self.lib else -1
-    def get_prev_index(self, c, t): return self.lib.logic_get_prev_index(c, t) if self.lib else -1
\ No newline at end of file
+    def get_next_index(self, c, t): return self.shuffle.next_index(c, t)
+    def get_prev_index(self, c, t): return self.shuffle.prev_index(c, t)
\ No newline at end of file
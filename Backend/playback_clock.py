@@ -0,0 +1,75 @@
+import time
+import threading
+
+STOPPED, PLAYING, PAUSED, ENDED = "stopped", "playing", "paused", "ended"
+
+# Якщо рушій ще грає після кінця за тегами (тривалість у тегах занижена) - наступна перевірка через стільки секунд
+END_GRACE = 1.0
+
+
+class PlaybackClock:
+    """
+    Годинник відтворення. Аудіо-рушій повідомляє лише зміни стану і якір (позиція, monotonic-час),
+    а позиція між подіями рахується локально: якір + час, що минув, поки грає.
+    Слухачі subscribe(fn) отримують fn(clock) на кожну подію - у потоці, який її повідомив.
+    """
+
+    def __init__(self, now=time.monotonic):
+        self._now = now
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.state = STOPPED
+        self.path = None
+        self.duration = 0.0
+        self.generation = 0  # росте з кожною подією: таймер кінця треку від старого якоря себе ігнорує
+        self._anchor_pos = 0.0
+        self._anchor_time = 0.0
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+        return lambda: self._listeners.remove(callback)
+
+    # === ПОДІЇ РУШІЯ ===
+    def start(self, path, duration, position=0.0):
+        self._set(PLAYING, position, path=path, duration=max(0.0, duration or 0.0))
+
+    def pause(self):
+        if self.state == PLAYING: self._set(PAUSED, self.position())
+
+    def resume(self):
+        if self.state == PAUSED: self._set(PLAYING, self._anchor_pos)
+
+    def seek(self, position, playing=True):
+        if self.state != STOPPED: self._set(PLAYING if playing else self.state, position)
+
+    def anchor(self, position):
+        """Звірка з реальною позицією рушія (рідко, не щосекунди)."""
+        if self.state == STOPPED: return
+        if self.duration and position >= self.duration: self.duration = position + END_GRACE
+        self._set(self.state, position)
+
+    def finish(self): self._set(ENDED, self.duration)
+    def stop(self): self._set(STOPPED, 0.0, path=None, duration=0.0)
+
+    def _set(self, state, position, **track):
+        with self._lock:
+            for key, value in track.items(): setattr(self, key, value)
+            self.state = state
+            self._anchor_pos = min(max(0.0, position), self.duration) if self.duration else max(0.0, position)
+            self._anchor_time = self._now()
+            self.generation += 1
+        for callback in list(self._listeners): callback(self)
+
+    # === ЧИТАННЯ (без FFI) ===
+    @property
+    def is_playing(self): return self.state == PLAYING
+
+    def position(self):
+        with self._lock:
+            pos = self._anchor_pos
+            if self.state == PLAYING: pos += self._now() - self._anchor_time
+            return min(pos, self.duration) if self.duration else pos
+
+    def remaining(self):
+        """Секунд до кінця треку; None, якщо тривалість невідома."""
+        return max(0.0, self.duration - self.position()) if self.duration else None
\ No newline at end of file
@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import threading
+import functools
+from collections import deque
+from Backend.track_table import TrackTable
+
+# "1" - збирати заміри; шлях до .json - збирати і при виході записати Chrome trace (chrome://tracing, Perfetto)
+PROFILE_ENV = "MUSIC_PROFILE"
+SAMPLE_LIMIT = 4096  # останні заміри на ім'я, з них рахуються перцентилі
+TRACE_LIMIT = 200000  # подій у trace; старіші витісняються
+PERCENTILES = (50, 95, 99)
+
+
+def public_methods(cls):
+    """Публічні методи класу (без успадкованих від tkinter/object) - те, що бачить решта програми."""
+    return [name for klass in cls.__mro__ if klass.__module__.startswith(("Backend", "Frontend"))
+            for name, value in vars(klass).items() if not name.startswith("_") and callable(value)]
+
+
+def _rows(result):
+    """Скільки рядків повернув виклик: TrackTable, список груп або TrackPager; інше - None."""
+    if isinstance(result, (TrackTable, list, tuple)): return len(result)
+    tracks = getattr(result, "tracks", None)
+    return len(tracks) if isinstance(tracks, TrackTable) else None
+
+
+def _percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class Profiler:
+    """
+    Заміри гарячих шляхів. Вимкнений - instrument() нічого не підміняє, тож ціна нульова.
+    Увімкнений - підмінені методи пишуть тривалість, потік і кількість рядків:
+    зведення (кількість, перцентилі, рядки) для вікна статистики і події для Chrome trace.
+    """
+
+    def __init__(self, setting=None):
+        self.enabled = False
+        self.trace_path = None
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self.reset()
+        self.configure(setting)
+
+    def configure(self, setting):
+        """None/""/"0" - вимкнено, "1" - лише статистика, інакше - шлях для trace при виході."""
+        setting = (setting or "").strip()
+        self.enabled = setting.lower() not in ("", "0", "off", "false")
+        self.trace_path = setting if self.enabled and setting.lower() not in ("1", "on", "true") else None
+        return self.enabled
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}  # name -> [cat, count, total_ms, max_ms, rows, deque(мс)]
+            self._events = deque(maxlen=TRACE_LIMIT)
+            self._threads = {}
+
+    # === ПІДМІНА ===
+    def wrap(self, fn, name, cat="app"):
+        if getattr(fn, "__profiled__", False): return fn  # другий контролер на тому ж DLL не обгортає двічі
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = None
+            try:
+                result = fn(*args, **kwargs)
+                return result
+            finally: self.record(name, cat, start, time.perf_counter(), _rows(result))
+        timed.__profiled__ = True
+        return timed
+
+    def instrument(self, obj, names, prefix, cat="app"):
+        """Підміняє методи obj (на екземплярі) обгортками з замірами. Вимкнений профайлер - нічого."""
+        if not self.enabled or obj is None: return 0
+        count = 0
+        for name in names:
+            fn = getattr(obj, name, None)
+            if not callable(fn): continue
+            setattr(obj, name, self.wrap(fn, f"{prefix}.{name}", cat))
+            count += 1
+        return count
+
+    def record(self, name, cat, start, end, rows=None):
+        ms = (end - start) * 1000
+        thread = threading.current_thread()
+        with self._lock:
+            entry = self._stats.get(name)
+            if entry is None: entry = self._stats[name] = [cat, 0, 0.0, 0.0, 0, deque(maxlen=SAMPLE_LIMIT)]
+            entry[1] += 1
+            entry[2] += ms
+            if ms > entry[3]: entry[3] = ms
+            if rows: entry[4] += rows
+            entry[5].append(ms)
+            self._threads[thread.ident] = thread.name
+            self._events.append((name, cat, start, end - start, thread.ident, rows))
+
+    def log(self, message):
+        """Діагностика контролера (рушій, скан, індекси): у консоль лише з увімкненим профайлером."""
+        if self.enabled: print(message)
+
+    # === ЗВІТИ ===
+    def stats(self):
+        """[{name, cat, count, total_ms, mean_ms, p50_ms, p95_ms, p99_ms, max_ms, rows}], найдорожчі першими."""
+        with self._lock: snapshot = [(name, *entry[:5], sorted(entry[5])) for name, entry in self._stats.items()]
+        res = []
+        for name, cat, count, total, peak, rows, samples in snapshot:
+            item = {"name": name, "cat": cat, "count": count, "total_ms": round(total, 3), "mean_ms": round(total / count, 3)}
+            for p in PERCENTILES: item[f"p{p}_ms"] = round(_percentile(samples, p), 3)
+            item.update(max_ms=round(peak, 3), rows=rows)
+            res.append(item)
+        return sorted(res, key=lambda item: item["total_ms"], reverse=True)
+
+    def summary(self, limit=15):
+        """Таблиця для консолі і вікна статистики (limit=None - усі рядки)."""
+        lines = [f"{'name':<44} {'count':>7} {'total ms':>10} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'rows':>9}"]
+        for s in self.stats()[:limit]:
+            lines.append(f"{s['name']:<44} {s['count']:>7} {s['total_ms']:>10.1f} {s['p50_ms']:>8.2f} "
+                         f"{s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f} {s['max_ms']:>8.2f} {s['rows']:>9}")
+        return "\n".join(lines)
+
+    def trace(self):
+        """Chrome trace (JSON Object Format): повні події "X" з мікросекундами від старту процесу."""
+        pid = os.getpid()
+        with self._lock: events, threads = list(self._events), dict(self._threads)
+        out = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}} for tid, name in threads.items()]
+        for name, cat, start, dur, tid, rows in events:
+            event = {"name": name, "cat": cat, "ph": "X", "pid": pid, "tid": tid,
+                     "ts": round((start - self._origin) * 1e6, 1), "dur": round(dur * 1e6, 1)}
+            if rows is not None: event["args"] = {"rows": rows}
+            out.append(event)
+        return {"traceEvents": out, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path=None):
+        path = path or self.trace_path
+        if not path: return None
+        with open(path, "w", encoding="utf-8") as f: json.dump(self.trace(), f)
+        return path
+
+    def finish(self):
+        """При виході: зведення в консоль і trace, якщо задано шлях."""
+        if not self.enabled or not self._stats: return
+        print(self.summary())
+        try:
+            if self.write_trace(): print(f"Profile trace: {self.trace_path}")
+        except OSError as e: print(f"Profile trace not written: {e}")
+
+
+PROFILER = Profiler(os.environ.get(PROFILE_ENV))
\ No newline at end of file
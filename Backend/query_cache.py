@@ -0,0 +1,40 @@
+from collections import OrderedDict
+
+# Від чого залежить закешований результат - саме ці теги інвалідує відповідний запис у базу
+TRACKS = "tracks"    # склад бібліотеки і теги: add / delete / clear
+RATING = "rating"    # порядок або склад залежить від рейтингу: sort by rating, топи
+
+
+class QueryCache:
+    """LRU результатів запитів з ключем за формою запиту і точковою інвалідацією за тегами."""
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (value, tags)
+        self.stats = {"hits": 0, "misses": 0, "invalidated": 0}
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[0]
+
+    def put(self, key, value, tags):
+        self.entries[key] = (value, frozenset(tags))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries: self.entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *tags):
+        stale = [k for k, (_, t) in self.entries.items() if t.intersection(tags)]
+        for k in stale: del self.entries[k]
+        self.stats["invalidated"] += len(stale)
+
+    def values(self): return [v for v, _ in self.entries.values()]
+
+    def clear(self):
+        self.stats["invalidated"] += len(self.entries)
+        self.entries.clear()
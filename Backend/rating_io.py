@@ -0,0 +1,73 @@
+import os
+import csv
+import json
+from Backend.track_table import RATING_KEYS
+
+RATING_COLUMNS = tuple(RATING_KEYS)  # melody, rhythm, vocals, lyrics, arrange, has_vocals, has_lyrics
+EXPORT_COLUMNS = ("path", "artist", "title", "album", "rating") + RATING_COLUMNS
+DIMENSIONS = RATING_COLUMNS[:5]
+
+
+def _format(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext not in (".csv", ".json"): raise ValueError(f"Unsupported ratings file (expected .csv or .json): {file_path}")
+    return ext[1:]
+
+
+# === EXPORT ===
+def export_ratings(table, file_path, rated_only=True):
+    """Пише оцінки з TrackTable у CSV або JSON (за розширенням). Повертає кількість рядків."""
+    columns = [table.path, table.artist, table.title, table.album, table.rating] + [getattr(table, RATING_KEYS[k]) for k in RATING_COLUMNS]
+    rows = (r for r in zip(*columns) if not rated_only or r[4] > 0)
+    if _format(file_path) == "csv":
+        with open(file_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            count = 0
+            for count, row in enumerate(rows, 1): writer.writerow(row)
+        return count
+    records = [dict(zip(EXPORT_COLUMNS, r)) for r in rows]
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=1)
+    return len(records)
+
+
+# === IMPORT ===
+def read_ratings(file_path):
+    """Записи з CSV або JSON у вигляді {path, artist, title, <RATING_COLUMNS>}. Некоректні рядки пропускаються."""
+    if _format(file_path) == "csv":
+        with open(file_path, newline="", encoding="utf-8-sig") as f: raw = list(csv.DictReader(f))
+    else:
+        with open(file_path, encoding="utf-8") as f: raw = json.load(f)
+        if isinstance(raw, dict): raw = raw.get("ratings", [])
+    records = []
+    for item in raw:
+        record = normalize_record(item)
+        if record: records.append(record)
+    return records
+
+
+def _score(value):
+    score = value if type(value) is int else int(round(float(value)))
+    return 0 if score < 0 else 10 if score > 10 else score
+
+
+def normalize_record(item):
+    """Оцінки 0..10, прапорці 0/1. Якщо інший інструмент дав лише загальний rating - він іде в усі п'ять вимірів."""
+    if not isinstance(item, dict): return None
+    path, artist, title = item.get("path") or "", item.get("artist") or "", item.get("title") or ""
+    if not path and not (artist and title): return None
+    try:
+        if any(item.get(k) not in (None, "") for k in DIMENSIONS):
+            record = {k: _score(item.get(k) or 0) for k in DIMENSIONS}
+        elif item.get("rating") not in (None, ""):
+            record = dict.fromkeys(DIMENSIONS, _score(item["rating"]))
+        else:
+            return None
+        for flag in ("has_vocals", "has_lyrics"):
+            value = item.get(flag)
+            record[flag] = 1 if value in (None, "") else int(str(value).strip().lower() in ("1", "true", "yes"))
+    except (TypeError, ValueError):
+        return None
+    record.update(path=path, artist=artist, title=title)
+    return record
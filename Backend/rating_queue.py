@@ -0,0 +1,69 @@
+import threading
+
+
+class RatingWriteQueue:
+    """
+    Відкладений запис оцінок. Повторні оцінки того ж треку зливаються в одну,
+    пачка пишеться одним викликом flush_fn([(path, data)]) через delay секунд після першої зміни,
+    одразу при max_pending треках, або при flush()/close().
+    """
+
+    def __init__(self, flush_fn, delay=2.0, max_pending=500):
+        self.flush_fn = flush_fn
+        self.delay = delay
+        self.max_pending = max_pending
+        self.pending = {}  # path -> data (остання оцінка)
+        self.writing = {}  # path -> data, що зараз пишеться: видно читачам, доки запис не завершився
+        self.stats = {"queued": 0, "coalesced": 0, "flushes": 0, "written": 0}
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def put(self, path, data):
+        with self._lock:
+            if path in self.pending: self.stats["coalesced"] += 1
+            self.pending[path] = dict(data)
+            self.stats["queued"] += 1
+            full = len(self.pending) >= self.max_pending
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full: self.flush()
+
+    def get(self, path):
+        with self._lock: return self.pending.get(path, self.writing.get(path))
+
+    def items(self):
+        """Усі ще не записані в базу оцінки, разом з пачкою, що пишеться зараз (новіші - з pending)."""
+        with self._lock: return list({**self.writing, **self.pending}.items())
+
+    def __len__(self): return len(self.pending)
+
+    def flush(self):
+        """Записує все, що накопичилось. Повертає кількість записаних треків."""
+        with self._lock:
+            batch, self.pending = self.pending, {}
+            # Поки flush_fn чекає на базу, читання між чергою і записом бачать пачку через items()
+            self.writing.update(batch)
+            if self._timer: self._timer.cancel()
+            self._timer = None
+        if not batch: return 0
+        try:
+            written = self.flush_fn(list(batch.items()))
+        except Exception as e:
+            # Не губимо оцінки: повертаємо в чергу все, що не перезаписали новіші
+            with self._lock:
+                self._done(batch)
+                for path, data in batch.items(): self.pending.setdefault(path, data)
+            print(f"Rating queue flush failed: {e}")
+            return 0
+        with self._lock: self._done(batch)
+        self.stats["flushes"] += 1
+        self.stats["written"] += written
+        return written
+
+    def _done(self, batch):
+        for path, data in batch.items():
+            if self.writing.get(path) is data: del self.writing[path]
+
+    def close(self): return self.flush()
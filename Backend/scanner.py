@@ -0,0 +1,115 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from Backend.cover_store import CoverStore, extract_cover
+
+
+def read_track_meta(path, cover_dir=None):
+    """
+    Читає теги одного MP3. Функція модульного рівня, щоб її можна було віддати в ProcessPool.
+    cover_dir - корінь CoverStore: обкладинка зберігається там (один раз на зображення), у meta лише її id.
+    """
+    from mutagen.mp3 import MP3  # mutagen вантажиться при першому скануванні, а не на старті
+    from mutagen.id3 import ID3
+    try:
+        audio = MP3(path, ID3=ID3)
+        tags = audio.tags or ID3()
+        meta = {
+            "path": path,
+            "title": str(tags.get('TIT2', os.path.basename(path))),
+            "artist": str(tags.get('TPE1', 'Unknown Artist')),
+            "album": str(tags.get('TALB', '-')),
+            "genre": str(tags.get('TCON', '-')),
+            "duration": audio.info.length
+        }
+    except Exception:
+        return None
+    if cover_dir:
+        data = extract_cover(audio.tags)
+        try: meta["cover"] = CoverStore(cover_dir).put(data) if data else ""
+        except OSError: meta["cover"] = None  # NULL у базі: наступне сканування перечитає цей файл
+    return meta
+
+
+def find_mp3_files(folder):
+    """Повертає [(path, size, mtime)]. scandir віддає stat без зайвих системних викликів на Windows."""
+    found = []
+    stack = [folder]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False): stack.append(entry.path)
+                        elif entry.name.lower().endswith('.mp3'):
+                            st = entry.stat()
+                            found.append((os.path.join(current, entry.name), st.st_size, st.st_mtime))
+                    except OSError: continue
+        except OSError: continue
+    return found
+
+
+class LibraryScanner:
+    """Парсить теги в пулі воркерів і віддає їх пачками в bulk-insert."""
+
+    def __init__(self, reader=read_track_meta, workers=None, mode="thread", batch_size=500):
+        if mode not in ("thread", "process"): raise ValueError(f"Unknown scan mode: {mode}")
+        self.reader = reader
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.mode = mode
+        self.batch_size = batch_size
+
+    def _make_pool(self):
+        if self.mode == "process": return ProcessPoolExecutor(max_workers=self.workers)
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+    def scan(self, folder, on_batch, known=None, on_removed=None):
+        """
+        on_batch(list_of_meta) -> кількість записаних рядків.
+        known: {path: (size, mtime)} з бази - незмінені файли пропускаються без читання тегів,
+        а зниклі віддаються однією пачкою в on_removed(list_of_paths).
+        """
+        start = time.perf_counter()
+        files = find_mp3_files(folder)
+        stats = {"unchanged": 0, "removed": 0}
+        if known:
+            seen = set()
+            changed = []
+            for path, size, mtime in files:
+                seen.add(path)
+                if known.get(path) == (size, mtime): stats["unchanged"] += 1
+                else: changed.append((path, size, mtime))
+            gone = [p for p in known if p not in seen]
+            if gone and on_removed: stats["removed"] = on_removed(gone)
+            files = changed
+        stats.update(self.scan_files(files, on_batch))
+        stats["files"] += stats["unchanged"]
+        stats["seconds"] = time.perf_counter() - start
+        stats["files_per_sec"] = stats["files"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        return stats
+
+    def scan_files(self, files, on_batch):
+        """files: [(path, size, mtime)]. Теги читаються в пулі, порядок зберігається."""
+        start = time.perf_counter()
+        stats = {"files": len(files), "parsed": 0, "failed": 0, "inserted": 0}
+        batch = []
+        if files:
+            paths = [f[0] for f in files]
+            chunk = max(1, len(paths) // (self.workers * 8)) if self.mode == "process" else 1
+            with self._make_pool() as pool:
+                for (path, size, mtime), meta in zip(files, pool.map(self.reader, paths, chunksize=min(chunk, 256))):
+                    if meta is None:
+                        stats["failed"] += 1
+                        continue
+                    meta["size"] = size; meta["mtime"] = mtime
+                    stats["parsed"] += 1
+                    batch.append(meta)
+                    if len(batch) >= self.batch_size:
+                        stats["inserted"] += on_batch(batch)
+                        batch = []
+            if batch: stats["inserted"] += on_batch(batch)
+
+        stats["seconds"] = time.perf_counter() - start
+        stats["files_per_sec"] = stats["files"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        return stats
@@ -0,0 +1,251 @@
+import random
+import threading
+
+OFF, SHUFFLE, SMART = "off", "shuffle", "smart"
+MODES = (OFF, SHUFFLE, SMART)
+
+ALIAS_BLOCK = 512  # зміна ваги перебудовує лише свій блок і верхню таблицю: O(блок + n/блок), а не O(n)
+HISTORY_LIMIT = 5000
+SMART_UNRATED = 5.0  # нерозцінений трек важить як середня оцінка - інакше розумний шафл його ніколи не покаже
+SMART_POWER = 2  # 10 балів випадає в 4 рази частіше за 5
+
+
+def smart_weight(score):
+    return (score if score > 0 else SMART_UNRATED) ** SMART_POWER
+
+
+class AliasTable:
+    """Метод псевдонімів (Vose): вибір з дискретного розподілу за O(1), побудова O(n)."""
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = sum(weights)
+        self.total = total
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        if n == 0 or total <= 0: return  # усі ваги нульові - рівномірно
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s], self.alias[s] = scaled[s], l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+
+    def sample(self, rnd):
+        i = int(rnd.random() * len(self.prob))
+        return i if rnd.random() < self.prob[i] else self.alias[i]
+
+
+class BlockAliasSampler:
+    """
+    Дворівнева таблиця псевдонімів: верхня обирає блок за сумою ваг, блокова - трек у ньому.
+    Вибір - два O(1) кроки; set_weight лише позначає блок брудним, перебудова - при наступному виборі.
+    """
+
+    def __init__(self, weights=(), block=ALIAS_BLOCK):
+        self.block = block
+        self.weights = []
+        self._blocks = []
+        self._dirty = set()
+        self._top = None
+        self.extend(list(weights))
+
+    def __len__(self): return len(self.weights)
+
+    def extend(self, weights):
+        if not weights: return
+        start = len(self.weights)
+        self.weights.extend(weights)
+        for b in range(start // self.block, (len(self.weights) + self.block - 1) // self.block):
+            if b == len(self._blocks): self._blocks.append(None)
+            self._dirty.add(b)
+
+    def set_weight(self, i, weight):
+        if self.weights[i] == weight: return
+        self.weights[i] = weight
+        self._dirty.add(i // self.block)
+
+    def _rebuild(self):
+        for b in self._dirty:
+            self._blocks[b] = AliasTable(self.weights[b * self.block:(b + 1) * self.block])
+        self._dirty.clear()
+        self._top = AliasTable([t.total for t in self._blocks])
+
+    def sample(self, rnd):
+        if not self.weights: return -1
+        if self._dirty: self._rebuild()
+        b = self._top.sample(rnd)
+        return b * self.block + self._blocks[b].sample(rnd)
+
+
+class ShuffleQueue:
+    """
+    Порядок відтворення плейлиста без викликів у DLL.
+    shuffle - перестановка, що будується ліниво (Фішер-Єйтс по кроку на трек): next/prev за O(1),
+              prev іде назад по вже зіграних, після кінця при repeat - нове перемішування.
+    smart   - вибір з вагою за rating (або за однією з оцінок, focus="melody"...) через BlockAliasSampler,
+              з історією для prev.
+    next_index/prev_index ідемпотентні: плеєр може спитати наступний наперед (preload), а перейти пізніше.
+    """
+
+    def __init__(self, seed=None):
+        self.mode = OFF
+        self.repeat = False
+        self.focus = None  # None - загальний rating, або ключ оцінки з RATING_KEYS
+        self.rnd = random.Random(seed)
+        self.tracks = None
+        self.total = 0
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._order, self._pos_of = [], []  # перестановка і зворотний індекс (трек -> позиція)
+        self._fixed = 0  # позиції [0, _fixed) вже визначені (зіграні або обрані наступними)
+        self._wrap_from = None  # після нового перемішування на repeat: трек, з якого почалось нове коло
+        self._history, self._hpos = [], -1
+        self._sampler = None
+        self._index_of = None  # path -> індекс, для оновлення ваг після оцінок
+
+    # === НАЛАШТУВАННЯ ===
+    def set_playlist(self, tracks):
+        """tracks - TrackTable (може рости на місці, як у TrackPager) або None, якщо відома лише довжина."""
+        with self._lock:
+            self.tracks = tracks
+            self.total = 0
+            self._reset()
+            if tracks is not None: self._sync(len(tracks))
+
+    def set_mode(self, mode):
+        if mode not in MODES: raise ValueError(f"Unknown shuffle mode: {mode}")
+        with self._lock:
+            self.mode = mode
+            self._reset()
+            self._sync(self.total)
+        return mode
+
+    def cycle_mode(self): return self.set_mode(MODES[(MODES.index(self.mode) + 1) % len(MODES)])
+
+    def toggle_repeat(self):
+        self.repeat = not self.repeat
+        return self.repeat
+
+    def set_focus(self, focus):
+        with self._lock:
+            self.focus = focus
+            self._sampler = None
+            self._sync(self.total)
+
+    # === ВНУТРІШНЄ ===
+    def _sync(self, total):
+        """Плейлист підріс (нові сторінки): нові треки стають у ще не зіграну частину перестановки."""
+        if total < self.total: self._reset()  # плейлист замінили коротшим
+        self.total = total
+        if self.mode == SHUFFLE:
+            self._order.extend(range(len(self._order), total))
+            self._pos_of.extend(range(len(self._pos_of), total))
+        elif self.mode == SMART:
+            if self._sampler is None: self._sampler = BlockAliasSampler()
+            self._sampler.extend([self._weight(i) for i in range(len(self._sampler), total)])
+
+    def _weight(self, i):
+        if self.tracks is None or i >= len(self.tracks): return smart_weight(0)
+        if self.focus: return smart_weight(getattr(self.tracks, f"rate_{self.focus}")[i])
+        return smart_weight(self.tracks.rating[i])
+
+    def _swap(self, a, b):
+        order, pos_of = self._order, self._pos_of
+        order[a], order[b] = order[b], order[a]
+        pos_of[order[a]], pos_of[order[b]] = a, b
+
+    def _visit_order(self, current):
+        """Трек, обраний напряму (клік у списку), стає наступним у визначеній частині перестановки."""
+        if self._pos_of[current] >= self._fixed:
+            self._swap(self._pos_of[current], self._fixed)
+            self._fixed += 1
+        if current != self._wrap_from: self._wrap_from = None
+
+    def _fix(self, p):
+        """Визначає позицію p: один крок Фішера-Єйтса."""
+        if p >= self._fixed:
+            self._swap(p, self.rnd.randrange(p, self.total))
+            self._fixed = p + 1
+
+    def _reshuffle(self, current):
+        # Нове коло: попередня перестановка стає невизначеною, тільки поточний трек не має звучати двічі поспіль
+        self._fixed = 0
+        self._fix(0)
+        if self._order[0] == current and self.total > 1:
+            self._swap(0, self.rnd.randrange(1, self.total))
+        self._wrap_from = current
+
+    def _visit_history(self, current):
+        h = self._history
+        if 0 <= self._hpos and h[self._hpos] == current: return
+        if self._hpos + 1 < len(h) and h[self._hpos + 1] == current: self._hpos += 1
+        elif self._hpos > 0 and h[self._hpos - 1] == current: self._hpos -= 1
+        else:
+            del h[self._hpos + 1:]
+            h.append(current)
+            self._hpos = len(h) - 1
+        if len(h) > HISTORY_LIMIT:
+            drop = len(h) - HISTORY_LIMIT
+            del h[:drop]
+            self._hpos -= drop
+
+    # === НАВІГАЦІЯ ===
+    def next_index(self, current, total):
+        with self._lock:
+            self._sync(total)
+            if total <= 0: return -1
+            if self.mode == OFF or not 0 <= current < total:
+                if current + 1 >= total: return 0 if self.repeat else -1
+                return current + 1
+            if self.mode == SHUFFLE:
+                if self._wrap_from == current: return self._order[0]
+                self._visit_order(current)
+                p = self._pos_of[current] + 1
+                if p >= total:
+                    if not self.repeat: return -1
+                    self._reshuffle(current)
+                    return self._order[0]
+                self._fix(p)
+                return self._order[p]
+            self._visit_history(current)
+            if self._hpos + 1 < len(self._history): return self._history[self._hpos + 1]
+            pick = self._sampler.sample(self.rnd)
+            for _ in range(3):  # той самий трек двічі поспіль - перекидаємо (кілька спроб, щоб не зациклитись на одному)
+                if pick != current or total == 1: break
+                pick = self._sampler.sample(self.rnd)
+            self._history.append(pick)
+            return pick
+
+    def prev_index(self, current, total):
+        with self._lock:
+            self._sync(total)
+            if total <= 0: return -1
+            if self.mode == OFF or not 0 <= current < total:
+                if current - 1 < 0: return total - 1 if self.repeat else 0
+                return current - 1
+            if self.mode == SHUFFLE:
+                self._visit_order(current)
+                p = self._pos_of[current]
+                return self._order[p - 1] if p > 0 else current
+            self._visit_history(current)
+            return self._history[self._hpos - 1] if self._hpos > 0 else current
+
+    # === ОЦІНКИ ===
+    def apply_ratings(self, updates):
+        """updates = {path: (rating, details)}. Таблиця плейлиста вже пропатчена - тут лише ваги."""
+        with self._lock:
+            if self.mode != SMART or self._sampler is None or self.tracks is None: return 0
+            if self._index_of is None or len(self._index_of) < len(self.tracks):
+                self._index_of = {path: i for i, path in enumerate(self.tracks.path)}
+            changed = 0
+            for path in updates:
+                i = self._index_of.get(path)
+                if i is None or i >= len(self._sampler): continue
+                self._sampler.set_weight(i, self._weight(i))
+                changed += 1
+            return changed
\ No newline at end of file
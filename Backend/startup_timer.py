@@ -0,0 +1,43 @@
+import os
+import json
+import time
+
+# Куди записати JSON-звіт старту (інакше - лише рядок у консоль)
+STARTUP_ENV = "MUSIC_STARTUP_REPORT"
+
+
+class StartupTimer:
+    """
+    Етапи холодного старту. mark(name) закриває етап: скільки він тривав і скільки минуло від старту.
+    started - perf_counter() якомога раніше в main.py, до важких імпортів.
+    """
+
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started
+        self._last = self.started
+        self.stages = []  # [(назва, мс етапу, мс від старту)]
+        self.finished = False
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.stages.append((name, (now - self._last) * 1000, (now - self.started) * 1000))
+        self._last = now
+
+    def as_dict(self):
+        return {"stages": [{"name": n, "ms": round(ms, 1), "at_ms": round(at, 1)} for n, ms, at in self.stages],
+                "total_ms": round(self.stages[-1][2], 1) if self.stages else 0.0}
+
+    def summary(self):
+        parts = [f"{name} {ms:.0f} ms" for name, ms, _ in self.stages]
+        return f"Startup: {', '.join(parts)} | total {self.as_dict()['total_ms']:.0f} ms"
+
+    def finish(self, path=None):
+        """Один раз: рядок у консоль і, якщо задано шлях (або MUSIC_STARTUP_REPORT), JSON-звіт."""
+        if self.finished: return
+        self.finished = True
+        print(self.summary())
+        path = path or os.environ.get(STARTUP_ENV)
+        if not path: return
+        try:
+            with open(path, "w", encoding="utf-8") as f: json.dump(self.as_dict(), f, indent=2)
+        except OSError as e: print(f"Startup report not written: {e}")
\ No newline at end of file
@@ -0,0 +1,34 @@
+from Backend.track_table import TrackTable
+
+PAGE_SIZE = 200
+
+
+class TrackPager:
+    """
+    Список треків, що підвантажується сторінками (keyset по (колонка сортування, id)).
+    tracks - одна TrackTable, яка росте на місці, тож плеєр і список бачать нові сторінки одразу.
+    """
+
+    def __init__(self, fetch_page, sort, order, f_col=None, f_val=None, page_size=PAGE_SIZE):
+        self.fetch_page = fetch_page  # (sort, order, f_col, f_val, after, limit) -> TrackTable
+        self.sort, self.order = sort, order
+        self.f_col, self.f_val = f_col, f_val
+        self.page_size = page_size
+        self.tracks = TrackTable()
+        self.cursor = None  # (значення колонки сортування, id) останнього рядка
+        self.exhausted = False
+
+    def next_page(self):
+        """Дописує наступну сторінку в tracks. Повертає кількість нових рядків (0 - кінець)."""
+        if self.exhausted: return 0
+        page = self.fetch_page(self.sort, self.order, self.f_col, self.f_val, self.cursor, self.page_size)
+        if len(page) < self.page_size: self.exhausted = True
+        if not page: return 0
+        last = page[len(page) - 1]
+        self.cursor = (getattr(last, self.sort), last.id)
+        self.tracks.extend(page)
+        return len(page)
+
+    def load_all(self):
+        while self.next_page(): pass
+        return self.tracks
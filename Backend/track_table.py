@@ -0,0 +1,155 @@
+import sys
+from array import array
+
+# Порядок колонок як у schema.TRACK_SELECT / TRACK_COLUMNS у logic.cpp
+FIELDS = ("id", "path", "title", "artist", "album", "genre", "duration", "rating",
+          "rate_melody", "rate_rhythm", "rate_vocals", "rate_lyrics", "rate_arrange", "has_vocals", "has_lyrics", "cover")
+NUMERIC = {"id": "q", "duration": "d", "rating": "d",
+           "rate_melody": "b", "rate_rhythm": "b", "rate_vocals": "b", "rate_lyrics": "b", "rate_arrange": "b",
+           "has_vocals": "b", "has_lyrics": "b"}
+STRINGS = ("path", "title", "artist", "album", "genre", "cover")
+# Артисти, альбоми, жанри і id обкладинок (одна на альбом) повторюються тисячі разів - в пам'яті лишається одна копія рядка.
+# path і title майже завжди унікальні, інтернування їм нічого не дає.
+INTERNED = ("artist", "album", "genre", "cover")
+RATING_KEYS = {"melody": "rate_melody", "rhythm": "rate_rhythm", "vocals": "rate_vocals", "lyrics": "rate_lyrics",
+               "arrange": "rate_arrange", "has_vocals": "has_vocals", "has_lyrics": "has_lyrics"}
+
+
+class TrackRow:
+    """Легкий погляд на один рядок TrackTable. Нічого не копіює - читає з колонок таблиці."""
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def rating_details(self):
+        """Словник у форматі RatingWindow / calculate_save_rating."""
+        return {key: getattr(self, col) for key, col in RATING_KEYS.items()}
+
+    def as_tuple(self):
+        return tuple(getattr(self, f) for f in FIELDS)
+
+    def __eq__(self, other):
+        return isinstance(other, TrackRow) and self.as_tuple() == other.as_tuple()
+
+    def __repr__(self):
+        return f"TrackRow({self.id}, {self.artist!r}, {self.title!r})"
+
+
+def _column_property(name):
+    return property(lambda row: getattr(row.table, name)[row.index])
+
+for _name in FIELDS: setattr(TrackRow, _name, _column_property(_name))
+
+
+class TrackTable:
+    """
+    Колонкове сховище треків: числа в array, рядки в списках (повторювані - інтерновані).
+    Індексація повертає TrackRow, зріз - нову TrackTable.
+    """
+
+    def __init__(self):
+        for name in FIELDS:
+            setattr(self, name, array(NUMERIC[name]) if name in NUMERIC else [])
+        self._by_path = {}  # path -> індекс рядка; будується при першому оновленні рейтингу
+        self._indexed = 0
+
+    @classmethod
+    def from_rows(cls, rows):
+        """rows - послідовності у порядку FIELDS (кортежі з C++ або sqlite3)."""
+        table = cls()
+        table.extend_rows(rows)
+        return table
+
+    def extend_rows(self, rows):
+        rows = list(rows)
+        if not rows: return
+        columns = list(zip(*rows))
+        for i, name in enumerate(FIELDS):
+            # Коротші рядки (ctypes-структура старого DLL, топ-чарт) без cover - колонка добивається порожніми
+            self._extend_column(name, columns[i] if i < len(columns) else (0 if name in NUMERIC else "",) * len(rows))
+
+    def _extend_column(self, name, values):
+        if name in NUMERIC:
+            conv = float if NUMERIC[name] == "d" else int
+            getattr(self, name).extend(map(conv, values))
+        elif name in INTERNED:
+            getattr(self, name).extend(sys.intern(v) if v else "" for v in values)
+        else:
+            getattr(self, name).extend(values)
+
+    def append(self, row): self.extend_rows([row])
+
+    def extend(self, other):
+        """Дописує рядки іншої таблиці на місці: хто тримає цю таблицю, одразу бачить нові рядки."""
+        for name in FIELDS: getattr(self, name).extend(getattr(other, name))
+
+    # === ДОСТУП ===
+    def __len__(self): return len(self.id)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice): return self.take(range(*key.indices(len(self))))
+        if key < 0: key += len(self)
+        if not 0 <= key < len(self): raise IndexError("track index out of range")
+        return TrackRow(self, key)
+
+    def __iter__(self):
+        for i in range(len(self)): yield TrackRow(self, i)
+
+    def __bool__(self): return len(self) > 0
+
+    def __eq__(self, other):
+        return isinstance(other, TrackTable) and all(getattr(self, f) == getattr(other, f) for f in FIELDS)
+
+    def take(self, indices):
+        """Нова таблиця з рядків за індексами (у заданому порядку)."""
+        indices = list(indices)
+        table = TrackTable()
+        for name in FIELDS:
+            src = getattr(self, name)
+            values = [src[i] for i in indices]
+            setattr(table, name, array(NUMERIC[name], values) if name in NUMERIC else values)
+        return table
+
+    def _row_index(self):
+        """path -> індекс. Таблиця лише дописується в кінець, тож індекс добудовується з місця, де зупинився."""
+        index, path = self._by_path, self.path
+        for i in range(self._indexed, len(path)): index.setdefault(path[i], i)
+        self._indexed = len(path)
+        return index
+
+    def update_rating(self, path, rating, details): return self.apply_ratings({path: (rating, details)}) > 0
+
+    def apply_ratings(self, updates):
+        """
+        Оновлює рейтинги на місці: updates = {path: (rating, details)}. TrackRow, що дивляться на ці рядки, одразу бачать нові значення.
+        Рядки шукаються за індексом шляхів, тож ціна - від кількості оновлень, а не від розміру таблиці.
+        """
+        if not updates: return 0
+        index = self._row_index()
+        patched = 0
+        for path, (rating, details) in updates.items():
+            i = index.get(path)
+            if i is None: continue
+            self.rating[i] = rating
+            for key, col in RATING_KEYS.items():
+                if key in details: getattr(self, col)[i] = int(details[key])
+            patched += 1
+        return patched
+
+    def reversed(self): return self.take(range(len(self) - 1, -1, -1))
+
+    def nbytes(self):
+        """Приблизний розмір у пам'яті (інтерновані рядки рахуються один раз)."""
+        total = sys.getsizeof(self)
+        seen = set()
+        for name in FIELDS:
+            column = getattr(self, name)
+            total += sys.getsizeof(column)
+            if name in NUMERIC: continue
+            for s in column:
+                if id(s) not in seen:
+                    seen.add(id(s))
+                    total += sys.getsizeof(s)
+        return total
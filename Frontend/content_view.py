@@ -1,16 +1,30 @@
 import customtkinter as ctk
-from PIL import Image
-import io
-from mutagen.mp3 import MP3
+from tkinter import filedialog
+from Backend.charts import CHART_SIZE
+from Backend.profiler import PROFILER
+from Frontend.cover_cache import CoverCache
+from Frontend.track_list import VirtualTrackList
+from Frontend.tile_grid import VirtualTileGrid
+
+# Шляхи відмальовки, що потрапляють у профіль (MUSIC_PROFILE)
+DRAW_PATHS = ("refresh", "clear_content", "redraw_rows", "_draw_list_mode", "_draw_grid_mode", "draw_top_chart",
+              "_handle_group_click", "draw_stats")
 
 class ContentFrame(ctk.CTkScrollableFrame):
     def __init__(self, master, logic_controller, on_play_callback):
         super().__init__(master)
+        PROFILER.instrument(self, DRAW_PATHS, "ContentFrame", cat="ui")
         self.logic = logic_controller
         self.on_play_callback = on_play_callback
         
         self.current_data_type = "tracks"
         self.columns_in_grid = 3 
+        self.covers = CoverCache(self.logic, master=self)
+        self._tile_placeholder = None  # створюється при першій плитці: вкладка треків без неї обходиться
+        self.track_list = None
+        self.tile_grid = None
+        self.depends_on_rating = False  # порядок або склад поточного вигляду залежить від оцінок
+        self._parent_canvas.bind("<Configure>", self._fit_track_list, add=True)
         
         # Список створених віджетів для очищення пам'яті
         self.generated_widgets = [] 
@@ -21,25 +35,32 @@ class ContentFrame(ctk.CTkScrollableFrame):
 
     def clear_content(self):
         """Повне очищення перед зміною вигляду"""
+        # Обкладинки для старого вигляду вже нікому не потрібні
+        self.covers.cancel_all()
         for widget in self.generated_widgets:
             try:
                 widget.destroy()
             except: pass
         self.generated_widgets.clear()
+        self.track_list = None
+        self.tile_grid = None
         
         self.update_idletasks()
         self._parent_canvas.yview_moveto(0)
 
-    def refresh(self, sort_by="artist"):
+    def refresh(self, sort_by=None, pager=None):
         self.clear_content()
+        self.depends_on_rating = False
 
         # === ЛОГІКА ВИБОРУ РЕЖИМУ (LIST vs GRID) ===
         
         # 1. ТРЕКИ -> СПИСОК
         if self.current_data_type == "tracks":
             # Тут можна додати заголовок для треків, якщо треба
-            items = self.logic.get_playlist(sort_by)
-            self._draw_list_mode(items)
+            # Перша сторінка малюється одразу, решта догружається під час прокрутки
+            pager = pager or self.logic.get_playlist_pager(sort_by)
+            self.depends_on_rating = pager.sort == "rating"
+            self._draw_list_mode(pager.tracks, pager.next_page)
 
         # 2. АРТИСТИ -> ПЛИТКА (ЗМІНЕНО ТУТ)
         elif self.current_data_type == "artists":
@@ -64,6 +85,25 @@ class ContentFrame(ctk.CTkScrollableFrame):
             self._draw_grid_mode(items, "album", context_artist=artist_name, 
                                  header_text=header_text, back_cmd=back_cmd, back_btn_text="⬅ BACK TO ARTISTS")
 
+        # 5. ПОШУК -> СПИСОК (найрелевантніші зверху)
+        elif self.current_data_type.startswith("search:"):
+            query = self.current_data_type.replace("search:", "", 1)
+            items = self.logic.search_tracks(query)
+            lbl = ctk.CTkLabel(self, text=f"🔍 \"{query}\" - {len(items)} tracks", font=("Arial", 16, "bold"), text_color="#daa520")
+            lbl.pack(pady=(5, 10))
+            self.generated_widgets.append(lbl)
+            self._draw_list_mode(items)
+
+        # 6. ЧАРТ -> СПИСОК КНОПОК (chart:best / chart:worst)
+        elif self.current_data_type.startswith("chart:"):
+            mode = self.current_data_type.split(":", 1)[1]
+            header = f"🔥 TOP {CHART_SIZE} BEST TRACKS" if mode == "best" else f"TOP {CHART_SIZE} WORST TRACKS"
+            self.draw_top_chart(self.logic.get_chart("track", mode), header)
+
+        # 7. ПРОФІЛЬ -> ТАБЛИЦЯ ЗАМІРІВ
+        elif self.current_data_type == "stats":
+            self.draw_stats()
+
     # === ОБРОБКА КЛІКІВ (НАВІГАЦІЯ) ===
     def _handle_group_click(self, g_type, name, context_artist=None):
         if g_type == "artist":
@@ -89,8 +129,8 @@ class ContentFrame(ctk.CTkScrollableFrame):
             self.generated_widgets.append(lbl)
             
             # Отримуємо і малюємо треки
-            tracks = self.logic.get_tracks_filtered("album", name)
-            self._draw_list_mode(tracks)
+            pager = self.logic.get_filtered_pager("album", name)
+            self._draw_list_mode(pager.tracks, pager.next_page)
 
     def _handle_back_to_artist_albums(self, artist_name):
         self.current_data_type = f"albums_by_{artist_name}"
@@ -100,141 +140,121 @@ class ContentFrame(ctk.CTkScrollableFrame):
     # РЕЖИМ ПЛИТКИ (GRID) - Для Альбомів/Артистів
     # ==========================================
     def _draw_grid_mode(self, items, type_g, context_artist=None, header_text=None, back_cmd=None, back_btn_text="BACK"):
-        row_offset = 0
-
         # Кнопка "Назад"
         if back_cmd:
             btn = ctk.CTkButton(self, text=back_btn_text, fg_color="darkred", hover_color="#800000", command=back_cmd)
-            btn.grid(row=row_offset, column=0, columnspan=self.columns_in_grid, sticky="ew", pady=5, padx=5)
+            btn.pack(fill="x", pady=5, padx=5)
             self.generated_widgets.append(btn)
-            row_offset += 1
 
         # ЗАГОЛОВОК (Artist / Album / Etc)
         if header_text:
             lbl = ctk.CTkLabel(self, text=header_text, font=("Arial", 20, "bold"), text_color="#daa520")
-            lbl.grid(row=row_offset, column=0, columnspan=self.columns_in_grid, pady=(10, 20))
+            lbl.pack(pady=(10, 20))
             self.generated_widgets.append(lbl)
-            row_offset += 1
 
         if not items:
             l = ctk.CTkLabel(self, text="No items found.", text_color="gray")
-            l.grid(row=row_offset, column=0, columnspan=self.columns_in_grid, pady=20)
+            l.pack(pady=20)
             self.generated_widgets.append(l)
             return
 
-        row, col = 0, 0
-        for item in items:
-            name, sec, count, path = item
-            icon = None
-            try:
-                d = self.logic.get_cover_data(path)
-                if d: icon = ctk.CTkImage(Image.open(io.BytesIO(d)), size=(120, 120))
-            except: pass
-            
-            label = f"{name}\n{count} tracks"
-            if type_g == "album": label = f"{name}\n{sec}"
-            
-            cmd = lambda n=name, t=type_g: self._handle_group_click(t, n, context_artist)
-            
-            btn = ctk.CTkButton(self, text=label, image=icon, compound="top", width=150, height=160, 
-                                fg_color="#2b2b40", hover_color="#3b3b55", command=cmd)
-            
-            btn.grid(row=row + row_offset, column=col, padx=10, pady=10)
-            self.generated_widgets.append(btn)
-            
-            col += 1
-            if col >= self.columns_in_grid: 
-                col = 0; row += 1
+        if type_g == "album": label = lambda item: f"{item[0]}\n{item[1]}"
+        else: label = lambda item: f"{item[0]}\n{item[2]} tracks"
+        click = lambda item: self._handle_group_click(type_g, item[0], context_artist)
+
+        # Віртуалізована плитка: віджети і запити обкладинок лише для видимих рядків
+        self.tile_grid = VirtualTileGrid(self, self.covers, self.tile_placeholder(), label, click, columns=self.columns_in_grid)
+        self.tile_grid.pack(fill="x")
+        self.generated_widgets.append(self.tile_grid)
+        self.tile_grid.set_items(items)
+        self.after_idle(self._fit_track_list)
+
+    def tile_placeholder(self):
+        if self._tile_placeholder is None:
+            from PIL import Image
+            self._tile_placeholder = ctk.CTkImage(Image.new("RGB", (120, 120), (43, 43, 64)), size=(120, 120))
+        return self._tile_placeholder
 
     # ==========================================
     # РЕЖИМ СПИСКУ (LIST) - Для Треків
     # ==========================================
-    def _draw_list_mode(self, tracks):
+    def _draw_list_mode(self, tracks, load_more=None):
         if not tracks:
             l = ctk.CTkLabel(self, text="No tracks found.", text_color="gray")
             l.pack(pady=20)
             self.generated_widgets.append(l)
             return
 
-        default_icon = ctk.CTkImage(Image.new("RGBA", (30, 30), (50, 50, 50, 0)), size=(30, 30))
-        
-        for i, t in enumerate(tracks):
-            # t[1]=path, t[2]=title, t[3]=artist, t[4]=album, t[6]=duration, t[7]=rating
-            path, title, artist = t[1], t[2], t[3]; album, rating = t[4], t[7]
-            m, s = divmod(int(t[6]), 60)
-            
-            title_s = (title[:25] + '..') if len(title) > 25 else title
-            artist_s = (artist[:18] + '..') if len(artist) > 18 else artist
-            album_s = (album[:18] + '..') if len(album) > 18 else album 
-
-            display_text = f"{artist_s:<20} | {title_s:<25} | {m:02}:{s:02} | {album_s:<20} | ⭐ {rating:.1f}"
-            
-            cmd = lambda playlist=tracks, idx=i: self.on_play_callback(playlist, idx)
+        # Віртуалізований список: віджети лише для видимих рядків
+        self.track_list = VirtualTrackList(self, self.covers, self.on_play_callback)
+        self.track_list.pack(fill="x")
+        self.generated_widgets.append(self.track_list)
+        self.track_list.set_tracks(tracks, load_more)
+        self.after_idle(self._fit_track_list)
 
-            icon = default_icon
-            try:
-                d = self.logic.get_cover_data(path)
-                if d: icon = ctk.CTkImage(Image.open(io.BytesIO(d)), size=(30, 30))
-            except: pass
+    def redraw_rows(self):
+        if self.track_list and self.track_list.winfo_exists(): self.track_list.redraw()
 
-            btn = ctk.CTkButton(self, text=display_text, image=icon, compound="left", anchor="w", 
-                                height=40, fg_color="transparent", hover_color="#3b3b55", 
-                                font=("Consolas", 13), command=cmd)
-            btn.pack(fill="x", padx=5)
-            self.generated_widgets.append(btn)
-            
-            div = ctk.CTkFrame(self, height=1, fg_color="#333")
-            div.pack(fill="x", padx=10)
-            self.generated_widgets.append(div)
+    def _fit_track_list(self, event=None):
+        """Список (або плитка) займає рівно видиму частину, щоб зовнішній скрол не конкурував з власним скролом."""
+        tl = self.track_list or self.tile_grid
+        if not tl or not tl.winfo_exists(): return
+        free = self._parent_canvas.winfo_height() - tl.winfo_y()
+        tl.configure(height=max(tl.ROW_HEIGHT, self._reverse_widget_scaling(free)))
 
     # ==========================================
     # ТОП ЧАРТ (Завжди Список + Виправлення Таймера)
     # ==========================================
-    def draw_top_chart(self, data, header):
-        self.clear_content()
+    def draw_top_chart(self, tracks, header):
+        """tracks - TrackTable з get_chart: повні рядки, тож плеєр і вікно оцінки бачать справжні дані."""
+        self.depends_on_rating = True
         
         l = ctk.CTkLabel(self, text=header, font=("Arial", 20, "bold"), text_color="#daa520")
         l.pack(pady=15)
         self.generated_widgets.append(l)
         
-        if not data:
+        if not tracks:
             l2 = ctk.CTkLabel(self, text="Not enough data yet.", font=("Arial", 14))
             l2.pack(pady=20)
             self.generated_widgets.append(l2)
             return
 
-        converted_playlist = []
-        for item in data:
-            duration = 0
-            try:
-                audio = MP3(item['cover_path'])
-                duration = audio.info.length
-            except: pass
-
-            track_tup = (
-                0,                  # id
-                item['cover_path'], # path
-                item['name'],       # title
-                item['secondary'],  # artist
-                "-",                # album
-                "Top Chart",        # genre
-                duration,           # duration
-                item['rating'],     # rating
-                0,0,0,0,0,0,0       # details
-            )
-            converted_playlist.append(track_tup)
-
-        for i, item in enumerate(data):
-            title = item['name']
-            artist = item['secondary']
-            rating = item['rating']
-            
-            text = f"{i+1}. {artist} - {title} | ⭐ {rating:.1f}"
+        for i, t in enumerate(tracks):
+            text = f"{i+1}. {t.artist} - {t.title} | ⭐ {t.rating:.1f}"
             
-            cmd = lambda playlist=converted_playlist, idx=i: self.on_play_callback(playlist, idx)
+            cmd = lambda playlist=tracks, idx=i: self.on_play_callback(playlist, idx)
             
             btn = ctk.CTkButton(self, text=text, anchor="w", height=45, fg_color="transparent", 
                                 border_width=1, border_color="#444", font=("Arial", 13, "bold"), 
                                 hover_color="#333", command=cmd)
             btn.pack(fill="x", padx=15, pady=2)
-            self.generated_widgets.append(btn)
\ No newline at end of file
+            self.generated_widgets.append(btn)
+
+    # ==========================================
+    # СТАТИСТИКА ПРОФАЙЛЕРА (MUSIC_PROFILE=1)
+    # ==========================================
+    def draw_stats(self):
+        stats = PROFILER.stats()
+        l = ctk.CTkLabel(self, text=f"📊 PROFILE - {len(stats)} hot paths, {sum(s['count'] for s in stats)} calls",
+                         font=("Arial", 20, "bold"), text_color="#daa520")
+        l.pack(pady=15)
+        self.generated_widgets.append(l)
+
+        bar = ctk.CTkFrame(self, fg_color="transparent")
+        bar.pack(fill="x", padx=15)
+        self.generated_widgets.append(bar)
+        ctk.CTkButton(bar, text="🔄 Refresh", command=self.refresh).pack(side="left", padx=5)
+        ctk.CTkButton(bar, text="🧹 Reset", fg_color="#444", command=lambda: (PROFILER.reset(), self.refresh())).pack(side="left", padx=5)
+        ctk.CTkButton(bar, text="💾 Save Trace", fg_color="#444", command=self._save_trace).pack(side="left", padx=5)
+
+        # Один текстовий віджет на всю таблицю, а не мітка на клітинку: сотні рядків не гальмують сам профіль
+        box = ctk.CTkTextbox(self, height=520, font=("Consolas", 12), wrap="none")
+        box.insert("1.0", PROFILER.summary(limit=None) if stats else "No samples yet.")
+        box.configure(state="disabled")
+        box.pack(fill="both", expand=True, padx=15, pady=10)
+        self.generated_widgets.append(box)
+
+    def _save_trace(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json", initialfile="music_trace.json",
+                                            filetypes=[("Chrome trace", "*.json")])
+        if path: PROFILER.write_trace(path)
\ No newline at end of file
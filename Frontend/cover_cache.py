@@ -0,0 +1,172 @@
+import os
+import io
+import queue
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import customtkinter as ctk
+from Backend.cover_store import is_cover_id
+from Backend.profiler import PROFILER
+
+
+class CoverTicket:
+    """Запит на обкладинку. Скасований квиток ніколи не викличе callback."""
+    __slots__ = ("key", "callback", "cancelled")
+
+    def __init__(self, key, callback):
+        self.key = key
+        self.callback = callback
+        self.cancelled = False
+
+
+class CoverCache:
+    """
+    Двохрівневий кеш обкладинок. Ключ - id обкладинки зі сховища (cover_store) або шлях треку без id.
+    1) пам'ять - LRU готових CTkImage з бюджетом у байтах;
+    2) диск - вже зменшені мініатюри, ключ = id + розмір (або шлях + mtime + розмір).
+    JPEG декодується лише тоді, коли мініатюри ще немає на диску, і один раз на зображення, а не на трек.
+    request() робить це у фонових потоках; CTkImage створюється вже в mainloop через after().
+    """
+
+    def __init__(self, logic_controller, master=None, cache_dir=None, memory_budget=64 * 1024 * 1024, workers=4):
+        PROFILER.instrument(self, ("get", "load_thumbnail", "_pump"), "CoverCache", cat="covers")
+        self.logic = logic_controller
+        self.master = master
+        self.cache_dir = cache_dir or os.path.join(logic_controller.base_path, ".cover_cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.memory_budget = memory_budget
+        self.memory = OrderedDict()  # (path, size) -> (CTkImage | None, cost)
+        self.memory_used = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "decoded": 0}
+
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cover")
+        self.pending = {}  # key -> (future, [CoverTicket]); чіпається лише з mainloop
+        self.done = queue.Queue()
+        self._pump_scheduled = False
+
+    def get(self, path, size):
+        """CTkImage потрібного розміру або None, якщо в треку немає обкладинки."""
+        key = (path, size)
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return entry[0]
+
+        thumb = self.load_thumbnail(path, size)
+        icon = ctk.CTkImage(thumb, size=size) if thumb else None
+        self._remember(key, icon, size[0] * size[1] * 4 if thumb else 64)
+        return icon
+
+    # === ASYNC ===
+    def request(self, path, size, callback):
+        """
+        Викликає callback(CTkImage | None) одразу при влучанні в пам'ять,
+        інакше пізніше з mainloop. Повертає квиток для cancel() або None.
+        """
+        key = (path, size)
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            callback(entry[0])
+            return None
+
+        ticket = CoverTicket(key, callback)
+        pending = self.pending.get(key)
+        if pending:
+            pending[1].append(ticket)
+        else:
+            future = self.pool.submit(self.load_thumbnail, path, size)
+            self.pending[key] = (future, [ticket])
+            future.add_done_callback(lambda f, key=key: self.done.put((key, f)))
+        self._schedule_pump()
+        return ticket
+
+    def cancel(self, ticket):
+        if ticket is None or ticket.cancelled: return
+        ticket.cancelled = True
+        pending = self.pending.get(ticket.key)
+        # Якщо ніхто більше не чекає і декодування ще не почалось - знімаємо задачу з пулу
+        if pending and all(t.cancelled for t in pending[1]) and pending[0].cancel():
+            del self.pending[ticket.key]
+
+    def cancel_all(self):
+        for future, tickets in list(self.pending.values()):
+            for t in tickets: t.cancelled = True
+            future.cancel()
+        self.pending.clear()
+
+    def _schedule_pump(self):
+        if self._pump_scheduled or self.master is None: return
+        self._pump_scheduled = True
+        self.master.after(15, self._pump)
+
+    def _pump(self):
+        self._pump_scheduled = False
+        while True:
+            try: key, future = self.done.get_nowait()
+            except queue.Empty: break
+            pending = self.pending.get(key)
+            # Задача могла бути скасована, а той самий ключ запитаний знову новою задачею
+            if not pending or pending[0] is not future: continue
+            del self.pending[key]
+            if future.cancelled(): continue
+            tickets = pending[1]
+            try: thumb = future.result()
+            except Exception: thumb = None
+            icon = ctk.CTkImage(thumb, size=key[1]) if thumb else None
+            self._remember(key, icon, key[1][0] * key[1][1] * 4 if thumb else 64)
+            for t in tickets:
+                if not t.cancelled: t.callback(icon)
+        if self.pending: self._schedule_pump()
+
+    def _remember(self, key, icon, cost):
+        self.memory[key] = (icon, cost)
+        self.memory_used += cost
+        while self.memory_used > self.memory_budget and len(self.memory) > 1:
+            _, (_, old_cost) = self.memory.popitem(last=False)
+            self.memory_used -= old_cost
+
+    def _disk_path(self, path, size):
+        if is_cover_id(path): key = f"{path}|{size[0]}x{size[1]}"  # вміст за id не змінюється - stat не потрібен
+        else:
+            try: mtime = os.stat(path).st_mtime
+            except OSError: mtime = 0
+            key = f"{path}|{mtime}|{size[0]}x{size[1]}"
+        digest = hashlib.sha1(key.encode('utf-8', 'surrogatepass')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + ".png")
+
+    def load_thumbnail(self, path, size):
+        """PIL-мініатюра з диску, або зменшена з APIC-кадру (і збережена на диск)."""
+        from PIL import Image  # вперше - у фоновому потоці обкладинок, а не на старті
+        disk_path = self._disk_path(path, size)
+        if os.path.exists(disk_path):
+            self.stats["disk_hits"] += 1
+            if os.path.getsize(disk_path) == 0: return None  # трек без обкладинки
+            try:
+                with Image.open(disk_path) as im: return im.copy()
+            except Exception: pass
+
+        self.stats["decoded"] += 1
+        thumb = None
+        data = self.logic.get_cover_data(path)
+        if data:
+            try:
+                im = Image.open(io.BytesIO(data))
+                im.draft("RGB", size)  # JPEG декодується одразу зі зменшенням
+                im = im.convert("RGB")
+                im.thumbnail(size)
+                thumb = im
+            except Exception: thumb = None
+
+        try:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            if thumb: thumb.save(disk_path, "PNG")
+            else: open(disk_path, "wb").close()
+        except OSError: pass
+        return thumb
+
+    def clear_memory(self):
+        self.memory.clear()
+        self.memory_used = 0
@@ -1,19 +1,48 @@
 import customtkinter as ctk
+import queue
 from tkinter import filedialog, messagebox
 from Frontend.player import PlayerFrame
 from Frontend.content_view import ContentFrame
+from Backend.startup_timer import StartupTimer
+from Backend.profiler import PROFILER
 
 class MusicAppUI(ctk.CTk):
-    def __init__(self, logic_controller):
+    SEARCH_DELAY_MS = 250  # пошук запускається, коли користувач перестав друкувати
+    FIRST_RENDER_DELAY_MS = 20  # вікно встигає намалюватись до першого запиту
+
+    def __init__(self, logic_controller, startup=None):
         super().__init__()
         self.logic = logic_controller
+        self.startup = startup or StartupTimer()
         self.title("Music System Ultimate")
         self.geometry("1100x750")
         
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
 
+        # Вотчер працює у своєму потоці, тому повідомлення йдуть через чергу в mainloop
+        self.library_events = queue.Queue()
+        self._search_job = None
+        self.logic.on_library_changed = self.library_events.put
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
         self._setup_layout()
+        self.startup.mark("window")
+        # Спершу порожня оболонка на екрані, дані - вже після неї
+        self.after_idle(self._on_shell_shown)
+        self.after(500, self._poll_library_events)
+
+    def _on_shell_shown(self):
+        self.startup.mark("shown")
+        self.after(self.FIRST_RENDER_DELAY_MS, self._first_render)
+
+    def _first_render(self):
+        pager = self.logic.get_playlist_pager()
+        self.startup.mark("first_query")
+        self.refresh_all(pager)
+        self.update_idletasks()
+        self.startup.mark("first_paint")
+        self.startup.finish()
 
     def _setup_layout(self):
         # 1. ЛІВА ПАНЕЛЬ (Sidebar)
@@ -22,8 +51,14 @@ class MusicAppUI(ctk.CTk):
         self.sidebar.grid_propagate(False)
 
         ctk.CTkLabel(self.sidebar, text="MEDIA LIBRARY", font=("Arial", 20, "bold")).pack(pady=20)
+        self.search_entry = ctk.CTkEntry(self.sidebar, placeholder_text="🔍 Search...")
+        self.search_entry.pack(pady=(0, 10), padx=20, fill="x")
+        self.search_entry.bind("<KeyRelease>", self._on_search_key)
+        self.search_entry.bind("<Escape>", lambda e: self.clear_search())
         ctk.CTkButton(self.sidebar, text="📂 Add Folder", command=self.add_folder).pack(pady=10, padx=20)
         ctk.CTkButton(self.sidebar, text="🔄 Show All Tracks", command=self.refresh_all).pack(pady=5, padx=20)
+        ctk.CTkButton(self.sidebar, text="📥 Import Ratings", fg_color="#444", command=self.import_ratings).pack(pady=5, padx=20)
+        ctk.CTkButton(self.sidebar, text="📤 Export Ratings", fg_color="#444", command=self.export_ratings).pack(pady=5, padx=20)
         ctk.CTkButton(self.sidebar, text="🗑️ Clear Library", fg_color="darkred", hover_color="#800000",
                       command=self.clear_all_data).pack(pady=20, padx=20, side="bottom")
 
@@ -38,6 +73,9 @@ class MusicAppUI(ctk.CTk):
                       command=lambda: self.show_playlist("best")).pack(pady=5, padx=20, fill="x")
         ctk.CTkButton(self.sidebar, text="TOP 10 Worst", fg_color="#555",
                       command=lambda: self.show_playlist("worst")).pack(pady=5, padx=20, fill="x")
+        if PROFILER.enabled:
+            ctk.CTkButton(self.sidebar, text="📊 Profile Stats", fg_color="#444",
+                          command=self.show_stats).pack(pady=(20, 5), padx=20, fill="x")
 
         # [FIX] Видалено перемикач View Mode
 
@@ -58,11 +96,9 @@ class MusicAppUI(ctk.CTk):
         self.content.grid(row=1, column=0, sticky="nsew", pady=(0, 10))
 
         # 2.3 Player
-        self.player = PlayerFrame(self.right, self.logic, on_rate_callback=self.refresh_current, on_delete_callback=None)
+        self.player = PlayerFrame(self.right, self.logic, on_rate_callback=self.on_track_rated, on_delete_callback=None)
         self.player.grid(row=2, column=0, sticky="ew")
 
-        self.refresh_all()
-
     def setup_sort_buttons(self):
         for w in self.sort_frame.winfo_children(): w.destroy()
         cols = [("Artist", "artist"), ("Title", "title"), ("Time", "duration"), ("Album", "album"), ("Rating", "rating")]
@@ -86,17 +122,83 @@ class MusicAppUI(ctk.CTk):
         d = filedialog.askdirectory()
         if d:
             self.logic.scan_directory(d)
+            self.logic.watch_folder(d)
+            self.refresh_all()
+
+    # === RATINGS ===
+    def on_track_rated(self):
+        # Оцінка вже в показаних рядках; перебудова потрібна лише там, де від неї залежить порядок
+        if self.content.depends_on_rating: self.refresh_current()
+        else: self.content.redraw_rows()
+
+    def import_ratings(self):
+        path = filedialog.askopenfilename(filetypes=[("Ratings", "*.csv *.json"), ("All files", "*.*")])
+        if not path: return
+        try: stats = self.logic.import_ratings(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Import Ratings", str(e))
+            return
+        messagebox.showinfo("Import Ratings", f"Imported {stats['written']} of {stats['records']} ratings "
+                                              f"({stats['skipped']} not found in library).")
+        self.refresh_current()
+
+    def export_ratings(self):
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv"), ("JSON", "*.json")])
+        if not path: return
+        try: count = self.logic.export_ratings(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Export Ratings", str(e))
+            return
+        messagebox.showinfo("Export Ratings", f"Exported {count} rated tracks.")
+
+    def _poll_library_events(self):
+        # Одна перемальовка на пачку змін, скільки б файлів у ній не було
+        changed = False
+        while not self.library_events.empty():
+            self.library_events.get_nowait()
+            changed = True
+        if changed: self.refresh_current()
+        self.after(500, self._poll_library_events)
+
+    # === SEARCH ===
+    def _on_search_key(self, event):
+        if event.keysym == "Escape": return
+        if self._search_job: self.after_cancel(self._search_job)
+        self._search_job = self.after(self.SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        self._search_job = None
+        query = self.search_entry.get().strip()
+        if not query:
             self.refresh_all()
+            return
+        self.sort_frame.grid_remove()
+        self.content.set_data_type(f"search:{query}")
+
+    def clear_search(self):
+        if self._search_job: self.after_cancel(self._search_job)
+        self._search_job = None
+        self.search_entry.delete(0, "end")
+        self.refresh_all()
 
-    def refresh_all(self):
-        self.content.set_data_type("tracks")
-        self.content.refresh()
+    def on_close(self):
+        self.logic.shutdown()
+        self.destroy()
+
+    def refresh_all(self, pager=None):
+        # Один запит і одна відмальовка: current_data_type ставиться напряму, без refresh у set_data_type
+        self.sort_frame.grid()
+        self.content.current_data_type = "tracks"
+        self.content.refresh(pager=pager)
 
     def show_playlist(self, mode):
+        # Чарт - звичайний вигляд: після оцінки refresh_current перебудує саме його
+        self.sort_frame.grid_remove()
+        self.content.set_data_type(f"chart:{mode}")
+
+    def show_stats(self):
         self.sort_frame.grid_remove()
-        tracks = self.logic.get_advanced_top("tracks", mode)
-        header = "🔥 TOP 10 BEST TRACKS" if mode == "best" else "TOP 10 WORST TRACKS"
-        self.content.draw_top_chart(tracks, header)
+        self.content.set_data_type("stats")
 
     def refresh_current(self): self.content.refresh()
     def play_track(self, playlist, index): self.player.load_playlist(playlist, index)
\ No newline at end of file
@@ -1,7 +1,11 @@
 import customtkinter as ctk
-import time
+from Backend.track_table import TrackTable
 from Frontend.rating_window import RatingWindow
 
+TICK_MS = 250  # перемальовка прогресу з локального годинника, без викликів у DLL
+END_SLACK_MS = 50
+PRELOAD_DELAY_MS = 2000  # наступний трек відкривається, коли поточний уже стартував
+
 class PlayerFrame(ctk.CTkFrame):
     def __init__(self, master, logic_controller, on_rate_callback, on_delete_callback):
         super().__init__(master)
@@ -9,16 +13,18 @@ class PlayerFrame(ctk.CTkFrame):
         self.on_rate_callback = on_rate_callback
         self.on_delete_callback = on_delete_callback
         
-        self.playlist = []      
+        self.playlist = TrackTable()
         self.current_index = -1   
         self.current_track = None
         
         self.is_dragging = False
-        self.last_seek_time = 0      
-        self.seek_target_value = 0  
+        self.clock = self.logic.clock
+        self._tick_job = None
+        self._end_job = None
+        self._preload_job = None
         
         self._setup_ui()
-        self.update_progress()
+        self.clock.subscribe(self._on_clock)
 
     def _setup_ui(self):
         self.top = ctk.CTkFrame(self, fg_color="transparent")
@@ -57,87 +63,92 @@ class PlayerFrame(ctk.CTkFrame):
 
     def load_playlist(self, tracks, start_index=0):
         self.playlist = tracks
+        self.logic.set_play_queue(tracks)
         self.play_index(start_index)
 
     def play_index(self, index):
         if 0 <= index < len(self.playlist):
             new_track = self.playlist[index]
-            if self.current_track and self.current_track[1] == new_track[1] and self.logic.is_playing():
+            if self.current_track and self.current_track.path == new_track.path and self.logic.is_playing():
                 self.current_index = index
+                self._schedule_preload()
                 return
 
             self.current_index = index
             self.current_track = new_track
             
-            self.lbl_title.configure(text=self.current_track[2] if self.current_track[2] else "Unknown")
-            self.lbl_artist.configure(text=self.current_track[3] if self.current_track[3] else "Unknown")
+            self.lbl_title.configure(text=self.current_track.title or "Unknown")
+            self.lbl_artist.configure(text=self.current_track.artist or "Unknown")
             
-            duration = self.current_track[6]
+            duration = self.current_track.duration
             if duration <= 0: duration = 100
             
             self.seek.configure(to=duration) 
             self.seek.set(0)
             
-            self.logic.play_file(self.current_track[1])
-            self.btn_play.configure(text="⏸")
-
-    def update_progress(self):
-        try:
-            if self.logic.is_playing() and not self.is_dragging and self.current_track:
-                real_pos = self.logic.get_audio_time()
-                dur = self.current_track[6]
-
-                time_since_seek = time.time() - self.last_seek_time
-                # Плавність після перемотки
-                if time_since_seek < 1.5:
-                    current_pos = self.seek_target_value + time_since_seek
-                else:
-                    if real_pos == 0 and self.seek.get() > 2:
-                        current_pos = self.seek.get() + 1
-                    else:
-                        current_pos = real_pos
-
-                self.seek.set(current_pos)
-
-                m, s = divmod(int(current_pos), 60)
-                tm, ts = divmod(int(dur), 60)
-                self.lbl_time.configure(text=f"{m:02}:{s:02} / {tm:02}:{ts:02}")
-                
-                # Автоперемикання
-                if dur > 0 and current_pos >= dur - 0.5:
-                    self.act_next()
-
-        except Exception as e:
-            print(f"Error in UI update: {e}")
-        finally:
-            self.after(1000, self.update_progress)
+            self.logic.play_file(self.current_track.path, self.current_track.duration)
+            self._schedule_preload()
+
+    def _schedule_preload(self):
+        if self._preload_job: self.after_cancel(self._preload_job)
+        self._preload_job = self.after(PRELOAD_DELAY_MS, self._preload_next)
+
+    def _preload_next(self):
+        """Черга відтворення ідемпотентна: act_next потім отримає той самий індекс, що відкрито тут."""
+        self._preload_job = None
+        if not self.playlist: return
+        idx = self.logic.get_next_index(self.current_index, len(self.playlist))
+        if 0 <= idx < len(self.playlist):
+            nxt = self.playlist[idx]
+            self.logic.preload_file(nxt.path, nxt.duration)
+
+    # === ГОДИННИК ===
+    def _on_clock(self, clock):
+        """Подія рушія: новий якір або стан. Таймер кінця треку ставиться заново від нового якоря."""
+        self.btn_play.configure(text="⏸" if clock.is_playing else "▶")
+        if self._end_job: self.after_cancel(self._end_job); self._end_job = None
+        remaining = clock.remaining()
+        if clock.is_playing and remaining is not None:
+            self._end_job = self.after(int(remaining * 1000) + END_SLACK_MS, self._on_track_end, clock.generation)
+        if clock.is_playing and not self._tick_job: self._tick()
+        else: self._render_time(clock.position())
+
+    def _on_track_end(self, generation):
+        self._end_job = None
+        if generation != self.clock.generation: return
+        if self.logic.confirm_track_end(): self.act_next()
+
+    def _tick(self):
+        self._tick_job = None
+        if not self.is_dragging: self._render_time(self.clock.position())
+        if self.clock.is_playing: self._tick_job = self.after(TICK_MS, self._tick)
+
+    def _render_time(self, pos):
+        if not self.current_track: return
+        if not self.is_dragging: self.seek.set(pos)
+        m, s = divmod(int(pos), 60); tm, ts = divmod(int(self.current_track.duration), 60)
+        self.lbl_time.configure(text=f"{m:02}:{s:02} / {tm:02}:{ts:02}")
 
     def on_seek(self, val):
         self.is_dragging = True
 
     def on_release(self, e):
-        if self.current_track:
-            target_time = self.seek.get()
-            self.logic.set_time(self.current_track[1], target_time)
-            self.last_seek_time = time.time()
-            self.seek_target_value = target_time
-            
-            dur = self.current_track[6]
-            m, s = divmod(int(target_time), 60); tm, ts = divmod(int(dur), 60)
-            self.lbl_time.configure(text=f"{m:02}:{s:02} / {tm:02}:{ts:02}")
         self.is_dragging = False
+        if self.current_track: self.logic.set_time(self.current_track.path, self.seek.get())
 
     def act_play_pause(self):
         self.logic.toggle_pause()
-        self.btn_play.configure(text="⏸" if self.logic.is_playing() else "▶")
 
     def act_shuffle(self):
-        st = self.logic.toggle_shuffle()
-        self.btn_shuf.configure(fg_color="#1f538d" if st else "transparent")
+        mode = self.logic.toggle_shuffle()
+        # smart - вибір з вагою за оцінками
+        self.btn_shuf.configure(fg_color="transparent" if mode == "off" else "#1f538d", text="🔀⭐" if mode == "smart" else "🔀")
+        if self.current_track: self._schedule_preload()
 
     def act_repeat(self):
         st = self.logic.toggle_repeat()
         self.btn_rep.configure(fg_color="#1f538d" if st else "transparent")
+        if self.current_track: self._schedule_preload()
 
     def act_next(self):
         if not self.playlist: return
@@ -151,12 +162,5 @@ class PlayerFrame(ctk.CTkFrame):
 
     def open_rate(self):
         if not self.current_track: return
-        try:
-            current_data = {
-                'melody': self.current_track[8], 'rhythm': self.current_track[9],
-                'vocals': self.current_track[10], 'lyrics': self.current_track[11],
-                'arrange': self.current_track[12], 'has_vocals': self.current_track[13],
-                'has_lyrics': self.current_track[14]
-            }
-        except: current_data = None
-        RatingWindow(self, self.logic, self.current_track[1], current_data, self.on_rate_callback)
\ No newline at end of file
+        current_data = self.current_track.rating_details()
+        RatingWindow(self, self.logic, self.current_track.path, current_data, self.on_rate_callback)
\ No newline at end of file
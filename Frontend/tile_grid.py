@@ -0,0 +1,119 @@
+import sys
+import customtkinter as ctk
+from Backend.profiler import PROFILER
+
+TILE_ICON = (120, 120)
+
+
+class VirtualTileGrid(ctk.CTkFrame):
+    """
+    Віртуалізована плитка груп (артисти / альбоми): кнопки є лише для рядків плиток у вікні перегляду (+ OVERSCAN),
+    при прокрутці ті самі кнопки переналаштовуються під інші групи. Обкладинки плиток, що пішли з екрана, скасовуються.
+    Кількість віджетів і запитів обкладинок не залежить від кількості груп.
+    """
+    ROW_HEIGHT = 180  # плитка 160 + pady 2x10
+    OVERSCAN = 1
+    WHEEL_ROWS = 1
+
+    def __init__(self, master, covers, placeholder, label, on_click, columns=3, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        PROFILER.instrument(self, ("set_items", "_render"), "VirtualTileGrid", cat="ui")
+        self.covers = covers
+        self.placeholder = placeholder
+        self.label = label  # item -> текст плитки
+        self.on_click = on_click  # on_click(item)
+        self.columns = columns
+
+        self.items = []
+        self.first = 0  # перший видимий рядок плиток
+        self.visible = 1
+        self.tiles = []  # [[button, shown_index | None якщо прихована, cover_ticket]]
+
+        self.pack_propagate(False)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.grid_propagate(False)
+        self.body.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.body)
+
+    def set_items(self, items):
+        """items - рядки груп (name, secondary, count, cover_path, cover)."""
+        self.items = items
+        self.first = 0
+        for tile in self.tiles:
+            if tile[1] is not None: tile[1] = -1
+        self._render()
+
+    # === POOL ===
+    def _row_px(self):
+        return max(1, int(self._apply_widget_scaling(self.ROW_HEIGHT)))
+
+    def _total_rows(self): return (len(self.items) + self.columns - 1) // self.columns
+
+    def _on_resize(self, event):
+        self.visible = max(1, event.height // self._row_px())
+        self._ensure_pool(self.visible + self.OVERSCAN)
+        self.scroll_to(self.first)
+
+    def _ensure_pool(self, rows):
+        while len(self.tiles) < rows * self.columns:
+            k = len(self.tiles)
+            btn = ctk.CTkButton(self.body, text="", image=self.placeholder, compound="top", width=150, height=160,
+                                fg_color="#2b2b40", hover_color="#3b3b55")
+            btn.grid(row=k // self.columns, column=k % self.columns, padx=10, pady=10)
+            btn.grid_remove()  # grid() без аргументів поверне плитку на її місце
+            self._bind_wheel(btn)
+            self.tiles.append([btn, None, None])
+
+    def _bind_wheel(self, widget):
+        if sys.platform.startswith("linux"):
+            widget.bind("<Button-4>", lambda e: self.scroll_by(-self.WHEEL_ROWS))
+            widget.bind("<Button-5>", lambda e: self.scroll_by(self.WHEEL_ROWS))
+        else:
+            widget.bind("<MouseWheel>", lambda e: self.scroll_by(-self.WHEEL_ROWS if e.delta > 0 else self.WHEEL_ROWS))
+
+    # === SCROLLING ===
+    def scroll_by(self, rows): self.scroll_to(self.first + rows)
+
+    def scroll_to(self, first):
+        self.first = max(0, min(int(first), self._total_rows() - self.visible))
+        self._render()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self._total_rows())
+        elif args[0] == "scroll":
+            step = self.visible if args[2] == "pages" else self.WHEEL_ROWS
+            self.scroll_by(int(args[1]) * step)
+
+    def _render(self):
+        start = self.first * self.columns
+        total = len(self.items)
+        for k, tile in enumerate(self.tiles):
+            btn, shown, ticket = tile
+            idx = start + k
+            if idx >= total:
+                # Плитка пішла з екрана - її обкладинка вже нікому не потрібна
+                self.covers.cancel(ticket)
+                tile[2] = None
+                if shown is not None:
+                    btn.grid_remove()
+                    tile[1] = None
+                continue
+            if shown == idx: continue
+            self.covers.cancel(ticket)
+            item = self.items[idx]
+            btn.configure(text=self.label(item), image=self.placeholder, command=lambda item=item: self.on_click(item))
+            if shown is None: btn.grid()
+            tile[1] = idx
+            # Обкладинка підвантажиться у фоні і підставиться через after()
+            tile[2] = self.covers.request(item[4] or item[3], TILE_ICON, lambda icon, tile=tile, idx=idx: self._set_icon(tile, idx, icon))
+
+        rows = self._total_rows()
+        if rows: self.scrollbar.set(self.first / rows, min(1.0, (self.first + self.visible) / rows))
+        else: self.scrollbar.set(0.0, 1.0)
+
+    def _set_icon(self, tile, idx, icon):
+        if icon and tile[1] == idx and tile[0].winfo_exists(): tile[0].configure(image=icon)
\ No newline at end of file
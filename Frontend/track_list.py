@@ -0,0 +1,139 @@
+import sys
+import customtkinter as ctk
+from Backend.profiler import PROFILER
+
+
+def _placeholder_icon():
+    from PIL import Image  # PIL вантажиться з першим списком треків, а не при імпорті модуля
+    return ctk.CTkImage(Image.new("RGBA", (30, 30), (50, 50, 50, 0)), size=(30, 30))
+
+
+def format_track_row(t):
+    title, artist, album, rating = t.title, t.artist, t.album, t.rating
+    m, s = divmod(int(t.duration), 60)
+
+    title_s = (title[:25] + '..') if len(title) > 25 else title
+    artist_s = (artist[:18] + '..') if len(artist) > 18 else artist
+    album_s = (album[:18] + '..') if len(album) > 18 else album
+
+    return f"{artist_s:<20} | {title_s:<25} | {m:02}:{s:02} | {album_s:<20} | ⭐ {rating:.1f}"
+
+
+class VirtualTrackList(ctk.CTkFrame):
+    """
+    Віртуалізований список треків: віджети є лише для рядків у вікні перегляду (+ OVERSCAN),
+    при прокрутці ті самі кнопки переналаштовуються під інші треки.
+    Кількість віджетів не залежить від розміру бібліотеки.
+    """
+    ROW_HEIGHT = 41  # кнопка 40 + роздільник 1
+    OVERSCAN = 4
+    WHEEL_ROWS = 3
+    PREFETCH_ROWS = 50  # наступна сторінка проситься, коли до кінця завантаженого лишається стільки рядків
+
+    def __init__(self, master, covers, on_play_callback, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        PROFILER.instrument(self, ("set_tracks", "_render", "_ensure_loaded"), "VirtualTrackList", cat="ui")
+        self.covers = covers
+        self.on_play_callback = on_play_callback
+
+        self.tracks = []
+        self.load_more = None
+        self.first = 0
+        self.visible = 1
+        self.rows = []  # [[button, divider, shown_index | None якщо прихований, cover_ticket]]
+        self.default_icon = _placeholder_icon()
+
+        self.pack_propagate(False)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.pack_propagate(False)
+        self.body.bind("<Configure>", self._on_resize)
+
+    def set_tracks(self, tracks, load_more=None):
+        """load_more() дописує наступну сторінку в tracks і повертає кількість рядків (0 - більше немає)."""
+        self.tracks = tracks
+        self.load_more = load_more
+        self.first = 0
+        self.redraw()
+
+    def redraw(self):
+        """Перемальовує видимі рядки (дані в tracks змінились на місці)."""
+        # -1: рядок ще показаний, але його вміст застарів
+        for row in self.rows:
+            if row[2] is not None: row[2] = -1
+        self._render()
+
+    # === POOL ===
+    def _row_px(self):
+        return max(1, int(self._apply_widget_scaling(self.ROW_HEIGHT)))
+
+    def _on_resize(self, event):
+        self.visible = max(1, event.height // self._row_px())
+        self._ensure_pool(self.visible + self.OVERSCAN)
+        self.scroll_to(self.first)
+
+    def _ensure_pool(self, size):
+        while len(self.rows) < size:
+            btn = ctk.CTkButton(self.body, text="", image=self.default_icon, compound="left", anchor="w",
+                                height=40, fg_color="transparent", hover_color="#3b3b55", font=("Consolas", 13))
+            div = ctk.CTkFrame(self.body, height=1, fg_color="#333")
+            for w in (btn, div): self._bind_wheel(w)
+            self.rows.append([btn, div, None, None])
+
+    def _bind_wheel(self, widget):
+        if sys.platform.startswith("linux"):
+            widget.bind("<Button-4>", lambda e: self.scroll_by(-self.WHEEL_ROWS))
+            widget.bind("<Button-5>", lambda e: self.scroll_by(self.WHEEL_ROWS))
+        else:
+            widget.bind("<MouseWheel>", lambda e: self.scroll_by(-self.WHEEL_ROWS if e.delta > 0 else self.WHEEL_ROWS))
+
+    # === SCROLLING ===
+    def scroll_by(self, rows): self.scroll_to(self.first + rows)
+
+    def scroll_to(self, first):
+        self._ensure_loaded(int(first) + self.visible + self.PREFETCH_ROWS)
+        self.first = max(0, min(int(first), len(self.tracks) - self.visible))
+        self._render()
+
+    def _ensure_loaded(self, rows):
+        while self.load_more and len(self.tracks) < rows:
+            if not self.load_more(): self.load_more = None
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.tracks))
+        elif args[0] == "scroll":
+            step = self.visible if args[2] == "pages" else self.WHEEL_ROWS
+            self.scroll_by(int(args[1]) * step)
+
+    def _render(self):
+        self._ensure_loaded(self.first + self.visible + self.PREFETCH_ROWS)
+        total = len(self.tracks)
+        for i, row in enumerate(self.rows):
+            btn, div, shown, ticket = row
+            idx = self.first + i
+            if idx >= total:
+                if shown is not None:
+                    btn.pack_forget(); div.pack_forget()
+                    row[2] = None
+                continue
+            if shown == idx: continue
+            t = self.tracks[idx]
+            # Обкладинка попереднього треку в цьому рядку вже не потрібна
+            self.covers.cancel(ticket)
+            btn.configure(text=format_track_row(t), image=self.default_icon,
+                          command=lambda idx=idx: self.on_play_callback(self.tracks, idx))
+            if shown is None:
+                # Приховані рядки завжди в кінці пулу, тож порядок pack зберігається
+                btn.pack(fill="x", padx=5); div.pack(fill="x", padx=10)
+            row[2] = idx
+            # Ключ - id обкладинки: треки одного альбому ділять одну мініатюру
+            row[3] = self.covers.request(t.cover or t.path, (30, 30), lambda icon, row=row, idx=idx: self._set_icon(row, idx, icon))
+
+        if total: self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible) / total))
+        else: self.scrollbar.set(0.0, 1.0)
+
+    def _set_icon(self, row, idx, icon):
+        if icon and row[2] == idx and row[0].winfo_exists(): row[0].configure(image=icon)
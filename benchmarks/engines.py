@@ -0,0 +1,62 @@
+"""
+Той самий бекенд-бенчмарк на обох рушіях сховища (ctypes -> backend.dll проти вбудованого sqlite3).
+Кожен рушій - окремий процес: C++ бекенд один на процес і тримає свою базу.
+    python -m benchmarks.engines --dll /tmp/libbackend.so --tracks 5000 [--out engines.json]
+Без --dll (або без зібраного бекенду) міряється лише sqlite.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from benchmarks.run import compare
+
+ENGINES = ("cpp", "sqlite")
+
+
+def run_engine(engine, args, out_path):
+    cmd = [sys.executable, "-m", "benchmarks.run", "--engine", engine, "--no-ui", "--tracks", str(args.tracks),
+           "--repeat", str(args.repeat), "--seed", str(args.seed), "--out", out_path]
+    if args.dll: cmd += ["--dll", args.dll]
+    if args.library: cmd += ["--library", args.library]
+    result = subprocess.run(cmd, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if result.returncode != 0: return None
+    with open(out_path, encoding="utf-8") as f: return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dll", default=os.environ.get("MUSIC_BACKEND_DLL"))
+    parser.add_argument("--tracks", type=int, default=5000)
+    parser.add_argument("--library", default=None)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default=None, help="файл для JSON (інакше stdout)")
+    args = parser.parse_args(argv)
+    if args.dll: args.dll = os.path.abspath(args.dll)
+    if args.library: args.library = os.path.abspath(args.library)
+
+    reports = {}
+    with tempfile.TemporaryDirectory(prefix="music_bench_engines_") as tmp:
+        for engine in ENGINES:
+            if engine == "cpp" and not args.dll: continue
+            print(f"=== {engine} ===", file=sys.stderr)
+            report = run_engine(engine, args, os.path.join(tmp, f"{engine}.json"))
+            if report: reports[engine] = report
+
+    result = {"engines": {name: {"meta": r["meta"], "results": r["results"]} for name, r in reports.items()}}
+    if len(reports) == 2:
+        # old = cpp, new = sqlite: ratio < 1 - sqlite швидший
+        result["sqlite_vs_cpp"] = compare(reports["cpp"], reports["sqlite"])
+        for name, row in sorted(result["sqlite_vs_cpp"].items()):
+            print(f"  {name:<32} cpp {row['old_ms']:>9.2f} ms   sqlite {row['new_ms']:>9.2f} ms   x{row['ratio']:.2f}", file=sys.stderr)
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,350 @@
+"""
+Бенчмарк гарячих шляхів на синтетичній бібліотеці. Результат - JSON для порівняння між запусками.
+Потрібен зібраний бекенд; на Linux:
+    g++ -shared -fPIC -O2 -std=c++17 Backend/Database/cpp_src/logic.cpp -lsqlite3 -o /tmp/libbackend.so
+    python -m benchmarks.run --dll /tmp/libbackend.so --tracks 5000 --out bench.json [--compare old.json]
+--engine sqlite міряє вбудований sqlite3 замість DLL (порівняння обох - benchmarks.engines).
+UI-частина (Tk) міряється лише коли є дисплей; інакше в звіті "skipped".
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import itertools
+import tempfile
+import statistics
+import subprocess
+import contextlib
+from collections import Counter
+from benchmarks import synthetic_library
+from Backend.Database.sqlite_engine import ENGINES, ENGINE_ENV
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SORT_KEYS = ("artist", "title", "duration", "album", "rating")
+CHARTS = [(entity, mode) for entity in ("track", "album", "artist", "genre") for mode in ("best", "worst")]
+LARGE_CHART = 1000
+COVER_SAMPLE = 200
+OVERHEAD_CALLS = 200  # дрібні запити, де час - це майже лише ціна одного виклику в сховище
+AUDIO_SWITCHES = 20
+AUDIO_OPEN_DELAY = 0.02  # імітоване відкриття файлу в null-бекенді (MCI open - десятки мс)
+QUEUE_STEPS = 1000
+
+
+class Bench:
+    """Збирає заміри: name -> {ms: [...], min_ms, median_ms, rows}."""
+
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = {}
+
+    def measure(self, name, fn, setup=None, repeat=None, rows=len):
+        times, result = [], None
+        for _ in range(repeat or self.repeat):
+            if setup: setup()
+            start = time.perf_counter()
+            result = fn()
+            times.append((time.perf_counter() - start) * 1000)
+        entry = {"ms": [round(t, 3) for t in times], "min_ms": round(min(times), 3), "median_ms": round(statistics.median(times), 3)}
+        if rows:
+            try: entry["rows"] = rows(result)
+            except TypeError: pass
+        self.results[name] = entry
+        print(f"  {name:<32} {entry['median_ms']:>10.2f} ms" + (f"  ({entry['rows']} rows)" if "rows" in entry else ""), file=sys.stderr)
+        return result
+
+    def skip(self, name, reason):
+        self.results[name] = {"skipped": reason}
+        print(f"  {name:<32} skipped: {reason}", file=sys.stderr)
+
+
+# === BACKEND ===
+def bench_backend(bench, logic, library, rated_fraction, seed):
+    cold = lambda: logic.cache.clear()
+
+    bench.measure("scan_directory.cold", lambda: logic.scan_directory(library), repeat=1, rows=None)
+    bench.results["scan_directory.cold"]["stats"] = logic.last_scan_stats
+    if logic.cover_store: bench.results["scan_directory.cold"]["covers"] = logic.cover_store.stats()
+    bench.measure("scan_directory.rescan", lambda: logic.scan_directory(library), rows=None)
+
+    # Оцінки потрібні топам і сортуванню за рейтингом; запис іде тим самим шляхом, що й з UI
+    library_rows = logic.get_playlist()
+    rnd = random.Random(seed)
+    rated = rnd.sample(list(library_rows.path), int(len(library_rows) * rated_fraction))
+    def rate_all():
+        for path in rated:
+            logic.calculate_save_rating(path, {"melody": rnd.randint(1, 10), "rhythm": rnd.randint(1, 10), "vocals": rnd.randint(1, 10),
+                                               "lyrics": rnd.randint(1, 10), "arrange": rnd.randint(1, 10), "has_vocals": 1, "has_lyrics": 1})
+        return logic.flush_ratings()
+    bench.measure("calculate_save_rating+flush", rate_all, repeat=1, rows=lambda n: n)
+
+    for key in SORT_KEYS:
+        def reset(): cold(); logic.current_sort_col = None
+        bench.measure(f"get_playlist.{key}", lambda: logic.get_playlist(key), setup=reset)
+        bench.measure(f"get_playlist.{key}.cached", lambda: logic.get_playlist())
+        bench.measure(f"get_playlist_pager.{key}", lambda: logic.get_playlist_pager(key).tracks, setup=reset)
+
+    bench.measure("get_artists", logic.get_artists, setup=cold)
+    bench.measure("get_albums", logic.get_albums, setup=cold)
+    artist = Counter(library_rows.artist).most_common(1)[0][0]
+    bench.measure("get_artist_albums", lambda: logic.get_artist_albums(artist), setup=cold)
+    bench.measure("get_filtered_pager.album", lambda: logic.get_filtered_pager("album", library_rows.album[0]).tracks, setup=cold)
+
+    for entity, mode in CHARTS:
+        bench.measure(f"get_chart.{entity}.{mode}", lambda: logic.get_chart(entity, mode), setup=cold)
+    bench.measure(f"get_chart.track.best.{LARGE_CHART}", lambda: logic.get_chart("track", "best", limit=LARGE_CHART), setup=cold)
+    bench.measure("get_chart.album.melody", lambda: logic.get_chart("album", "best", "melody"), setup=cold)
+
+    word = library_rows.title[0].split()[0]
+    # Одна заміна в кінці найдовшого слова: точний пошук нічого не дає, а триграмний індекс слово знаходить
+    long_word = max(library_rows.title[0].split(), key=len)
+    typo = long_word[:-1] + ("q" if long_word[-1].lower() != "q" else "z")
+    queries = {"word": word, "prefix": word[:3], "artist": library_rows.artist[0], "typo": typo, "miss": "zzqqxx"}
+    bench.measure("fuzzy_index.build", lambda: logic.fuzzy_search(word), repeat=1)
+    for name, query in queries.items():
+        found = bench.measure(f"search_tracks.{name}", lambda: logic.search_tracks(query), setup=cold)
+        if name == "typo": assert len(found) > 0, f"typo query {query!r} found nothing - fuzzy fallback not exercised"
+
+    # Один рядок / одне число на запит: видно ціну самого виклику (ctypes + 'mbcs' проти sqlite3)
+    bench.measure("query_overhead.page_1", lambda: [logic.get_tracks_page("id", "ASC", limit=1) for _ in range(OVERHEAD_CALLS)],
+                  rows=lambda r: len(r))
+    bench.measure("query_overhead.artist_rating", lambda: [logic.get_artist_rating(artist) for _ in range(OVERHEAD_CALLS)],
+                  rows=lambda r: len(r))
+
+    step = max(1, len(library_rows) // COVER_SAMPLE)
+    sample = library_rows.path[::step][:COVER_SAMPLE]
+    refs = [c or p for c, p in zip(library_rows.cover[::step], sample)]
+    # Обкладинка з MP3 (як до сховища обкладинок) проти читання за id
+    bench.measure("get_cover_data.mp3", lambda: [logic.get_cover_data(p) for p in sample], rows=lambda r: sum(1 for d in r if d))
+    bench.measure("get_cover_data", lambda: [logic.get_cover_data(r) for r in refs], rows=lambda r: sum(1 for d in r if d))
+    return library_rows
+
+
+# === ЗНІМОК БІБЛІОТЕКИ ===
+def bench_snapshot(bench, logic):
+    """Перебудова mmap-знімка і читання з нього: перший екран теплого старту проти запиту в сховище."""
+    from Backend.library_snapshot import LibrarySnapshot
+    store = logic.snapshot
+    if not store: return bench.skip("snapshot", "snapshot disabled")
+    with logic.db_lock: built = bench.measure("snapshot.build", store.rebuild, repeat=1, rows=None)
+    if not built: return bench.skip("snapshot", "snapshot not built")
+
+    def open_page():
+        snapshot = LibrarySnapshot(store.path)
+        try: return snapshot.page("ASC", None, 200)
+        finally: snapshot.close()
+    bench.measure("snapshot.open+page_1", open_page)
+    bench.measure("snapshot.page_1.engine", lambda: logic.engine.page("artist", "ASC", None, None, None, 200))
+    bench.measure("snapshot.table", lambda: store.table("ASC"))
+    bench.measure("snapshot.table.engine", lambda: logic.engine.tracks("artist", "ASC", None, None))
+
+
+# === ПРОФАЙЛЕР ===
+def bench_profiler(bench, logic, workdir):
+    """Ціна обгортки на дрібному запиті в сховище. Вимкнений профайлер нічого не обгортає - це і є рядок .off."""
+    from Backend.profiler import Profiler
+    profiler = Profiler("1")
+    bare = type(logic.engine).artist_rating.__get__(logic.engine)  # без обгортки, навіть якщо MUSIC_PROFILE увімкнено
+    timed = profiler.wrap(bare, "artist_rating")
+    bench.measure("profiler.off.artist_rating", lambda: [bare("Artist 1") for _ in range(OVERHEAD_CALLS)], rows=None)
+    bench.measure("profiler.on.artist_rating", lambda: [timed("Artist 1") for _ in range(OVERHEAD_CALLS)], rows=None)
+    path = os.path.join(workdir, "trace.json")
+    bench.measure("profiler.write_trace", lambda: profiler.write_trace(path), repeat=1, rows=lambda _: len(profiler.trace()["traceEvents"]))
+
+
+# === FRONTEND (без вікна) ===
+def bench_frontend_headless(bench, logic, library_rows, workdir):
+    from Frontend.track_list import format_track_row
+    from Frontend.cover_cache import CoverCache
+
+    bench.measure("format_track_row.all", lambda: [format_track_row(t) for t in library_rows])
+    covers = CoverCache(logic, cache_dir=os.path.join(workdir, "covers"))
+    step = max(1, len(library_rows) // COVER_SAMPLE)
+    # Ключі як у списку треків: id обкладинки - треки одного альбому декодуються один раз
+    sample = [c or p for c, p in zip(library_rows.cover[::step], library_rows.path[::step])][:COVER_SAMPLE]
+    for name, size in (("list", (30, 30)), ("tile", (120, 120))):
+        bench.measure(f"cover_thumbnail.{name}.decode", lambda: [covers.load_thumbnail(p, size) for p in sample], repeat=1,
+                      rows=lambda r: sum(1 for t in r if t))
+        bench.measure(f"cover_thumbnail.{name}.disk", lambda: [covers.load_thumbnail(p, size) for p in sample],
+                      rows=lambda r: sum(1 for t in r if t))
+    covers.pool.shutdown(wait=False)
+
+
+# === STARTUP ===
+STARTUP_PROBE = (
+    "import sys, time; t = time.perf_counter(); import Backend.main_controller; "
+    "print(round((time.perf_counter() - t) * 1000, 3), int('mutagen' in sys.modules), int('PIL' in sys.modules))")
+
+
+def bench_startup(bench):
+    """Холодний імпорт бекенду в чистому процесі; mutagen і PIL мають вантажитись лише при першому використанні."""
+    def probe():
+        out = subprocess.run([sys.executable, "-c", STARTUP_PROBE], cwd=REPO, capture_output=True, text=True, check=True).stdout.split()
+        return float(out[0]), [name for name, loaded in zip(("mutagen", "PIL"), out[1:]) if loaded == "1"]
+    result = bench.measure("startup.process+import_backend", probe, rows=None)
+    bench.results["startup.import_backend"] = {"ms": [result[0]], "min_ms": result[0], "median_ms": result[0], "eager_imports": result[1]}
+
+
+# === AUDIO ===
+def bench_audio(bench, library_rows):
+    """Перемикання треків на null-бекенді (без попереднього відкриття і з ним) і кроки черги відтворення."""
+    from Backend.audio_engine import AudioEngine, NullBackend
+    from Backend.playback_clock import PlaybackClock
+    from Backend.shuffle_queue import ShuffleQueue, SHUFFLE, SMART
+
+    tracks = itertools.cycle(zip(library_rows.path, library_rows.duration))
+    for name, preload in (("cold", False), ("preloaded", True)):
+        engine = AudioEngine(NullBackend(open_delay=AUDIO_OPEN_DELAY), PlaybackClock())
+        upcoming = []
+        def setup():
+            upcoming[:] = next(tracks)
+            if preload: engine.preload(*upcoming)
+        bench.measure(f"audio.switch.{name}", lambda: engine.play(*upcoming), setup=setup, repeat=AUDIO_SWITCHES, rows=None)
+        engine.close()
+
+    queue = ShuffleQueue(seed=1)
+    queue.set_playlist(library_rows)
+    def walk():
+        current = 0
+        for _ in range(QUEUE_STEPS): current = queue.next_index(current, len(library_rows))
+    for mode in (SHUFFLE, SMART):
+        queue.set_mode(mode)
+        bench.measure(f"play_queue.{mode}.build", lambda: queue.set_mode(mode), rows=None)
+        bench.measure(f"play_queue.{mode}.next", walk, rows=None)
+
+
+# === FRONTEND (Tk) ===
+def _open_display():
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        return None, "no DISPLAY"
+    try:
+        from Frontend.main_window import MusicAppUI
+        return MusicAppUI, None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def bench_frontend_ui(bench, logic):
+    MusicAppUI, reason = _open_display()
+    names = ["ui.startup", "ui.tab.artists", "ui.tab.albums", "ui.tab.tracks", "ui.sort.title", "ui.scroll", "ui.top_chart"]
+    if MusicAppUI is None:
+        for name in names: bench.skip(name, reason)
+        return
+    try:
+        app = bench.measure("ui.startup", lambda: _first_paint(MusicAppUI(logic)), repeat=1, rows=None)
+        for stage, ms, _ in app.startup.stages: bench.results[f"ui.startup.{stage}"] = {"ms": [round(ms, 3)], "min_ms": round(ms, 3), "median_ms": round(ms, 3)}
+    except Exception as e:
+        for name in names: bench.skip(name, f"{type(e).__name__}: {e}")
+        return
+    try:
+        for tab in ("Artists", "Albums", "Tracks"):
+            bench.measure(f"ui.tab.{tab.lower()}", lambda: _settled(app, app.change_tab(tab)), rows=None)
+        bench.measure("ui.sort.title", lambda: _settled(app, app.sort_tracks("title")), rows=None)
+        track_list = app.content.track_list
+        if track_list:
+            def scroll():
+                for _ in range(50): track_list.scroll_by(track_list.visible); app.update_idletasks()
+            bench.measure("ui.scroll", scroll, rows=None)
+        else:
+            bench.skip("ui.scroll", "no track list")
+        bench.measure("ui.top_chart", lambda: _settled(app, app.show_playlist("best")), rows=None)
+    finally:
+        app.content.covers.cancel_all()
+        app.destroy()
+
+
+def _first_paint(app, timeout=60.0):
+    """Оболонка з'являється одразу, треки - після неї: чекаємо, поки StartupTimer закриє first_paint."""
+    deadline = time.perf_counter() + timeout
+    while not app.startup.finished and time.perf_counter() < deadline:
+        app.update()
+        time.sleep(0.001)
+    return app
+
+
+def _settled(app, _=None):
+    """Час до першого відмальованого кадру, а не лише до повернення з обробника."""
+    app.update_idletasks(); app.update()
+    return app
+
+
+# === ЗВІТ ===
+def _git_revision():
+    try: return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError): return None
+
+
+def compare(old, new):
+    """{назва: {old_ms, new_ms, ratio}} для замірів, що є в обох звітах (ratio > 1 - стало повільніше)."""
+    diff = {}
+    for name, entry in new["results"].items():
+        before = old.get("results", {}).get(name, {})
+        if "median_ms" in entry and before.get("median_ms"):
+            diff[name] = {"old_ms": before["median_ms"], "new_ms": entry["median_ms"],
+                          "ratio": round(entry["median_ms"] / before["median_ms"], 3)}
+    return diff
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dll", default=os.environ.get("MUSIC_BACKEND_DLL"), help="шлях до backend.dll / libbackend.so")
+    parser.add_argument("--engine", default=None, choices=ENGINES, help=f"рушій сховища (за замовчуванням ${ENGINE_ENV} або auto)")
+    parser.add_argument("--tracks", type=int, default=5000)
+    parser.add_argument("--library", default=None, help="де тримати згенеровану бібліотеку (перевикористовується між запусками)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rated", type=float, default=0.3, help="частка треків, що отримають оцінку")
+    parser.add_argument("--no-ui", action="store_true", help="не відкривати Tk-вікно навіть за наявності дисплея")
+    parser.add_argument("--out", default=None, help="файл для JSON (інакше stdout)")
+    parser.add_argument("--compare", default=None, help="попередній JSON: додати відношення часів")
+    args = parser.parse_args(argv)
+
+    library = args.library or os.path.join(tempfile.gettempdir(), f"music_bench_{args.tracks}_{args.seed}")
+    print(f"Library: {library}", file=sys.stderr)
+    manifest = synthetic_library.generate(library, args.tracks, seed=args.seed)
+
+    from Backend.main_controller import MainController
+    dll_path = os.path.abspath(args.dll) if args.dll else None
+    # C++ бекенд відкриває music_library.db у поточній теці - кожен запуск починає з порожньої бази
+    workdir = tempfile.mkdtemp(prefix="music_bench_run_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    bench = Bench(args.repeat)
+    try:
+        # Контролер звітує print-ами; stdout лишається чистим для JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            logic = MainController(dll_path=dll_path, engine=args.engine)
+            if not logic.engine: parser.error(f"no storage engine (backend library not loaded: {logic.dll_path})")
+            library_rows = bench_backend(bench, logic, library, args.rated, args.seed)
+            bench_snapshot(bench, logic)
+            bench_profiler(bench, logic, workdir)
+            bench_frontend_headless(bench, logic, library_rows, workdir)
+            bench_audio(bench, library_rows)
+            bench_startup(bench)
+            if args.no_ui: bench.skip("ui", "--no-ui")
+            else: bench_frontend_ui(bench, logic)
+            logic.shutdown()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {"meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "revision": _git_revision(),
+                       "python": platform.python_version(), "platform": platform.platform(),
+                       "machine": platform.machine(), "cpus": os.cpu_count(), "repeat": args.repeat,
+                       "engine": logic.engine.name, "backend": os.path.basename(logic.dll_path) if logic.lib else None,
+                       "library": manifest},
+              "results": bench.results}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f: report["compare"] = compare(json.load(f), report)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+Синтетична MP3-бібліотека для бенчмарків: справжні MPEG-кадри, ID3v2 теги, обкладинки APIC.
+Те саме seed + параметри = ті самі файли; готова бібліотека перевикористовується (manifest.json).
+    python -m benchmarks.synthetic_library out_dir --tracks 5000 [--cover-size 500] [--seed 1]
+"""
+import io
+import os
+import json
+import struct
+import random
+import argparse
+from PIL import Image
+from mutagen.id3 import ID3, TIT2, TPE1, TALB, TCON, TRCK, APIC
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, без CRC: кадр 417 байт, 1152 семпли
+FRAME_HEADER = b"\xff\xfb\x90\x64"
+FRAME = FRAME_HEADER + b"\x00" * 413
+SAMPLES_PER_FRAME, SAMPLE_RATE = 1152, 44100
+AUDIO_FRAMES = 8  # справжні кадри після Xing - mutagen і MCI бачать валідний потік
+
+# Діакритика і кирилиця навмисно: кодування шляхів, fold() у нечіткому пошуку, FTS-токенізатор
+ARTIST_WORDS = ("Black", "Silver", "Night", "Echo", "Velvet", "Iron", "Crystal", "Neon", "Wild", "Golden",
+                "Björk", "Sigur", "Mötley", "Żywiec", "Океан", "Ельзи", "Кино", "Dead", "Arctic", "Daft")
+ARTIST_TAILS = ("Monkeys", "Punk", "Crüe", "Rós", "Riders", "Theory", "Waves", "Garden", "Сни", "Orchestra")
+TITLE_WORDS = ("love", "road", "fire", "dream", "city", "light", "rain", "heart", "ghost", "river",
+               "summer", "машина", "зоря", "café", "naïve", "storm", "echo", "machine", "shadow", "gold")
+GENRES = ("Rock", "Pop", "Jazz", "Electronic", "Metal", "Hip-Hop", "Folk", "Classical", "Indie", "Blues")
+
+
+def mp3_bytes(seconds):
+    """Xing-кадр з кількістю кадрів (тривалість без мегабайтів тиші) + кілька звичайних кадрів."""
+    frames = max(AUDIO_FRAMES, int(seconds * SAMPLE_RATE / SAMPLES_PER_FRAME))
+    xing = FRAME_HEADER + b"\x00" * 32 + b"Xing" + struct.pack(">II", 1, frames)
+    return xing.ljust(len(FRAME), b"\x00") + FRAME * AUDIO_FRAMES
+
+
+def make_cover(rnd, size):
+    """JPEG з градієнтом: стискається і декодується як справжня обкладинка, а не як суцільний колір."""
+    mask = Image.linear_gradient("L").resize((size, size))
+    top = Image.new("RGB", (size, size), tuple(rnd.randrange(256) for _ in range(3)))
+    bottom = Image.new("RGB", (size, size), tuple(rnd.randrange(256) for _ in range(3)))
+    buf = io.BytesIO()
+    Image.composite(top, bottom, mask).save(buf, "JPEG", quality=85)
+    return buf.getvalue()
+
+
+def _unique_names(rnd, count, first, second):
+    names, seen = [], set()
+    while len(names) < count:
+        name = f"{rnd.choice(first)} {rnd.choice(second)}"
+        if name in seen: name = f"{name} {len(names)}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def _safe(name):
+    return "".join("_" if c in '<>:"/\\|?*' else c for c in name).strip(". ") or "_"
+
+
+def plan_library(tracks, artists=None, albums_per_artist=4, seed=1):
+    """[{artist, album, title, track, genre, seconds}] - що буде згенеровано, без запису на диск."""
+    rnd = random.Random(seed)
+    artists = artists or max(1, tracks // 40)
+    names = _unique_names(rnd, artists, ARTIST_WORDS, ARTIST_TAILS)
+    plan = []
+    for i in range(tracks):
+        # Квадрат рівномірного: кілька артистів з сотнями треків і довгий хвіст, як у справжніх бібліотеках
+        artist = names[min(artists - 1, int(artists * rnd.random() ** 2))]
+        album = f"{artist} - Album {rnd.randrange(albums_per_artist) + 1}"
+        title = " ".join(rnd.sample(TITLE_WORDS, rnd.randint(1, 3))).capitalize() + f" {i}"
+        plan.append({"artist": artist, "album": album, "title": title, "track": i % 20 + 1,
+                     "genre": rnd.choice(GENRES), "seconds": round(rnd.uniform(90, 420), 1)})
+    return plan
+
+
+def generate(root, tracks, artists=None, albums_per_artist=4, cover_size=500, cover_ratio=0.9, seed=1):
+    """
+    Пише бібліотеку в root/<артист>/<альбом>/NN - <назва>.mp3 і повертає manifest.
+    Обкладинка одна на альбом (як у справжніх рипах); cover_ratio альбомів її мають.
+    """
+    params = {"tracks": tracks, "artists": artists, "albums_per_artist": albums_per_artist,
+              "cover_size": cover_size, "cover_ratio": cover_ratio, "seed": seed}
+    manifest_path = os.path.join(root, "manifest.json")
+    try:
+        with open(manifest_path, encoding="utf-8") as f: manifest = json.load(f)
+        if manifest.get("params") == params: return manifest
+    except (OSError, ValueError): pass
+
+    rnd = random.Random(seed + 1)
+    covers = {}  # альбом -> JPEG | None
+    paths, total_bytes = [], 0
+    for meta in plan_library(tracks, artists, albums_per_artist, seed):
+        folder = os.path.join(root, _safe(meta["artist"]), _safe(meta["album"]))
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{meta['track']:02} - {_safe(meta['title'])}.mp3")
+        with open(path, "wb") as f: f.write(mp3_bytes(meta["seconds"]))
+
+        if meta["album"] not in covers:
+            covers[meta["album"]] = make_cover(rnd, cover_size) if rnd.random() < cover_ratio else None
+        tags = ID3()
+        tags.add(TIT2(encoding=3, text=meta["title"])); tags.add(TPE1(encoding=3, text=meta["artist"]))
+        tags.add(TALB(encoding=3, text=meta["album"])); tags.add(TCON(encoding=3, text=meta["genre"]))
+        tags.add(TRCK(encoding=3, text=str(meta["track"])))
+        if covers[meta["album"]]: tags.add(APIC(encoding=3, mime="image/jpeg", type=3, desc="Cover", data=covers[meta["album"]]))
+        tags.save(path)
+        paths.append(path)
+        total_bytes += os.path.getsize(path)
+
+    manifest = {"params": params, "files": len(paths), "bytes": total_bytes,
+                "artists": len({os.path.dirname(os.path.dirname(p)) for p in paths}),
+                "albums": len(covers), "albums_with_cover": sum(1 for c in covers.values() if c)}
+    with open(manifest_path, "w", encoding="utf-8") as f: json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root")
+    parser.add_argument("--tracks", type=int, default=5000)
+    parser.add_argument("--artists", type=int, default=None, help="за замовчуванням tracks / 40")
+    parser.add_argument("--albums-per-artist", type=int, default=4)
+    parser.add_argument("--cover-size", type=int, default=500)
+    parser.add_argument("--cover-ratio", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    manifest = generate(args.root, args.tracks, args.artists, args.albums_per_artist, args.cover_size, args.cover_ratio, args.seed)
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
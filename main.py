@@ -1,8 +1,21 @@
+import sys
+import time
+STARTED = time.perf_counter()  # до важких імпортів: звіт старту рахує і їх
+from Backend.startup_timer import StartupTimer
+from Backend.profiler import PROFILER
+startup = StartupTimer(STARTED)
+
 import customtkinter as ctk
 from Backend.main_controller import MainController
 from Frontend.main_window import MusicAppUI
+startup.mark("import")
 
 if __name__ == "__main__":
+    # --profile (як MUSIC_PROFILE=1) або --profile=trace.json - ще й Chrome trace при виході
+    flag = next((arg for arg in sys.argv[1:] if arg == "--profile" or arg.startswith("--profile=")), None)
+    if flag: PROFILER.configure(flag.partition("=")[2] or "1")
     ctk.set_appearance_mode("Dark")
-    app = MusicAppUI(MainController())
+    logic = MainController()
+    startup.mark("engine")
+    app = MusicAppUI(logic, startup=startup)
     app.mainloop()
\ No newline at end of file
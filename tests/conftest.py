@@ -0,0 +1,37 @@
+"""
+Спільні фікстури: контролер на тимчасовій базі для кожного рушія.
+C++ рушій перевіряється, якщо MUSIC_BACKEND_DLL вказує на зібраний бекенд (як у benchmarks.run).
+"""
+import os
+import pytest
+from Backend.main_controller import MainController
+
+ENGINES = ["sqlite"] + (["cpp"] if os.environ.get("MUSIC_BACKEND_DLL") else [])
+
+
+@pytest.fixture(params=ENGINES)
+def engine(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # C++ бекенд відкриває music_library.db у поточній теці
+    return request.param
+
+
+@pytest.fixture
+def open_controller(engine, tmp_path):
+    """Фабрика контролерів на одній тимчасовій базі. Повторний виклик - наступний запуск: попередній контролер закривається."""
+    opened = []
+
+    def factory(clear=True):
+        while opened: opened.pop().shutdown()
+        dll = os.environ.get("MUSIC_BACKEND_DLL")
+        controller = MainController(engine=engine, dll_path=os.path.abspath(dll) if dll else None,
+                                    db_path=str(tmp_path / "music_library.db"), audio_backend="null", snapshot=False)
+        if clear: controller.clear_database()  # DLL тримає одну базу на процес - рядки попереднього тесту
+        opened.append(controller)
+        return controller
+    yield factory
+    for controller in opened: controller.shutdown()
+
+
+@pytest.fixture
+def logic(open_controller):
+    return open_controller()
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""Зведення artists / albums, які ведуть тригери, мають збігатися з GROUP BY по tracks після кожної зміни."""
+import sqlite3
+from contextlib import closing
+from benchmarks import synthetic_library
+
+GROUP_BY = {
+    "artists": "SELECT artist, COUNT(*), SUM(rating > 0), ROUND(TOTAL(CASE WHEN rating > 0 THEN rating END), 6), MIN(path) "
+               "FROM tracks GROUP BY artist ORDER BY 1",
+    "albums": "SELECT album, artist, COUNT(*), SUM(rating > 0), ROUND(TOTAL(CASE WHEN rating > 0 THEN rating END), 6), MIN(path) "
+              "FROM tracks GROUP BY album, artist ORDER BY 1, 2",
+}
+SUMMARY = {
+    "artists": "SELECT name, track_count, rated_count, ROUND(rating_sum, 6), cover_path FROM artists ORDER BY 1",
+    "albums": "SELECT album, artist, track_count, rated_count, ROUND(rating_sum, 6), cover_path FROM albums ORDER BY 1, 2",
+}
+
+
+def _assert_aggregates_match(db_path):
+    with closing(sqlite3.connect(db_path)) as conn:
+        for table in GROUP_BY:
+            assert conn.execute(SUMMARY[table]).fetchall() == conn.execute(GROUP_BY[table]).fetchall(), table
+
+
+def _details(score):
+    return {"melody": score, "rhythm": score, "vocals": score, "lyrics": score, "arrange": score,
+            "has_vocals": True, "has_lyrics": True}
+
+
+def test_summaries_follow_tracks(logic, tmp_path):
+    db_path = str(tmp_path / "music_library.db")
+    folder = str(tmp_path / "music")
+    synthetic_library.generate(folder, 12, cover_size=32, seed=7)
+    logic.scan_directory(folder)
+    _assert_aggregates_match(db_path)
+
+    tracks = logic.get_playlist("path")
+    for i, row in enumerate(tracks[:5]): logic.calculate_save_rating(row.path, _details(4 + i))
+    logic.calculate_save_rating(tracks[1].path, _details(0))  # оцінку знято
+    logic.flush_ratings()
+    _assert_aggregates_match(db_path)
+
+    # Видалення треку, що був обкладинкою групи (найменший шлях), - обкладинка переходить до наступного
+    logic.apply_library_changes([], [tracks[0].path, tracks[3].path])
+    _assert_aggregates_match(db_path)
+
+    logic.clear_database()
+    _assert_aggregates_match(db_path)
+    with closing(sqlite3.connect(db_path)) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM artists").fetchone()[0] == 0
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    assert "tracks_agg_ad" in names  # тригер, знятий на час очищення, повернувся
+
+    logic.scan_directory(folder)
+    _assert_aggregates_match(db_path)
\ No newline at end of file
@@ -0,0 +1,24 @@
+"""DLL, зібрана зі старішого logic.cpp, має бути помітна: load_library перелічує експорти, яких у ній немає."""
+import pytest
+from Backend.Database.cpp_engine import missing_exports, source_exports
+
+
+class _OldLibrary:
+    init_system = logic_add_track = logic_prepare_query = logic_fetch_next = object()
+
+
+def test_source_exports_are_parsed():
+    names = source_exports()
+    assert {"init_system", "logic_prepare_chart", "logic_fetch_tracks_packed", "logic_apply_changes"} <= set(names)
+    assert len(names) == len(set(names))
+
+
+def test_missing_exports_of_an_old_library():
+    missing = missing_exports(_OldLibrary())
+    assert "logic_prepare_chart" in missing and "init_system" not in missing
+    assert missing_exports(_OldLibrary(), source="/nonexistent/logic.cpp") == []
+
+
+def test_built_backend_is_current(logic):
+    if logic.lib is None: pytest.skip("C++ бекенд не завантажено")
+    assert missing_exports(logic.lib) == []
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""Чарти: баєсова оцінка груп з CHART_PRIOR і Python-дзеркало chart_from_table для DLL без prepareChart."""
+import pytest
+from benchmarks import synthetic_library
+from Backend.charts import CHART_DIMENSIONS, CHART_ENTITIES, CHART_PRIOR, chart_from_table, chart_spec
+from Backend.track_table import TrackTable
+
+
+def _row(i, artist, rating, genre="Rock"):
+    return (i, f"/music/{artist}/{i:03d}.mp3", f"Title {i}", artist, f"{artist} LP", genre, 200.0, rating,
+            0, 0, 0, 0, 0, 1, 1, "")
+
+
+def _library():
+    # Один трек на 10 проти двадцяти по 9: мало оцінок - оцінка ближче до середнього по бібліотеці
+    rows = [_row(0, "One Hit", 10.0)] + [_row(1 + i, "Steady", 9.0) for i in range(20)]
+    rows += [_row(30 + i, "Low", 2.0) for i in range(5)] + [_row(40, "Unrated", 0.0)]
+    return TrackTable.from_rows(rows)
+
+
+def test_prior_pulls_small_groups_towards_the_mean():
+    table = _library()
+    chart = chart_from_table(table, "artist", "rating", None, True, CHART_PRIOR, 10)
+    assert [row["name"] for row in chart] == ["Steady", "One Hit", "Low"]
+    mean = (10 + 20 * 9 + 5 * 2) / 26
+    assert chart[1]["rating"] == pytest.approx((10 + CHART_PRIOR * mean) / (1 + CHART_PRIOR))
+    assert chart[0]["rated"] == 20 and chart[0]["cover_path"] == "/music/Steady/001.mp3"
+    # Без апріорної оцінки - просте середнє, і один трек на 10 перший
+    assert chart_from_table(table, "artist", "rating", None, True, 0.0, 10)[0]["name"] == "One Hit"
+    worst = chart_from_table(table, "artist", "rating", None, False, CHART_PRIOR, 2)
+    assert [row["name"] for row in worst] == ["Low", "One Hit"]
+
+
+def test_track_chart_skips_unrated_and_breaks_ties_by_id():
+    table = _library()
+    best = chart_from_table(table, "track", "rating", None, True, CHART_PRIOR, 3)
+    assert list(best.id) == [0, 20, 19]
+    worst = chart_from_table(table, "track", "rating", None, False, CHART_PRIOR, 50)
+    assert len(worst) == 26 and worst[0].id == 30
+
+
+def _rate(logic, tracks):
+    for i, row in enumerate(tracks):
+        if i % 4 == 3: continue  # частина треків лишається без оцінки
+        score = 1 + (i * 7) % 10
+        logic.calculate_save_rating(row.path, {"melody": score, "rhythm": 10 - score, "vocals": score % 6,
+                                               "lyrics": 5, "arrange": score, "has_vocals": i % 3 != 0, "has_lyrics": i % 2 == 0})
+    logic.flush_ratings()
+
+
+def _rounded(chart):
+    if isinstance(chart, TrackTable): return [row.as_tuple() for row in chart]
+    return [{**row, "rating": round(row["rating"], 9)} for row in chart]
+
+
+def test_fallback_matches_the_engine_chart(logic, tmp_path):
+    folder = str(tmp_path / "music")
+    synthetic_library.generate(folder, 40, cover_size=32, seed=8)
+    logic.scan_directory(folder)
+    _rate(logic, logic.get_playlist("path"))
+
+    library = logic.engine.tracks("artist", "ASC", None, None)
+    for entity in CHART_ENTITIES:
+        for dimension in CHART_DIMENSIONS:
+            col, flag = chart_spec(entity, dimension)
+            for desc in (True, False):
+                expected = logic.engine.chart(entity, col, flag, desc, CHART_PRIOR, 5)
+                assert len(expected) > 0
+                assert _rounded(chart_from_table(library, entity, col, flag, desc, CHART_PRIOR, 5)) == _rounded(expected), \
+                    (entity, dimension, desc)
\ No newline at end of file
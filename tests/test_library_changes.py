@@ -0,0 +1,40 @@
+"""Пачки вотчера і теки під наглядом між запусками."""
+import os
+import time
+from benchmarks import synthetic_library
+from Backend.scanner import find_mp3_files
+from Backend.library_watcher import LibraryWatcher
+
+
+def test_folder_moved_out_and_back_in_one_batch(logic, tmp_path):
+    folder = str(tmp_path / "music")
+    synthetic_library.generate(folder, 6, cover_size=32, seed=4)
+    logic.scan_directory(folder)
+    paths = [p for p, _, _ in find_mp3_files(folder)]
+    # Тека зникла і повернулась до кінця debounce: у пачці і видалена тека, і її файли як нові
+    logic.apply_library_changes(paths, [], [folder])
+    assert sorted(logic.get_playlist().path) == sorted(paths)
+
+
+def test_watched_folders_are_restored(open_controller, tmp_path):
+    folder = str(tmp_path / "music")
+    os.makedirs(folder)
+    logic = open_controller()
+    logic.watch_folder(folder)
+    logic.watch_folder(folder)
+
+    logic = open_controller()
+    assert logic.watcher and logic.watcher.folders == [folder]
+
+def test_watch_does_not_wait_for_a_pending_read(tmp_path):
+    first, second = tmp_path / "a", tmp_path / "b"
+    first.mkdir(); second.mkdir()
+    watcher = LibraryWatcher(lambda changed, deleted, dirs: None, backend="poll", poll_interval=5.0)
+    try:
+        watcher.watch(str(first))
+        time.sleep(0.1)  # потік вотчера вже чекає в read(0.5)
+        start = time.perf_counter()
+        watcher.watch(str(second))
+        assert time.perf_counter() - start < 0.2
+        assert watcher.folders == [str(first), str(second)]
+    finally: watcher.stop()
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""Профайлер: вимкнений нічого не підміняє і мовчить, увімкнений міряє виклики і пише діагностику."""
+from Backend.profiler import Profiler
+
+
+class _Engine:
+    def tracks(self): return [1, 2, 3]
+
+
+def test_disabled_profiler_is_silent(capsys):
+    profiler = Profiler(None)
+    engine = _Engine()
+    assert profiler.instrument(engine, ("tracks",), "Engine") == 0
+    assert "tracks" not in vars(engine)
+    profiler.log("Scan: 3 files")
+    profiler.finish()
+    assert capsys.readouterr().out == ""
+
+
+def test_enabled_profiler_records_calls_and_logs(capsys):
+    profiler = Profiler("1")
+    engine = _Engine()
+    assert profiler.instrument(engine, ("tracks", "missing"), "Engine", cat="engine") == 1
+    for _ in range(3): engine.tracks()
+    [stat] = profiler.stats()
+    assert (stat["name"], stat["cat"], stat["count"], stat["rows"]) == ("Engine.tracks", "engine", 3, 9)
+    profiler.log("Scan: 3 files")
+    assert capsys.readouterr().out == "Scan: 3 files\n"
+    assert profiler.trace_path is None and len(profiler.trace()["traceEvents"]) == 4
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""Кеш запитів: теги RATING / TRACKS виселяють саме залежні від них записи."""
+import os
+from benchmarks import synthetic_library
+from Backend.query_cache import QueryCache, RATING, TRACKS
+
+DETAILS = {"melody": 10, "rhythm": 10, "vocals": 10, "lyrics": 10, "arrange": 10, "has_vocals": True, "has_lyrics": True}
+
+
+def test_invalidate_evicts_only_tagged_entries():
+    cache = QueryCache()
+    cache.put("by_title", "a", (TRACKS,))
+    cache.put("by_rating", "b", (TRACKS, RATING))
+    cache.put("other", "c", ())
+    cache.invalidate(RATING)
+    assert list(cache.entries) == ["by_title", "other"]
+    cache.invalidate(TRACKS)
+    assert list(cache.entries) == ["other"]
+    assert cache.stats["invalidated"] == 2
+
+
+def test_lru_drops_oldest_entry():
+    cache = QueryCache(max_entries=2)
+    cache.put(1, "a", ()); cache.put(2, "b", ())
+    cache.get(1)
+    cache.put(3, "c", ())
+    assert list(cache.entries) == [1, 3]
+
+
+def test_rating_evicts_rating_queries_and_patches_the_rest(logic, tmp_path):
+    folder = str(tmp_path / "music")
+    synthetic_library.generate(folder, 6, cover_size=32, seed=5)
+    logic.scan_directory(folder)
+    by_title = logic.get_playlist("title")
+    logic.get_playlist("rating")
+    keys = set(logic.cache.entries)
+    assert ("tracks", "title", "ASC", None, None) in keys and ("tracks", "rating", "ASC", None, None) in keys
+
+    path = by_title[0].path
+    logic.calculate_save_rating(path, DETAILS)
+    # Порядок за рейтингом змінився - запит виселено; список за назвою лишився і латається на місці
+    assert ("tracks", "rating", "ASC", None, None) not in logic.cache.entries
+    assert logic.cache.entries[("tracks", "title", "ASC", None, None)][0] is by_title
+    assert by_title[0].rating == 10 and by_title[0].rate_melody == 10
+
+    assert logic.get_playlist("rating")[0].path == path  # повторний клік - DESC, щойно оцінений трек перший
+
+
+def test_library_change_evicts_track_queries(logic, tmp_path):
+    folder = str(tmp_path / "music")
+    synthetic_library.generate(folder, 4, cover_size=32, seed=6)
+    logic.scan_directory(folder)
+    tracks = logic.get_playlist("title")
+    logic.get_artists()
+    assert logic.cache.entries
+    logic.apply_library_changes([], [tracks[0].path])
+    assert not logic.cache.entries
+    assert len(logic.get_playlist("title")) == 3 and os.path.exists(tracks[0].path)
\ No newline at end of file
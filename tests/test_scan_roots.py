@@ -0,0 +1,46 @@
+"""Інкрементальне пересканування: відбитки і видалення зниклих треків мають стосуватися лише теки, що сканується."""
+import os
+from benchmarks import synthetic_library
+
+
+def test_sibling_folder_is_not_pruned(logic, tmp_path):
+    sibling, folder = str(tmp_path / "music2"), str(tmp_path / "music")
+    synthetic_library.generate(sibling, 8, cover_size=32, seed=1)
+    synthetic_library.generate(folder, 5, cover_size=32, seed=2)
+
+    logic.scan_directory(sibling)
+    assert logic.last_scan_stats["inserted"] == 8
+    logic.scan_directory(folder)
+    assert logic.last_scan_stats["removed"] == 0
+    assert logic.last_scan_stats["inserted"] == 5
+    assert len(logic.get_playlist()) == 13
+
+
+def test_non_ascii_root_rescan_is_unchanged(logic, tmp_path):
+    folder = str(tmp_path / "Музика")
+    synthetic_library.generate(folder, 6, cover_size=32, seed=3)
+
+    logic.scan_directory(folder)
+    assert logic.last_scan_stats["inserted"] == 6
+    logic.scan_directory(folder)
+    assert logic.last_scan_stats["inserted"] == 0
+    assert logic.last_scan_stats["unchanged"] == 6
+
+def test_rescan_of_one_root_leaves_the_other_alone(logic, tmp_path):
+    first, second = str(tmp_path / "a"), str(tmp_path / "b")
+    synthetic_library.generate(first, 6, cover_size=32, seed=9)
+    synthetic_library.generate(second, 4, cover_size=32, seed=10)
+    logic.scan_directory(first)
+    logic.scan_directory(second)
+    second_paths = sorted(p for p in logic.get_playlist().path if p.startswith(second + os.sep))
+    assert len(second_paths) == 4
+
+    # Файл зник з A: пересканування A видаляє лише його, треки B лишаються
+    gone = sorted(p for p in logic.get_playlist().path if p.startswith(first + os.sep))[0]
+    os.remove(gone)
+    logic.scan_directory(first)
+    assert logic.last_scan_stats["removed"] == 1
+    assert logic.last_scan_stats["unchanged"] == 5
+    paths = logic.get_playlist().path
+    assert gone not in paths and len(paths) == 9
+    assert sorted(p for p in paths if p.startswith(second + os.sep)) == second_paths
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""Keyset-сторінки: курсор на REAL-колонці (оцінки на кшталт 20/3) має точно збігатися зі значенням у базі."""
+import pytest
+from benchmarks import synthetic_library
+from Backend.track_pager import TrackPager
+
+
+@pytest.mark.parametrize("order", ["ASC", "DESC"])
+def test_pages_over_thirds_visit_every_row_once(logic, tmp_path, order):
+    folder = str(tmp_path / "music")
+    synthetic_library.generate(folder, 14, cover_size=32, seed=11)
+    logic.scan_directory(folder)
+    tracks = logic.get_playlist("path")
+    for i, row in enumerate(tracks):
+        # Без вокалу й тексту оцінка - сума трьох балів / 3: 20/3, 19/3, ... по два треки на значення
+        score = 10 - i // 2
+        logic.calculate_save_rating(row.path, {"melody": score, "rhythm": score, "arrange": score - 1, "vocals": 0,
+                                               "lyrics": 0, "has_vocals": False, "has_lyrics": False})
+    logic.flush_ratings()
+
+    full = logic.engine.tracks("rating", order, None, None)
+    assert 20 / 3 in list(full.rating)
+    pager = TrackPager(logic.get_tracks_page, "rating", order, page_size=3)
+    paged = pager.load_all()
+    expected = sorted(zip(full.rating, full.id), reverse=order == "DESC")
+    assert list(zip(paged.rating, paged.id)) == expected
+    assert len(set(paged.id)) == len(tracks)
+
+@pytest.mark.parametrize("sort", ["artist", "album", "rating"])
+def test_full_list_matches_pages_and_its_reverse(logic, tmp_path, sort):
+    folder = str(tmp_path / "music")
+    synthetic_library.generate(folder, 16, cover_size=32, seed=12)
+    logic.scan_directory(folder)
+    asc = logic.engine.tracks(sort, "ASC", None, None)
+    # Рівні значення (усі rating = 0, кілька треків на артиста) впорядковані за id, як у сторінках
+    assert list(TrackPager(logic.get_tracks_page, sort, "ASC", page_size=5).load_all().id) == list(asc.id)
+    assert list(logic.engine.tracks(sort, "DESC", None, None).id) == list(asc.reversed().id)
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""TrackTable: колонки туди й назад, пакетне оновлення рейтингів, зрізи."""
+import pytest
+from Backend.track_table import FIELDS, TrackTable
+
+
+def _row(i, artist="Artist", rating=0.0):
+    return (i, f"C:\\music\\{i:03d}.mp3", f"Title {i}", artist, "Album", "Rock", 180.5 + i, rating,
+            1, 2, 3, 4, 5, 1, 0, "cover-1")
+
+
+ROWS = [_row(i, artist=f"Artist {i % 3}", rating=i / 3) for i in range(10)]
+
+
+def test_rows_round_trip_through_columns():
+    table = TrackTable.from_rows(ROWS)
+    assert len(table) == 10
+    assert [row.as_tuple() for row in table] == ROWS
+    assert table[3].artist == "Artist 0" and table[-1].id == 9
+    assert table[4].duration == 184.5 and table[4].rating == 4 / 3
+    # Повторювані рядки інтерновані - одна копія на всю колонку
+    assert table.artist[0] is table.artist[3]
+    with pytest.raises(IndexError): table[10]
+
+
+def test_short_rows_are_padded():
+    table = TrackTable.from_rows([r[:15] for r in ROWS[:2]])
+    assert table.cover == ["", ""]
+    assert len(table.cover) == len(table.id)
+
+
+def test_apply_ratings_patches_matching_rows_in_place():
+    table = TrackTable.from_rows(ROWS)
+    row = table[2]
+    patched = table.apply_ratings({ROWS[2][1]: (9.5, {"melody": 10, "has_lyrics": True}),
+                                   "C:\\music\\missing.mp3": (1.0, {})})
+    assert patched == 1
+    assert row.rating == 9.5 and row.rate_melody == 10 and row.has_lyrics == 1
+    assert row.rate_rhythm == 2  # ключі, яких нема в details, не чіпаються
+    assert table[3].as_tuple() == ROWS[3]
+    assert table.apply_ratings({}) == 0
+
+
+def test_slices_take_and_reversed_copy_rows():
+    table = TrackTable.from_rows(ROWS)
+    assert [r.as_tuple() for r in table[2:8:2]] == ROWS[2:8:2]
+    assert [r.as_tuple() for r in table[::-1]] == ROWS[::-1]
+    assert table.reversed() == table[::-1]
+    picked = table.take([5, 1])
+    assert [r.id for r in picked] == [5, 1]
+    picked.apply_ratings({ROWS[5][1]: (0.0, {})})
+    assert table[5].rating == 5 / 3  # зріз - окрема таблиця
+    assert not table[10:] and len(table[:0]) == 0
+    assert all(len(getattr(picked, f)) == 2 for f in FIELDS)
+
+
+def test_extend_appends_in_place():
+    table = TrackTable.from_rows(ROWS[:4])
+    view = table[1:2]
+    table.extend(TrackTable.from_rows(ROWS[4:]))
+    assert [r.id for r in table] == list(range(10))
+    assert len(view) == 1
+
+def test_path_index_follows_appended_rows():
+    table = TrackTable.from_rows(ROWS[:4])
+    assert table.update_rating(ROWS[1][1], 7.0, {})
+    table.extend(TrackTable.from_rows(ROWS[4:]))
+    assert table.apply_ratings({ROWS[9][1]: (8.0, {}), ROWS[0][1]: (1.0, {})}) == 2
+    assert (table[9].rating, table[0].rating, table[1].rating) == (8.0, 1.0, 7.0)
+    assert not table.update_rating("C:\\music\\missing.mp3", 1.0, {})
\ No newline at end of file